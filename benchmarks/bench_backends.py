@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+import argparse
+import importlib.util
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.run_benchmarks import SIZES, load_dataset, REFERENCE_DATE
+from src.core.data_processor import DataProcessor
+from src.core.analyzer import AnalyticsEngine
+from src.core import analytics_backends
+
+def available_backends():
+    return [backend for backend in analytics_backends.BACKENDS
+            if backend in ('pandas', 'process') or importlib.util.find_spec(backend) is not None]
+
+def check_equivalence(processed: pd.DataFrame, backend: str, workers: int):
+    expected = AnalyticsEngine.compute_daily_metrics(processed)
+    actual = analytics_backends.compute_daily_metrics(processed, backend, workers, min_rows=0)
+    # process reduces every group exactly as pandas does; the SQL engines may differ in the last float ulp
+    exact = backend == 'process'
+    pd.testing.assert_frame_equal(actual, expected, check_exact=exact)
+    expected_ma = AnalyticsEngine.compute_moving_average(expected.copy())
+    actual_ma = analytics_backends.compute_moving_average(expected.copy(), 7, backend, workers, min_rows=0)
+    pd.testing.assert_frame_equal(actual_ma, expected_ma, check_exact=exact)
+
+def time_backend(processed: pd.DataFrame, backend: str, workers: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analytics_backends.compute_daily_metrics(processed, backend, workers, min_rows=0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check analytics backends against pandas and time them')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['100k', '1m'])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    backends = available_backends()
+    for size in args.sizes:
+        raw = load_dataset(size)
+        raw['collected_at'] = REFERENCE_DATE
+        processed = DataProcessor.normalize_data(raw)
+        for backend in backends:
+            check_equivalence(processed, backend, max(args.workers))
+        print(f"Size {size}: {', '.join(backends)} match the pandas results")
+        baseline = time_backend(processed, 'pandas', 1, args.repeat)
+        for backend in backends:
+            for workers in (sorted(set(args.workers)) if backend == 'process' else [1]):
+                seconds = time_backend(processed, backend, workers, args.repeat)
+                print(f"  compute_daily_metrics backend={backend:<8} workers={workers:<3} "
+                      f"{seconds:>8.4f}s  speedup={baseline / seconds:>5.2f}x")
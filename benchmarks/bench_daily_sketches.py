@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.mock_data_generator import MockDataGenerator
+from src.core.data_processor import DataProcessor
+from src.core.analyzer import AnalyticsEngine
+from src.core.sketches import merge_sketches
+
+QUANTILES = {'engagement_p50': 0.5, 'engagement_p90': 0.9, 'engagement_p99': 0.99}
+
+def exact_rollup(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    dates = df['post_date'].dt.to_period(period).dt.start_time.dt.date.rename('date')
+    grouped = df.groupby([df['platform'].astype(str), dates], observed=True)
+    exact = grouped['author_id'].nunique().rename('unique_authors').to_frame()
+    for column, q in QUANTILES.items():
+        exact[column] = grouped['engagement_score'].quantile(q)
+    return exact.reset_index()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check sketch-based daily/weekly/monthly rollups against exact ones')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=250_000)
+    parser.add_argument('--authors', type=int, default=50_000, help='Distinct author ids to draw from')
+    args = parser.parse_args()
+    df = DataProcessor.normalize_data(MockDataGenerator(seed=42).generate_mock_social_media_data(args.rows))
+    # The generator has a small fixed author pool; draw from a larger one so distinct counts leave linear counting
+    authors = np.random.default_rng(7).integers(0, args.authors, len(df))
+    df['author_id'] = pd.Categorical(np.char.add('author_', authors.astype(str)))
+
+    start = time.perf_counter()
+    sketches = {'authors': {}, 'engagement': {}}
+    for offset in range(0, len(df), args.chunk_size):
+        for kind, chunk in AnalyticsEngine.daily_sketches(df.iloc[offset:offset + args.chunk_size]).items():
+            sketches[kind] = merge_sketches(sketches[kind], chunk)
+    build_seconds = time.perf_counter() - start
+    stored = sum(len(sketch.to_bytes()) for kind in sketches.values() for sketch in kind.values())
+    print(f"{len(df)} posts, {len(sketches['authors'])} platform/day buckets, "
+          f"built in {build_seconds:.3f}s, stored size {stored / 1024:.1f} KiB")
+
+    for period in ('D', 'W', 'M'):
+        start = time.perf_counter()
+        exact = exact_rollup(df, period)
+        exact_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        approx = AnalyticsEngine.sketch_metrics(sketches['authors'], sketches['engagement'], period)
+        sketch_seconds = time.perf_counter() - start
+        joined = exact.merge(approx, on=['platform', 'date'], suffixes=('_exact', ''))
+        assert len(joined) == len(exact) == len(approx)
+        errors = {column: ((joined[column] - joined[f"{column}_exact"]).abs() / joined[f"{column}_exact"]).max()
+                  for column in ['unique_authors'] + list(QUANTILES)}
+        print(f"{period}  {len(approx):>4} rows  exact {exact_seconds:.3f}s  from sketches {sketch_seconds:.3f}s  "
+              f"max relative error " + "  ".join(f"{column} {error:.2%}" for column, error in errors.items()))
@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.dedup_index import DedupIndex, STATUSES
+
+def make_posts(ids: np.ndarray, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'platform': np.array(['youtube', 'facebook', 'twitter'])[ids % 3],
+        'post_id': ids.astype(str),
+        'likes': rng.integers(0, 5000, len(ids)),
+        'comments': rng.integers(0, 500, len(ids)),
+        'shares': rng.integers(0, 200, len(ids))
+    })
+
+def make_batch(stored: pd.DataFrame, batch_size: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    seen = stored.sample(n=min(batch_size // 2, len(stored)), random_state=seed).reset_index(drop=True)
+    updated = rng.random(len(seen)) < 0.3
+    seen.loc[updated, 'likes'] += 1
+    fresh = make_posts(np.arange(len(stored), len(stored) + batch_size - len(seen)), seed)
+    return pd.concat([seen, fresh], ignore_index=True)
+
+def reference_status(stored: pd.DataFrame, batch: pd.DataFrame) -> pd.Series:
+    merged = batch.merge(stored, on=['platform', 'post_id'], how='left', suffixes=('', '_stored'),
+                         indicator=True)
+    same = ((merged['likes'] == merged['likes_stored']) & (merged['comments'] == merged['comments_stored'])
+            & (merged['shares'] == merged['shares_stored']))
+    codes = np.where(merged['_merge'] == 'left_only', 0, np.where(same, 2, 1))
+    return pd.Series(pd.Categorical.from_codes(codes, categories=STATUSES), name='record_status')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check DedupIndex against a pandas merge and time lookups')
+    parser.add_argument('--stored', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--batch', type=int, default=100_000)
+    parser.add_argument('--no-bloom', action='store_true')
+    args = parser.parse_args()
+    for stored_rows in args.stored:
+        stored = make_posts(np.arange(stored_rows), seed=1)
+        batch = make_batch(stored, args.batch)
+        with tempfile.TemporaryDirectory() as path:
+            index = DedupIndex(path, use_bloom=not args.no_bloom)
+            start = time.perf_counter()
+            index.add(stored)
+            build = time.perf_counter() - start
+            index = DedupIndex(path, use_bloom=not args.no_bloom)
+            start = time.perf_counter()
+            status = index.classify(batch)
+            classify = time.perf_counter() - start
+            expected = reference_status(stored, batch)
+            pd.testing.assert_series_equal(status.reset_index(drop=True), expected)
+            start = time.perf_counter()
+            reference_status(stored, batch)
+            merge = time.perf_counter() - start
+            # A run's ids go into a new segment; the stored arrays are not rewritten until compaction
+            start = time.perf_counter()
+            index.add(batch)
+            add = time.perf_counter() - start
+            counts = status.value_counts().reindex(STATUSES).to_dict()
+            print(f"stored={stored_rows:>11,} batch={len(batch):,} {counts} "
+                  f"build={build:.2f}s classify={classify:.4f}s pandas merge={merge:.4f}s add={add:.4f}s "
+                  f"index size={sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2**20:.1f}MB")
@@ -0,0 +1,48 @@
+import sys
+import os
+import re
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ['tweepy', 'snscrape', 'googleapiclient', 'aiohttp', 'duckdb', 'polars']
+MODULES = ['src.api.registry', 'src.pipeline.main', 'src.pipeline.query']
+
+def import_time(module: str) -> float:
+    # A fresh interpreter per measurement, so nothing is already cached in sys.modules
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S+)$', line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1e6
+    raise RuntimeError(f"No import time reported for {module}")
+
+def leaked_modules(module: str):
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(',') if name]
+
+def cli_help_time(repeat: int) -> float:
+    import time
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'scripts/run_pipeline.py', '--help'], cwd=ROOT,
+                       capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure cold import time of the pipeline entry points')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    failed = False
+    for module in MODULES:
+        seconds = min(import_time(module) for _ in range(args.repeat))
+        leaked = leaked_modules(module)
+        failed |= bool(leaked)
+        print(f"import {module:<20} {seconds:>7.3f}s  heavy SDKs loaded: {', '.join(leaked) or 'none'}")
+    print(f"scripts/run_pipeline.py --help {cli_help_time(args.repeat):>7.3f}s")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.data_processor import DataProcessor
+
+def make_raw_frame(num_rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    platforms = np.array(['youtube', 'facebook', 'twitter'])[rng.integers(0, 3, num_rows)]
+    post_dates = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 90 * 86400, num_rows), unit='s')
+    post_date_strings = pd.Series(post_dates.strftime('%Y-%m-%dT%H:%M:%SZ'), dtype=object)
+    facebook = platforms == 'facebook'
+    post_date_strings[facebook] = post_dates[facebook].strftime('%Y-%m-%dT%H:%M:%S+0000')
+    twitter = platforms == 'twitter'
+    post_date_strings[twitter] = post_dates[twitter].strftime('%a %b %d %H:%M:%S +0000 %Y')
+    likes = rng.integers(0, 5000, num_rows).astype('float64')
+    likes[rng.random(num_rows) < 0.01] = np.nan
+    return pd.DataFrame({
+        'post_id': pd.Series(np.arange(num_rows)).astype(str).values,
+        'content': np.array(['Check out this tutorial! #AI', 'New release #Python', None],
+                            dtype=object)[rng.integers(0, 3, num_rows)],
+        'likes': likes,
+        'comments': rng.integers(0, 500, num_rows),
+        'shares': rng.integers(0, 200, num_rows),
+        'post_date': post_date_strings.values,
+        'author_id': np.char.add('user_', rng.integers(0, 10000, num_rows).astype(str)),
+        'author_name': 'author',
+        'platform': platforms,
+        'collected_at': pd.Timestamp.now()
+    })
+
+def run(num_rows: int, repeat: int, copy: bool) -> float:
+    raw = make_raw_frame(num_rows)
+    best = float('inf')
+    for _ in range(repeat):
+        frame = raw if copy else raw.copy()
+        start = time.perf_counter()
+        DataProcessor.normalize_data(frame, copy=copy)
+        best = min(best, time.perf_counter() - start)
+    return num_rows / best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark DataProcessor.normalize_data throughput')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    for num_rows in args.rows:
+        for copy in (True, False):
+            rows_per_sec = run(num_rows, args.repeat, copy)
+            print(f"normalize_data rows={num_rows:>10,} copy={copy!s:<5} {rows_per_sec:>14,.0f} rows/sec")
\ No newline at end of file
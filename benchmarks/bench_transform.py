@@ -0,0 +1,149 @@
+import sys
+import os
+import time
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import dateutil.parser
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.youtube_client import YouTubeClient
+from src.api.facebook_client import FacebookClient
+from src.api.twitter_client import TwitterClient
+
+def make_youtube(num_items: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    items = [{
+        'id': f"video{i}",
+        'snippet': {
+            'publishedAt': (start + timedelta(seconds=int(s))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'title': f"Video {i}",
+            'channelId': f"channel{i % 50}",
+            'channelTitle': f"Channel {i % 50}"
+        },
+        'statistics': {'likeCount': str(likes), 'commentCount': str(likes // 10)}
+    } for i, (s, likes) in enumerate(zip(rng.integers(0, 90 * 86400, num_items), rng.integers(0, 5000, num_items)))]
+    items[0]['statistics']['likeCount'] = 'n/a'
+    items[1]['snippet']['publishedAt'] = 'yesterday'
+    del items[2]['id']
+    del items[3]['statistics']['commentCount']
+    return {'items': items}
+
+def make_facebook(num_items: int, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    posts = [{
+        'id': f"page{i % 5}_{i}" if i % 7 else f"{i}",
+        'message': f"Post {i}",
+        'created_time': (start + timedelta(seconds=int(s))).strftime('%Y-%m-%dT%H:%M:%S+0000'),
+        'likes': {'summary': {'total_count': int(likes)}},
+        'comments': {'summary': {'total_count': int(likes // 10)}},
+        'shares': {'count': int(likes // 20)} if i % 3 else None
+    } for i, (s, likes) in enumerate(zip(rng.integers(0, 90 * 86400, num_items), rng.integers(0, 5000, num_items)))]
+    del posts[0]['id']
+    return {'data': posts}
+
+def make_tweets(num_items: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [SimpleNamespace(
+        id_str=str(i), full_text=f"Tweet {i}", favorite_count=int(likes), retweet_count=int(likes // 10),
+        created_at=start + timedelta(seconds=int(s)),
+        user=SimpleNamespace(id_str=f"user{i % 100}", screen_name=f"user_{i % 100}")
+    ) for i, (s, likes) in enumerate(zip(rng.integers(0, 90 * 86400, num_items), rng.integers(0, 5000, num_items)))]
+
+# Per-item reference implementations, as the clients transformed responses before the batched path
+def reference_youtube(raw_data):
+    transformed = []
+    for item in raw_data.get('items', []):
+        try:
+            stats = item.get('statistics', {})
+            snippet = item.get('snippet', {})
+            published_at = snippet.get('publishedAt', '')
+            transformed.append({
+                'post_id': item['id'],
+                'content': snippet.get('title', ''),
+                'likes': int(stats.get('likeCount', 0)),
+                'comments': int(stats.get('commentCount', 0)),
+                'shares': 0,
+                'post_date': dateutil.parser.parse(published_at).replace(tzinfo=None) if published_at else None,
+                'author_id': snippet.get('channelId', ''),
+                'author_name': snippet.get('channelTitle', '')
+            })
+        except Exception:
+            continue
+    return pd.DataFrame(transformed)
+
+def reference_facebook(raw_data):
+    transformed = []
+    for post in raw_data.get('data', []):
+        try:
+            created_time = post.get('created_time', '')
+            transformed.append({
+                'post_id': post['id'],
+                'content': post.get('message', ''),
+                'likes': post.get('likes', {}).get('summary', {}).get('total_count', 0),
+                'comments': post.get('comments', {}).get('summary', {}).get('total_count', 0),
+                'shares': post.get('shares', {}).get('count', 0) if post.get('shares') else 0,
+                'post_date': datetime.fromisoformat(created_time.replace('Z', '+00:00')).replace(tzinfo=None)
+                if created_time else None,
+                'author_id': post['id'].split('_')[0] if '_' in post['id'] else post['id'],
+                'author_name': f"page_{post['id'].split('_')[0]}" if '_' in post['id'] else "unknown"
+            })
+        except Exception:
+            continue
+    return pd.DataFrame(transformed)
+
+def reference_twitter(tweets):
+    return pd.DataFrame([{
+        'post_id': tweet.id_str,
+        'content': tweet.full_text,
+        'likes': tweet.favorite_count,
+        'comments': 0,
+        'shares': tweet.retweet_count,
+        'post_date': tweet.created_at.replace(tzinfo=None),
+        'author_id': tweet.user.id_str,
+        'author_name': tweet.user.screen_name
+    } for tweet in tweets])
+
+def make_clients():
+    clients = {}
+    for name, cls in (('youtube', YouTubeClient), ('facebook', FacebookClient), ('twitter', TwitterClient)):
+        client = cls.__new__(cls)
+        client.logger = logging.getLogger(f"{name}_client")
+        clients[name] = client
+    return clients
+
+def best_time(func, payload, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check batched response transforms against per-item ones and time both')
+    parser.add_argument('--items', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    clients = make_clients()
+    cases = {
+        'youtube': (make_youtube(args.items), reference_youtube),
+        'facebook': (make_facebook(args.items), reference_facebook),
+        'twitter': (make_tweets(args.items), reference_twitter)
+    }
+    for platform, (payload, reference) in cases.items():
+        actual = clients[platform]._transform_response(payload)
+        expected = reference(payload)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        before = best_time(reference, payload, args.repeat)
+        after = best_time(clients[platform]._transform_response, payload, args.repeat)
+        print(f"{platform:<9} {len(actual):>7} rows  per-item {before:.4f}s  batched {after:.4f}s  "
+              f"speedup {before / after:>5.1f}x")
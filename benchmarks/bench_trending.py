@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.mock_data_generator import MockDataGenerator
+from src.core.data_processor import DataProcessor
+from src.core.analyzer import AnalyticsEngine
+from src.core.sketches import merge_sketches
+
+def exact_counts(terms: pd.DataFrame) -> pd.DataFrame:
+    return terms.groupby(['platform', 'date', 'term'], observed=True).agg(
+        mentions=('term', 'size'), engagement=('engagement_score', 'sum'))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Check topic sketches against exact term counts and time them')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=250_000)
+    parser.add_argument('--width', type=int, default=2048)
+    parser.add_argument('--depth', type=int, default=4)
+    args = parser.parse_args()
+    df = DataProcessor.normalize_data(MockDataGenerator(seed=42).generate_mock_social_media_data(args.rows))
+
+    start = time.perf_counter()
+    terms = AnalyticsEngine.extract_terms(df)
+    exact = exact_counts(terms)
+    exact_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sketches = {}
+    for offset in range(0, len(df), args.chunk_size):
+        chunk = df.iloc[offset:offset + args.chunk_size]
+        sketches = merge_sketches(sketches, AnalyticsEngine.topic_sketches(chunk, args.width, args.depth))
+    sketch_seconds = time.perf_counter() - start
+
+    whole = AnalyticsEngine.topic_sketches(df, args.width, args.depth)
+    for key, sketch in whole.items():
+        assert np.array_equal(sketch.mentions.table, sketches[key].mentions.table), key
+        assert np.allclose(sketch.engagement.table, sketches[key].engagement.table), key
+
+    mention_errors, engagement_errors = [], []
+    for (platform, day), sketch in sketches.items():
+        bucket = exact.loc[(platform, pd.Timestamp(day))]
+        mentions, engagement = sketch.estimate(bucket.index.to_numpy(dtype=object))
+        # Count-min only overestimates; relative to the bucket total the error is bounded by e / width
+        assert (mentions >= bucket['mentions'].to_numpy()).all() and \
+            (engagement >= bucket['engagement'].to_numpy() - 1e-6).all()
+        mention_errors.append((mentions - bucket['mentions'].to_numpy()).max() / bucket['mentions'].sum())
+        engagement_errors.append((engagement - bucket['engagement'].to_numpy()).max() / bucket['engagement'].sum())
+
+    payload = sum(len(sketch.to_bytes()) for sketch in sketches.values())
+    print(f"{len(df)} posts, {len(terms)} post terms, {len(sketches)} platform/day buckets")
+    print(f"exact groupby  {exact_seconds:.3f}s")
+    print(f"chunked sketch {sketch_seconds:.3f}s  stored size {payload / 1024:.1f} KiB")
+    print(f"max relative overestimate  mentions {max(mention_errors):.2e}  engagement {max(engagement_errors):.2e}")
+    print(AnalyticsEngine.trending_topics(sketches, n=3).to_string(index=False))
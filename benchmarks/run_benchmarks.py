@@ -0,0 +1,145 @@
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from data.mock_data_generator import MockDataGenerator
+from src.core.data_processor import DataProcessor
+from src.core.analyzer import AnalyticsEngine
+from src.core.utils import save_data
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+SEED = 20240101
+REFERENCE_DATE = datetime(2024, 6, 30)
+CACHE_DIR = os.path.join(ROOT, 'benchmarks', '.cache')
+HISTORY_PATH = os.path.join(ROOT, 'benchmarks', 'results', 'history.json')
+
+def load_dataset(size: str) -> pd.DataFrame:
+    path = os.path.join(CACHE_DIR, f"mock_{size}_{SEED}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    print(f"Generating {SIZES[size]:,} mock rows (seed={SEED})...")
+    MockDataGenerator(SEED).stream_mock_data_to_parquet(SIZES[size], path + '.tmp', reference_date=REFERENCE_DATE)
+    os.replace(path + '.tmp', path)
+    return pd.read_parquet(path)
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_size(size: str, repeat: int, formats: List[str]) -> Dict[str, float]:
+    raw = load_dataset(size)
+    raw['collected_at'] = REFERENCE_DATE
+    processed = DataProcessor.normalize_data(raw)
+    metrics = AnalyticsEngine.compute_daily_metrics(processed)
+    benchmarks = {
+        'normalize_data': lambda: DataProcessor.normalize_data(raw),
+        'compute_daily_metrics': lambda: AnalyticsEngine.compute_daily_metrics(processed),
+        'compute_moving_average': lambda: AnalyticsEngine.compute_moving_average(metrics.copy()),
+        'identify_top_posts': lambda: AnalyticsEngine.identify_top_posts(processed),
+    }
+    out_dir = tempfile.mkdtemp(prefix='bench_save_')
+    try:
+        for fmt in formats:
+            benchmarks[f'save_data[{fmt}]'] = lambda fmt=fmt: save_data(processed, os.path.join(out_dir, f'out.{fmt}'))
+        results = {}
+        for name, func in benchmarks.items():
+            results[f"{name}@{size}"] = time_call(func, repeat)
+            print(f"  {name + '@' + size:<40} {results[f'{name}@{size}']:>10.4f}s")
+        return results
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+def git_revision() -> Dict[str, Any]:
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             cwd=ROOT, text=True).strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = 'unknown', True
+    return {'commit': commit, 'dirty': dirty}
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def find_baseline(history: List[Dict[str, Any]], commit: str) -> Optional[Dict[str, Any]]:
+    for entry in reversed(history):
+        if entry['commit'] != commit:
+            return entry
+    return None
+
+def compare(results: Dict[str, float], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    print(f"\nCompared with {baseline['commit'][:10]} ({baseline['timestamp']}):")
+    for name, seconds in sorted(results.items()):
+        previous = baseline['results'].get(name)
+        if not previous:
+            continue
+        change = (seconds - previous) / previous
+        flag = ''
+        if change > threshold:
+            flag = '  <-- REGRESSION'
+            regressions.append(name)
+        print(f"  {name:<40} {previous:>10.4f}s -> {seconds:>10.4f}s ({change:+.1%}){flag}")
+    return regressions
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline hot paths on seeded mock data')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['10k', '1m'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--formats', nargs='+', choices=['parquet', 'csv', 'json'], default=['parquet', 'csv', 'json'])
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--threshold', type=float, default=0.10,
+                       help='Relative slowdown versus the previous commit that counts as a regression')
+    parser.add_argument('--no-record', action='store_true', help='Do not append this run to the history file')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    revision = git_revision()
+    results = {}
+    for size in args.sizes:
+        print(f"Size {size}:")
+        results.update(run_size(size, args.repeat, args.formats))
+    history = load_history(args.history)
+    baseline = find_baseline(history, revision['commit'])
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    if not args.no_record:
+        history.append({
+            **revision,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'seed': SEED,
+            'results': results
+        })
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -11,16 +11,35 @@ class APIConfig:
     def load_config(cls):
         return cls(
             twitter={
+                "enabled": True,
                 "search_query": "#datascience OR #machinelearning OR #ai",
                 "count": 100,
-                "rate_limit": 450
+                "rate_limit": 450,
+                "rate_window": 900,
+                "refresh_budget": 1000,
+                "refresh_max_age_days": 7,
+                "timeout": 60
             },
             youtube={
+                "enabled": True,
+                "required": True,
                 "search_query": "data science OR machine learning",
                 "max_results": 50,
-                "part": "snippet,statistics"
+                "max_videos": 1000,
+                "batch_concurrency": 4,
+                "async_transport": False,
+                "part": "snippet,statistics",
+                "rate_limit": 10000,
+                "rate_window": 86400,
+                "rate_burst": 2500,
+                "request_costs": {"search": 100, "videos": 1},
+                "cache_ttl": {"search": 3600, "videos": 900},
+                "refresh_budget": 5000,
+                "refresh_max_age_days": 30,
+                "timeout": 60
             },
             facebook={
+                "enabled": True,
                 "page_ids": [
                     "company_page_1",
                     "company_page_2",
@@ -29,6 +48,15 @@ class APIConfig:
                     "company_page_5"
                 ],
                 "limit": 15,
-                "fields": "id,message,created_time,likes.summary(true),comments.summary(true),shares"
+                "max_pages": 10,
+                "api_version": "v19.0",
+                "rate_limit": 200,
+                "rate_window": 3600,
+                "rate_burst": 50,
+                "cache_ttl": {"posts": 900},
+                "refresh_budget": 1000,
+                "refresh_max_age_days": 30,
+                "fields": "id,message,created_time,likes.summary(true),comments.summary(true),shares",
+                "timeout": 60
             }
         )
\ No newline at end of file
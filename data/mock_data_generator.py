@@ -2,105 +2,158 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 
 
 class MockDataGenerator:
-    def __init__(self):
+    PLATFORMS = ['twitter', 'facebook', 'youtube', 'instagram']
+    AUTHORS = [f'user_{i}' for i in range(1, 101)]
+    HASHTAGS = ['DataScience', 'AI', 'MachineLearning', 'BigData', 'DataEngineering', 'Python', 'SQL']
+    TOPICS = ['data', 'AI', 'machine learning', 'big data', 'data engineering']
+    LANGUAGES = ['en', 'ar', 'es', 'fr']
+    CONTENT_TEMPLATES = [
+        "Check out this amazing {} tutorial! #{}",
+        "Just launched our new {} product. What do you think? #{}",
+        "The future of {} analytics is here. #{}",
+        "How {} is transforming industries. #{}",
+        "5 tips for becoming a better {} engineer. #{}",
+        "Latest trends in {} for 2024. #{}"
+    ]
+    # نطاقات الـ engagement لكل منصة: (الحد الأدنى، الحد الأقصى) لكل من likes و comments و shares
+    ENGAGEMENT_RANGES = {
+        'twitter': {'likes': (5, 500), 'comments': (0, 100), 'shares': (0, 200)},
+        'facebook': {'likes': (10, 1000), 'comments': (0, 200), 'shares': (0, 300)},
+        'youtube': {'likes': (20, 5000), 'comments': (0, 500), 'shares': (0, 100)},
+        'instagram': {'likes': (50, 2000), 'comments': (0, 300), 'shares': (0, 150)}
+    }
+    MAX_EXTRA_HASHTAGS = 3
+
+    def __init__(self, seed: Optional[int] = None):
         self.logger = logging.getLogger(__name__)
+        self.rng = np.random.default_rng(seed)
+        self._content_table, self._hashtag_table = self._build_text_tables()
+
+    def _build_text_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        """بناء جداول النصوص مرة واحدة لكل تركيبات القالب والموضوع والهاشتاجات"""
+        n_tags = len(self.HASHTAGS)
+        sequences = self._extra_hashtag_sequences()
+        content_table = np.empty(len(self.CONTENT_TEMPLATES) * len(self.TOPICS) * n_tags * len(sequences),
+                                 dtype=object)
+        hashtag_table = np.empty(n_tags * len(sequences), dtype=object)
+        position = 0
+        for template in self.CONTENT_TEMPLATES:
+            for topic in self.TOPICS:
+                for main, hashtag in enumerate(self.HASHTAGS):
+                    base = template.format(topic, hashtag)
+                    for sequence in sequences:
+                        extras = ''.join(f" #{self.HASHTAGS[t]}" for t in sequence if t != main)
+                        content_table[position] = base + extras
+                        position += 1
+        for main, hashtag in enumerate(self.HASHTAGS):
+            for index, sequence in enumerate(sequences):
+                hashtag_table[main * len(sequences) + index] = ', '.join(
+                    [hashtag] + [self.HASHTAGS[t] for t in sequence])
+        return content_table, hashtag_table
+
+    def _extra_hashtag_sequences(self) -> List[Tuple[int, ...]]:
+        n_tags = len(self.HASHTAGS)
+        sequences = []
+        for length in range(1, self.MAX_EXTRA_HASHTAGS + 1):
+            for code in range(n_tags ** length):
+                sequences.append(tuple((code // n_tags ** (length - 1 - k)) % n_tags for k in range(length)))
+        return sequences
+
+    def _sequence_codes(self, first: np.ndarray, count: np.ndarray) -> np.ndarray:
+        n_tags = len(self.HASHTAGS)
+        codes = np.zeros(len(count), dtype=np.int64)
+        offset = 0
+        for length in range(1, self.MAX_EXTRA_HASHTAGS + 1):
+            value = np.zeros(len(count), dtype=np.int64)
+            for k in range(length):
+                value = value * n_tags + first[:, k]
+            mask = count == length
+            codes[mask] = offset + value[mask]
+            offset += n_tags ** length
+        return codes
+
+    def _generate_engagement_arrays(self, platform_codes: np.ndarray) -> Dict[str, np.ndarray]:
+        """إنشاء إحصائيات engagement لكل المنشورات دفعة واحدة بناءً على المنصة"""
+        stats = {}
+        for metric in ('likes', 'comments', 'shares'):
+            low = np.array([self.ENGAGEMENT_RANGES[p][metric][0] for p in self.PLATFORMS])
+            high = np.array([self.ENGAGEMENT_RANGES[p][metric][1] for p in self.PLATFORMS])
+            stats[metric] = self.rng.integers(low[platform_codes], high[platform_codes], endpoint=True)
+        return stats
+
+    def _generate_chunk(self, start: int, size: int, base_date: datetime) -> pd.DataFrame:
+        rng = self.rng
+        n_tags = len(self.HASHTAGS)
+        platform_codes = rng.integers(0, len(self.PLATFORMS), size)
+        post_dates = (np.datetime64(base_date, 'ns')
+                      + rng.integers(0, 31, size).astype('timedelta64[D]')
+                      + rng.integers(0, 24, size).astype('timedelta64[h]'))
+        template = rng.integers(0, len(self.CONTENT_TEMPLATES), size)
+        topic = rng.integers(0, len(self.TOPICS), size)
+        main = rng.integers(0, n_tags, size)
+        extras = np.argsort(rng.random((size, n_tags)), axis=1)[:, :self.MAX_EXTRA_HASHTAGS]
+        extra_count = rng.integers(1, self.MAX_EXTRA_HASHTAGS, size, endpoint=True)
+        n_sequences = len(self._hashtag_table) // n_tags
+        sequence = self._sequence_codes(extras, extra_count)
+        content_index = ((template * len(self.TOPICS) + topic) * n_tags + main) * n_sequences + sequence
+        engagement = self._generate_engagement_arrays(platform_codes)
+        platforms = np.array(self.PLATFORMS, dtype=object)[platform_codes]
+        suffix = rng.integers(1000, 9999, size, endpoint=True)
+        post_ids = (pd.Series(platforms) + '_' + pd.Series(np.arange(start, start + size)).astype(str)
+                    + '_' + pd.Series(suffix).astype(str))
+        return pd.DataFrame({
+            'post_id': post_ids.values,
+            'content': self._content_table[content_index],
+            'likes': engagement['likes'],
+            'comments': engagement['comments'],
+            'shares': engagement['shares'],
+            'post_date': post_dates,
+            'platform': platforms,
+            'author_id': np.array(self.AUTHORS, dtype=object)[rng.integers(0, len(self.AUTHORS), size)],
+            'language': np.array(self.LANGUAGES, dtype=object)[rng.integers(0, len(self.LANGUAGES), size)],
+            'hashtags': self._hashtag_table[main * n_sequences + sequence]
+        })
+
+    def iter_mock_chunks(self, num_records: int, chunk_size: int = 1_000_000,
+                         reference_date: Optional[datetime] = None) -> Iterator[pd.DataFrame]:
+        """
+        إنشاء البيانات التجريبية على دفعات للحفاظ على استهلاك ذاكرة ثابت
+
+        Args:
+            num_records (int): عدد التسجيلات المطلوبة
+            chunk_size (int): عدد التسجيلات في كل دفعة
+            reference_date (datetime): تاريخ نهاية الفترة الزمنية (الافتراضي: الآن)
+
+        Yields:
+            pd.DataFrame: دفعة من البيانات التجريبية
+        """
+        base_date = (reference_date or datetime.now()) - timedelta(days=30)
+        for start in range(0, num_records, chunk_size):
+            yield self._generate_chunk(start, min(chunk_size, num_records - start), base_date)
 
-    def generate_mock_social_media_data(self, num_records: int = 1000) -> pd.DataFrame:
+    def generate_mock_social_media_data(self, num_records: int = 1000,
+                                        reference_date: Optional[datetime] = None) -> pd.DataFrame:
         """
         إنشاء بيانات تجريبية لمشروع تحليل وسائل التواصل الاجتماعي
 
         Args:
             num_records (int): عدد التسجيلات المطلوبة
+            reference_date (datetime): تاريخ نهاية الفترة الزمنية (الافتراضي: الآن)
 
         Returns:
             pd.DataFrame: بيانات تجريبية في DataFrame
         """
-        platforms = ['twitter', 'facebook', 'youtube', 'instagram']
-        authors = [f'user_{i}' for i in range(1, 101)]
-        hashtags = ['DataScience', 'AI', 'MachineLearning', 'BigData', 'DataEngineering', 'Python', 'SQL']
-
-        posts = []
-        base_date = datetime.now() - timedelta(days=30)
-
-        for i in range(num_records):
-            platform = random.choice(platforms)
-            post_date = base_date + timedelta(days=random.randint(0, 30),
-                                              hours=random.randint(0, 23))
-
-            # إنشاء محتوى عشوائي مع هاشتاجات
-            content_templates = [
-                "Check out this amazing {} tutorial! #{}",
-                "Just launched our new {} product. What do you think? #{}",
-                "The future of {} analytics is here. #{}",
-                "How {} is transforming industries. #{}",
-                "5 tips for becoming a better {} engineer. #{}",
-                "Latest trends in {} for 2024. #{}"
-            ]
-
-            topic = random.choice(['data', 'AI', 'machine learning', 'big data', 'data engineering'])
-            hashtag = random.choice(hashtags)
-            content_template = random.choice(content_templates)
-            content = content_template.format(topic, hashtag)
-
-            # إضافة هاشتاجات إضافية
-            additional_hashtags = random.sample(hashtags, random.randint(1, 3))
-            for extra_hashtag in additional_hashtags:
-                if extra_hashtag != hashtag:
-                    content += f" #{extra_hashtag}"
-
-            # إنشاء إحصائيات Engagement بناءً على المنصة
-            engagement_stats = self._generate_engagement_stats(platform)
-
-            posts.append({
-                'post_id': f'{platform}_{i}_{random.randint(1000, 9999)}',
-                'content': content,
-                'likes': engagement_stats['likes'],
-                'comments': engagement_stats['comments'],
-                'shares': engagement_stats['shares'],
-                'post_date': post_date,
-                'platform': platform,
-                'author_id': random.choice(authors),
-                'language': random.choice(['en', 'ar', 'es', 'fr']),
-                'hashtags': ', '.join([hashtag] + additional_hashtags)
-            })
-
-        df = pd.DataFrame(posts)
+        chunks = list(self.iter_mock_chunks(num_records, chunk_size=max(num_records, 1),
+                                            reference_date=reference_date))
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
         self.logger.info(f"تم إنشاء {len(df)} تسجيل تجريبي")
         return df
 
-    def _generate_engagement_stats(self, platform: str) -> Dict[str, int]:
-        """إنشاء إحصائيات engagement واقعية بناءً على المنصة"""
-        if platform == 'twitter':
-            return {
-                'likes': random.randint(5, 500),
-                'comments': random.randint(0, 100),
-                'shares': random.randint(0, 200)
-            }
-        elif platform == 'facebook':
-            return {
-                'likes': random.randint(10, 1000),
-                'comments': random.randint(0, 200),
-                'shares': random.randint(0, 300)
-            }
-        elif platform == 'youtube':
-            return {
-                'likes': random.randint(20, 5000),
-                'comments': random.randint(0, 500),
-                'shares': random.randint(0, 100)
-            }
-        else:  # instagram
-            return {
-                'likes': random.randint(50, 2000),
-                'comments': random.randint(0, 300),
-                'shares': random.randint(0, 150)
-            }
-
     def save_mock_data(self, df: pd.DataFrame, filepath: str):
         """حفظ البيانات التجريبية في ملف"""
         try:
@@ -110,11 +163,39 @@ class MockDataGenerator:
             self.logger.error(f"خطأ في حفظ البيانات: {str(e)}")
             raise
 
+    def stream_mock_data_to_parquet(self, num_records: int, filepath: str, chunk_size: int = 1_000_000,
+                                    reference_date: Optional[datetime] = None) -> int:
+        """كتابة البيانات التجريبية مباشرة إلى ملف Parquet دفعة بدفعة دون تحميلها كاملة في الذاكرة"""
+        import os
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        writer = None
+        written = 0
+        try:
+            for chunk in self.iter_mock_chunks(num_records, chunk_size, reference_date):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(filepath, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+                self.logger.info(f"تمت كتابة {written} من {num_records} تسجيل في {filepath}")
+        except Exception as e:
+            self.logger.error(f"خطأ في حفظ البيانات: {str(e)}")
+            raise
+        finally:
+            if writer is not None:
+                writer.close()
+        return written
+
 
 # دالة مساعدة للاستخدام المباشر
-def generate_and_save_mock_data(num_records: int = 1000, output_path: str = "data/raw/mock_social_media_data.csv"):
+def generate_and_save_mock_data(num_records: int = 1000, output_path: str = "data/raw/mock_social_media_data.csv",
+                                seed: Optional[int] = None):
     """إنشاء وحفظ بيانات تجريبية"""
-    generator = MockDataGenerator()
+    generator = MockDataGenerator(seed)
+    if output_path.endswith('.parquet'):
+        return generator.stream_mock_data_to_parquet(num_records, output_path)
     mock_data = generator.generate_mock_social_media_data(num_records)
     generator.save_mock_data(mock_data, output_path)
     return mock_data
@@ -122,4 +203,4 @@ def generate_and_save_mock_data(num_records: int = 1000, output_path: str = "dat
 
 if __name__ == "__main__":
     # عند التشغيل المباشر، إنشاء بيانات تجريبية
-    generate_and_save_mock_data(1000)
\ No newline at end of file
+    generate_and_save_mock_data(1000)
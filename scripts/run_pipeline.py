@@ -4,14 +4,57 @@ import argparse
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.pipeline.main import main
+from src.api.registry import CLIENTS
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Run Social Media Analytics Pipeline')
     parser.add_argument('--debug', action='store_true',
                        help='Enable debug mode with detailed logging')
+    parser.add_argument('--concurrent', action='store_true',
+                       help='Fetch all platforms in parallel instead of one after another')
+    parser.add_argument('--timeout', type=float, default=None,
+                       help='Per-platform fetch timeout in seconds (defaults to APIConfig values)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only collect posts newer than the last run and merge them into the stored dataset')
+    parser.add_argument('--columnar', choices=['pandas', 'arrow'], default='pandas',
+                       help='In-memory format used from collection to storage')
+    parser.add_argument('--profile-stage', default=None,
+                       choices=['collect', 'process', 'analyze', 'collect_process', 'write_raw', 'write_processed',
+                                'refresh', 'load_warehouse', 'write_daily_metrics', 'write_top_posts_overall',
+                                'write_top_posts_platform'],
+                       help='Dump a cProfile of this stage next to the run report in data/reports')
+    parser.add_argument('--trace-memory', action='store_true',
+                       help='Record per-stage peak Python heap with tracemalloc (slower)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                       help='Stream collection, processing and storage in chunks of this many rows')
+    parser.add_argument('--analytics-backend', choices=['pandas', 'process', 'polars', 'duckdb'], default='pandas',
+                       help='Engine used for daily metrics and moving averages (polars/duckdb must be installed)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for --analytics-backend process (defaults to the CPU count)')
+    parser.add_argument('--warehouse', choices=['sqlite', 'duckdb', 'none'], default='sqlite',
+                       help='Embedded warehouse loaded with every processed batch (data/warehouse.db or data/warehouse.duckdb)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Serve repeated API requests from the on-disk response cache (data/cache/responses.db)')
+    parser.add_argument('--offline', action='store_true',
+                       help='Replay cached API responses only, without any network calls')
+    parser.add_argument('--refresh-stats', action='store_true',
+                       help='Re-query likes/comments/shares of recent stored posts instead of collecting new ones')
+    parser.add_argument('--no-dedup', action='store_true',
+                       help='Store every collected post, even if it is unchanged since a previous run '
+                            '(stored trending-topic and author/percentile sketches are not updated)')
+    parser.add_argument('--platforms', nargs='+', choices=list(CLIENTS), default=None,
+                       help='Platforms to collect from (default: those enabled in config/api_config.py)')
+    parser.add_argument('--data-root', default=None,
+                       help='Directory holding every dataset, state file and report '
+                            '(default: $SOCIAL_MEDIA_DATA_ROOT, else data)')
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_arguments()
-    main()
\ No newline at end of file
+    from src.pipeline.main import main
+    main(concurrent=args.concurrent, fetch_timeout=args.timeout, incremental=args.incremental,
+         columnar=args.columnar, profile_stage=args.profile_stage, trace_memory=args.trace_memory,
+         chunk_size=args.chunk_size, analytics_backend=args.analytics_backend, analytics_workers=args.workers,
+         warehouse=None if args.warehouse == 'none' else args.warehouse, response_cache=args.cache,
+         offline=args.offline, refresh_stats=args.refresh_stats, dedup=not args.no_dedup,
+         platforms=args.platforms, data_root=args.data_root)
\ No newline at end of file
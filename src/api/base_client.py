@@ -2,38 +2,261 @@ from abc import ABC, abstractmethod
 import pandas as pd
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator
 import time
+import threading
+from .transport import HTTPTransport, AsyncHTTPTransport, TransportError, shared_transport, redact_secrets
+from .rate_limiter import get_rate_limiter, QuotaExceeded
+from .response_cache import CacheMiss
 
 class BaseAPIClient(ABC):
+    request_timeout = 60
+    max_retries = 3
+    THROTTLE_MARKERS = ('rateLimitExceeded', 'userRateLimitExceeded')
+    # The daily quota only resets the next day, so retrying just burns the rest of the run
+    QUOTA_MARKERS = ('quotaExceeded', 'dailyLimitExceeded')
+    STATS_BATCH_SIZE = 50
+    # Clients that can look up current statistics by post id set this and implement _fetch_stats_batch
+    supports_stats_refresh = False
+    STATS_COLUMNS = ['post_id', 'likes', 'comments', 'shares']
+
     def __init__(self, platform_name: str):
         self.platform_name = platform_name
         self.logger = logging.getLogger(f"{platform_name}_client")
+        self.state_store = None
+        self.pending_watermarks = {}
+        self._watermark_owner = None
+        self.rate_limiter = get_rate_limiter(platform_name)
+        self.response_cache = None
+        self.cache_ttls = {}
+        self.stats_concurrency = 1
 
     @abstractmethod
     def _make_request(self, endpoint: str, params: Dict[str, Any] = None):
         pass
 
     @abstractmethod
-    def _transform_response(self, raw_data: Any) -> List[Dict[str, Any]]:
+    def _transform_response(self, raw_data: Any) -> pd.DataFrame:
         pass
 
     def fetch_data(self, **kwargs) -> pd.DataFrame:
         try:
             self.logger.info(f"Fetching data from {self.platform_name}")
             raw_data = self._make_request(**kwargs)
-            transformed_data = self._transform_response(raw_data)
-            df = pd.DataFrame(transformed_data)
+            df = self._transform_response(raw_data)
             if not df.empty:
                 df['platform'] = self.platform_name
                 df['collected_at'] = datetime.now()
             self.logger.info(f"Successfully fetched {len(df)} records from {self.platform_name}")
             return df
         except Exception as e:
-            self.logger.error(f"Error fetching data from {self.platform_name}: {str(e)}")
+            self.logger.error(f"Error fetching data from {self.platform_name}: {redact_secrets(e)}")
             return pd.DataFrame()
 
-    def _handle_rate_limit(self, reset_time: int):
-        sleep_time = max(reset_time - time.time(), 0) + 1
-        self.logger.warning(f"Rate limit exceeded. Sleeping for {sleep_time:.2f} seconds")
-        time.sleep(sleep_time)
\ No newline at end of file
+    def iter_batches(self, chunk_size: int = 10_000) -> Iterator[pd.DataFrame]:
+        df = self.fetch_data()
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+    def fetch_arrow(self, **kwargs):
+        from src.core.columnar import RecordBatchBuilder, RAW_SCHEMA
+        try:
+            self.logger.info(f"Fetching data from {self.platform_name} (arrow)")
+            raw_data = self._make_request(**kwargs)
+            builder = RecordBatchBuilder(self.platform_name)
+            builder.extend_frame(self._transform_response(raw_data))
+            table = builder.finish()
+            self.logger.info(f"Successfully fetched {table.num_rows} records from {self.platform_name}")
+            return table
+        except Exception as e:
+            self.logger.error(f"Error fetching data from {self.platform_name}: {redact_secrets(e)}")
+            return RAW_SCHEMA.empty_table()
+
+    def _fetch_stats_batch_safe(self, post_ids: List[str]) -> List[Dict[str, Any]]:
+        try:
+            return self._fetch_stats_batch(post_ids)
+        except QuotaExceeded:
+            raise
+        except Exception as e:
+            self.logger.error(f"Statistics refresh failed for {len(post_ids)} {self.platform_name} posts: "
+                              f"{redact_secrets(e)}")
+            return []
+
+    def refresh_stats(self, post_ids: List[str]) -> pd.DataFrame:
+        if not self.supports_stats_refresh:
+            self.logger.warning(f"{self.platform_name} does not support statistics refresh")
+            return pd.DataFrame(columns=self.STATS_COLUMNS)
+        if self.offline:
+            # Current statistics are only worth having fresh, so they are never cached to replay
+            self.logger.warning(f"Skipping {self.platform_name} statistics refresh in offline mode")
+            return pd.DataFrame(columns=self.STATS_COLUMNS)
+        batches = [post_ids[start:start + self.STATS_BATCH_SIZE]
+                   for start in range(0, len(post_ids), self.STATS_BATCH_SIZE)]
+        if self.stats_concurrency > 1 and len(batches) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=self.stats_concurrency,
+                                    thread_name_prefix=f"{self.platform_name}_stats") as executor:
+                results = list(executor.map(self._fetch_stats_batch_safe, batches))
+        else:
+            results = [self._fetch_stats_batch_safe(batch) for batch in batches]
+        rows = [row for batch in results for row in batch]
+        self.logger.info(f"Refreshed statistics for {len(rows)}/{len(post_ids)} {self.platform_name} posts "
+                         f"in {len(batches)} requests")
+        return pd.DataFrame(rows, columns=self.STATS_COLUMNS)
+
+    @property
+    def transport(self) -> HTTPTransport:
+        return shared_transport()
+
+    @property
+    def offline(self) -> bool:
+        return self.response_cache is not None and self.response_cache.offline
+
+    def _require_online(self, what: str):
+        if self.offline:
+            raise CacheMiss(f"No cached {self.platform_name} {what} response to replay offline")
+
+    def _acquire(self, cost: float = 1):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(cost)
+
+    def _is_throttled(self, error: TransportError) -> bool:
+        return error.status == 429 or any(marker in str(error) for marker in self.THROTTLE_MARKERS)
+
+    def _check_quota(self, error: Exception):
+        if isinstance(error, TransportError) and any(marker in str(error) for marker in self.QUOTA_MARKERS):
+            self.logger.error(f"Daily {self.platform_name} quota exhausted, stopping")
+            raise QuotaExceeded(f"{self.platform_name} quota exhausted: {error}") from error
+
+    def _cached_response(self, endpoint: Optional[str], url: str, params: Optional[Dict[str, Any]]):
+        if self.response_cache is None or endpoint is None:
+            return None, None
+        key = self.response_cache.make_key(self.platform_name, endpoint, url, params)
+        entry = self.response_cache.get(key, self.cache_ttls.get(endpoint, 0))
+        if entry is None:
+            self._require_online(endpoint)
+        return key, entry
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None, cost: float = 1,
+                  endpoint: Optional[str] = None) -> Dict[str, Any]:
+        key, entry = self._cached_response(endpoint, url, params)
+        return self._fetch_json(url, params, headers, cost, endpoint, key, entry)
+
+    def _fetch_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                    headers: Optional[Dict[str, str]] = None, cost: float = 1, endpoint: Optional[str] = None,
+                    key: Optional[str] = None, entry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # key and entry come from a cache lookup the caller already made; without a key nothing is cached
+        if entry is not None and (entry['fresh'] or self.offline):
+            return entry['body']
+        # Requests without an endpoint are never cached, so offline there is nothing to replay
+        self._require_online(endpoint or 'uncached')
+        for attempt in range(self.max_retries + 1):
+            self._acquire(cost)
+            try:
+                response, etag = self.transport.get_json_conditional(
+                    url, params, headers, timeout=self.request_timeout, etag=entry['etag'] if entry else None)
+            except TransportError as e:
+                self._check_quota(e)
+                if not self._is_throttled(e) or attempt == self.max_retries:
+                    raise
+                self._handle_rate_limit(retry_after=e.retry_after)
+                continue
+            if self.rate_limiter is not None:
+                self.rate_limiter.succeeded()
+            if key is not None:
+                if response is None:
+                    self.response_cache.touch(key)
+                    return entry['body']
+                self.response_cache.put(key, self.platform_name, endpoint, response, etag)
+            return response
+
+    def _get_json_many(self, requests_: List[tuple], concurrency: int = 8, cost: float = 1,
+                       endpoint: Optional[str] = None) -> List[Dict[str, Any]]:
+        responses = [None] * len(requests_)
+        cold = []
+        for i, (url, params) in enumerate(requests_):
+            key, entry = self._cached_response(endpoint, url, params)
+            if entry is not None:
+                # Fresh hits and ETag revalidations are cheap; only cold requests fan out concurrently
+                responses[i] = self._fetch_json(url, params, cost=cost, endpoint=endpoint, key=key, entry=entry)
+            else:
+                cold.append((i, key))
+        if not cold:
+            return responses
+        self._require_online(endpoint or 'uncached')
+        for _ in cold:
+            self._acquire(cost)
+        fetched = AsyncHTTPTransport(self.request_timeout, concurrency).get_json_many(
+            [requests_[i] for i, _ in cold], return_exceptions=True)
+        failed = [n for n, response in enumerate(fetched) if isinstance(response, BaseException)]
+        for n in failed:
+            self._check_quota(fetched[n])
+            if not isinstance(fetched[n], TransportError) or not self._is_throttled(fetched[n]):
+                raise fetched[n]
+        if failed:
+            self._handle_rate_limit(retry_after=max((fetched[n].retry_after for n in failed
+                                                     if fetched[n].retry_after is not None), default=None))
+            # Only the throttled requests go out again; the rest of the batch already succeeded and was paid for
+            for n in failed:
+                fetched[n] = self._fetch_json(*requests_[cold[n][0]], cost=cost)
+        elif self.rate_limiter is not None:
+            self.rate_limiter.succeeded()
+        for (i, key), response in zip(cold, fetched):
+            if key is not None:
+                self.response_cache.put(key, self.platform_name, endpoint, response, response.get('etag'))
+            responses[i] = response
+        return responses
+
+    def _handle_rate_limit(self, reset_time: Optional[float] = None, retry_after: Optional[float] = None):
+        if retry_after is None and reset_time is not None:
+            retry_after = max(reset_time - time.time(), 0) + 1
+        if self.rate_limiter is None:
+            sleep_time = retry_after if retry_after is not None else 60
+            self.logger.warning(f"Rate limit exceeded. Sleeping for {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
+            return
+        self.logger.warning(f"Rate limit exceeded on {self.platform_name}, slowing down")
+        self.rate_limiter.throttled(retry_after)
+
+    def _get_watermark(self, source: str) -> Optional[Dict[str, Any]]:
+        if self.state_store is None:
+            return None
+        return self.state_store.get_watermark(self.platform_name, source)
+
+    def begin_watermarks(self):
+        self.pending_watermarks = {}
+        self._watermark_owner = threading.get_ident()
+
+    def discard_watermarks(self):
+        # A fetch thread that outlived its timeout keeps staging; nothing is accepted until the next begin
+        self.pending_watermarks = {}
+        self._watermark_owner = -1
+
+    def _stage_watermark(self, source: str, df: pd.DataFrame):
+        if self.state_store is None or self._watermark_owner not in (None, threading.get_ident()):
+            return
+        if not isinstance(df, pd.DataFrame):
+            df = df.select(['post_id', 'post_date']).to_pandas()
+        if df.empty or 'post_date' not in df.columns:
+            return
+        post_dates = pd.to_datetime(df['post_date'], errors='coerce')
+        if post_dates.isna().all():
+            return
+        newest = post_dates.idxmax()
+        post_date = post_dates[newest].to_pydatetime()
+        current = self.pending_watermarks.get(source)
+        if current is None or post_date > current[0]:
+            self.pending_watermarks[source] = (post_date, str(df.at[newest, 'post_id']))
+
+    def _unstage_watermark(self, source: str):
+        # The fetch left a gap below the newest post; the old watermark must stay so the gap is fetched again
+        if self._watermark_owner in (None, threading.get_ident()):
+            self.pending_watermarks.pop(source, None)
+
+    def commit_watermarks(self):
+        if self.state_store is None:
+            return
+        for source, (post_date, post_id) in self.pending_watermarks.items():
+            self.state_store.update_watermark(self.platform_name, source, post_date, post_id)
+        self.pending_watermarks = {}
\ No newline at end of file
@@ -1,6 +1,8 @@
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterator, Tuple
 from .base_client import BaseAPIClient
+from .transport import TransportError, redact_secrets
+from .transform import flatten_records, build_frame
 from config.credentials import Credentials
 from config.api_config import APIConfig
 import logging
@@ -8,9 +10,25 @@ from datetime import datetime, timedelta
 import random
 
 class FacebookClient(BaseAPIClient):
+    GRAPH_URL = "https://graph.facebook.com"
+    supports_stats_refresh = True
+    # Graph API application, user, page and custom rate limit error codes
+    THROTTLE_MARKERS = ('"code":4,', '"code":17,', '"code":32,', '"code":613,')
+    TRANSFORM_FIELDS = {
+        'post_id': 'id',
+        'content': 'message',
+        'likes': 'likes.summary.total_count',
+        'comments': 'comments.summary.total_count',
+        'shares': 'shares.count',
+        'post_date': 'created_time'
+    }
+
     def __init__(self):
         super().__init__("facebook")
         self.logger = logging.getLogger("facebook_client")
+        self.config = APIConfig.load_config().facebook
+        self.request_timeout = self.config.get('timeout', self.request_timeout)
+        self.cache_ttls = self.config.get('cache_ttl', {})
         self.access_token = Credentials.FACEBOOK_ACCESS_TOKEN
         self.use_mock_data = not self._validate_token()
         if self.use_mock_data:
@@ -23,18 +41,60 @@ class FacebookClient(BaseAPIClient):
             return False
         return True
 
-    def _make_request(self, page_id: str) -> Dict[str, Any]:
+    def _make_request(self, page_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
         if self.use_mock_data:
-            return self._generate_mock_data(page_id)
-        else:
-            return {}
+            return self._generate_mock_data(page_id, since)
+        return self._fetch_page_posts(page_id, since)
+
+    def _fetch_page_posts(self, page_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+        posts = []
+        url = f"{self.GRAPH_URL}/{self.config.get('api_version', 'v19.0')}/{page_id}/posts"
+        params = {
+            'fields': self.config['fields'],
+            'limit': self.config['limit'],
+            'access_token': self.access_token,
+            'since': int(since.timestamp()) if since else None
+        }
+        try:
+            for _ in range(self.config.get('max_pages', 1)):
+                response = self._get_json(url, params, endpoint='posts')
+                posts.extend(response.get('data', []))
+                url = response.get('paging', {}).get('next')
+                if not url or not response.get('data'):
+                    break
+                params = None
+        except TransportError as e:
+            self.logger.error(f"Graph API error for page {page_id}: {redact_secrets(e)}")
+        return {'data': posts}
 
-    def _generate_mock_data(self, page_id: str) -> Dict[str, Any]:
+    def _fetch_stats_batch(self, post_ids: List[str]) -> List[Dict[str, Any]]:
+        if self.use_mock_data:
+            return []
+        response = self._get_json(f"{self.GRAPH_URL}/{self.config.get('api_version', 'v19.0')}/", {
+            'ids': ",".join(post_ids),
+            'fields': "likes.summary(true),comments.summary(true),shares",
+            'access_token': self.access_token
+        })
+        return [{
+            'post_id': post_id,
+            'likes': post.get('likes', {}).get('summary', {}).get('total_count', 0),
+            'comments': post.get('comments', {}).get('summary', {}).get('total_count', 0),
+            'shares': post.get('shares', {}).get('count', 0) if post.get('shares') else 0
+        } for post_id, post in response.items()]
+
+    def _generate_mock_data(self, page_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
         try:
             mock_posts = []
-            base_date = datetime.now() - timedelta(days=30)
-            for i in range(15):
-                post_date = base_date + timedelta(days=random.randint(0, 30))
+            now = datetime.now()
+            base_date = now - timedelta(days=30)
+            if since and since > base_date:
+                base_date = since
+            window_seconds = int((now - base_date).total_seconds())
+            if window_seconds <= 0:
+                return {'data': []}
+            num_posts = max(1, round(15 * window_seconds / timedelta(days=30).total_seconds()))
+            for i in range(num_posts):
+                post_date = base_date + timedelta(seconds=random.randint(1, window_seconds))
                 content_options = [
                     "Exciting news from our team! Stay tuned for updates.",
                     "Check out our latest product release!",
@@ -49,7 +109,7 @@ class FacebookClient(BaseAPIClient):
                 ]
                 content = random.choice(content_options)
                 mock_posts.append({
-                    'id': f"{page_id}_{i}",
+                    'id': f"{page_id}_{int(post_date.timestamp())}{i}",
                     'message': content,
                     'created_time': post_date.isoformat() + 'Z',
                     'likes': {'summary': {'total_count': random.randint(50, 2000)}},
@@ -61,54 +121,63 @@ class FacebookClient(BaseAPIClient):
             self.logger.error(f"Error generating mock data: {e}")
             return {}
 
-    def _transform_response(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        transformed = []
-        if not raw_data or 'data' not in raw_data:
-            return transformed
-        for post in raw_data.get('data', []):
-            try:
-                likes_count = post.get('likes', {}).get('summary', {}).get('total_count', 0)
-                comments_count = post.get('comments', {}).get('summary', {}).get('total_count', 0)
-                shares_count = post.get('shares', {}).get('count', 0) if post.get('shares') else 0
-                created_time = post.get('created_time', '')
-                if created_time:
-                    dt = datetime.fromisoformat(created_time.replace('Z', '+00:00'))
-                    created_time_naive = dt.replace(tzinfo=None)
-                else:
-                    created_time_naive = None
-                transformed.append({
-                    'post_id': post['id'],
-                    'content': post.get('message', ''),
-                    'likes': likes_count,
-                    'comments': comments_count,
-                    'shares': shares_count,
-                    'post_date': created_time_naive,
-                    'author_id': post['id'].split('_')[0] if '_' in post['id'] else post['id'],
-                    'author_name': f"page_{post['id'].split('_')[0]}" if '_' in post['id'] else "unknown"
-                })
-            except Exception as e:
-                self.logger.warning(f"Failed to transform Facebook post: {e}")
-                continue
-        return transformed
+    def _transform_response(self, raw_data: Dict[str, Any]) -> pd.DataFrame:
+        posts = (raw_data or {}).get('data') or []
+        flat = flatten_records(posts, list(self.TRANSFORM_FIELDS.values()))
+        df = build_frame(flat, self.TRANSFORM_FIELDS, 'ISO8601', self.logger, "Facebook posts")
+        if not df.empty:
+            # Page post ids are "<page id>_<post id>"
+            df['author_id'] = df['post_id'].str.replace(r'_.*$', '', regex=True)
+            df['author_name'] = ("page_" + df['author_id']).where(df['post_id'].str.contains('_', regex=False),
+                                                                   "unknown")
+        return df
 
-    def fetch_data(self) -> pd.DataFrame:
-        all_data = []
-        config = APIConfig.load_config().facebook
-        for page_id in config['page_ids']:
+    def _iter_pages(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        for page_id in self.config['page_ids']:
             try:
                 self.logger.info(f"Processing Facebook page: {page_id}")
-                raw_data = self._make_request(page_id)
+                watermark = self._get_watermark(page_id)
+                since = watermark['post_date'] if watermark else None
+                raw_data = self._make_request(page_id, since)
                 if raw_data:
                     page_data = self._transform_response(raw_data)
-                    if page_data:
-                        df = pd.DataFrame(page_data)
-                        all_data.append(df)
-                        self.logger.info(f"Collected {len(df)} posts from page {page_id}")
+                    if since is not None:
+                        page_data = page_data[page_data['post_date'] > since].reset_index(drop=True)
+                    if not page_data.empty:
+                        self.logger.info(f"Collected {len(page_data)} posts from page {page_id}")
+                        yield page_id, page_data
             except Exception as e:
-                self.logger.error(f"Error processing page {page_id}: {e}")
+                self.logger.error(f"Error processing page {page_id}: {redact_secrets(e)}")
                 continue
+
+    def fetch_data(self) -> pd.DataFrame:
+        all_data = []
+        for page_id, page_data in self._iter_pages():
+            self._stage_watermark(page_id, page_data)
+            all_data.append(page_data)
         if all_data:
-            return pd.concat(all_data, ignore_index=True)
+            df = pd.concat(all_data, ignore_index=True)
+            df['platform'] = self.platform_name
+            df['collected_at'] = datetime.now()
+            return df
         else:
             self.logger.warning("No data collected from any Facebook page")
-            return pd.DataFrame()
\ No newline at end of file
+            return pd.DataFrame()
+
+    def iter_batches(self, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        for page_id, df in self._iter_pages():
+            self._stage_watermark(page_id, df)
+            df['platform'] = self.platform_name
+            df['collected_at'] = datetime.now()
+            yield df
+
+    def fetch_arrow(self):
+        from src.core.columnar import RecordBatchBuilder
+        builder = RecordBatchBuilder(self.platform_name)
+        for page_id, page_data in self._iter_pages():
+            self._stage_watermark(page_id, page_data)
+            builder.extend_frame(page_data)
+        table = builder.finish()
+        if not table.num_rows:
+            self.logger.warning("No data collected from any Facebook page")
+        return table
\ No newline at end of file
@@ -0,0 +1,91 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+class QuotaExceeded(Exception):
+    pass
+
+class TokenBucket:
+    # Without rate_burst a client may only burst one minute's worth of its window, not the whole quota
+    DEFAULT_BURST_SECONDS = 60
+
+    def __init__(self, rate: float, window: float, burst: Optional[float] = None, min_rate_fraction: float = 0.05,
+                 max_backoff: float = 900, store=None, key: Optional[str] = None,
+                 clock: Callable[[], float] = time.monotonic, wall_clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.base_rate = rate / window
+        self.rate = self.base_rate
+        self.capacity = max(1.0, burst if burst is not None else self.base_rate * self.DEFAULT_BURST_SECONDS)
+        self.tokens = self.capacity
+        # With a store the tokens live in its database, so spending survives restarts and is shared by processes
+        self.store = store
+        self.key = key
+        self.min_rate = self.base_rate * min_rate_fraction
+        self.max_backoff = max_backoff
+        self.blocked_until = 0.0
+        self.throttle_streak = 0
+        # Other processes share the store, so its refills are timed by the wall clock, not this process's
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.sleep = sleep
+        self.updated = self.clock()
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger("rate_limiter")
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, cost: float = 1) -> float:
+        # Takes the tokens now (possibly going negative) and returns how long the caller must wait,
+        # so concurrent callers queue up behind each other instead of racing for the same refill
+        with self.lock:
+            now = self.clock()
+            if self.store is not None:
+                self.tokens = self.store.consume_tokens(self.key, cost, self.rate, self.capacity, self.wall_clock())
+            else:
+                self._refill(now)
+                self.tokens -= cost
+            wait = max(self.blocked_until - now, 0.0)
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def acquire(self, cost: float = 1) -> float:
+        wait = self.reserve(cost)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def throttled(self, retry_after: Optional[float] = None):
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            self.throttle_streak += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            backoff = retry_after if retry_after is not None else min(self.max_backoff, 2 ** self.throttle_streak)
+            self.blocked_until = max(self.blocked_until, now + backoff)
+            self.logger.warning(f"Throttled by the API; backing off {backoff:.1f}s, "
+                                f"rate now {self.rate * 60:.2f} requests/min")
+
+    def succeeded(self):
+        with self.lock:
+            self.throttle_streak = 0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(platform: str) -> Optional[TokenBucket]:
+    from config.api_config import APIConfig
+    from src.core.state_store import StateStore
+    with _limiters_lock:
+        if platform not in _limiters:
+            config = getattr(APIConfig.load_config(), platform, {}) or {}
+            if not config.get('rate_limit'):
+                return None
+            _limiters[platform] = TokenBucket(config['rate_limit'], config.get('rate_window', 900),
+                                              config.get('rate_burst'), store=StateStore(), key=platform)
+        return _limiters[platform]
@@ -0,0 +1,53 @@
+import importlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+CLIENTS = {
+    'youtube': 'src.api.youtube_client:YouTubeClient',
+    'facebook': 'src.api.facebook_client:FacebookClient',
+    'twitter': 'src.api.twitter_client:TwitterClient'
+}
+
+_classes: Dict[str, type] = {}
+_classes_lock = threading.Lock()
+logger = logging.getLogger("client_registry")
+
+def register_client(platform: str, target: str):
+    with _classes_lock:
+        CLIENTS[platform] = target
+        _classes.pop(platform, None)
+
+def get_client_class(platform: str) -> type:
+    with _classes_lock:
+        if platform not in _classes:
+            if platform not in CLIENTS:
+                raise KeyError(f"No client registered for platform '{platform}'")
+            module_name, class_name = CLIENTS[platform].split(':')
+            _classes[platform] = getattr(importlib.import_module(module_name), class_name)
+        return _classes[platform]
+
+def platform_config(platform: str) -> Dict:
+    from config.api_config import APIConfig
+    return getattr(APIConfig.load_config(), platform, {}) or {}
+
+def enabled_platforms(platforms: Optional[List[str]] = None) -> List[str]:
+    if platforms is not None:
+        return list(platforms)
+    return [platform for platform in CLIENTS if platform_config(platform).get('enabled', True)]
+
+def create_client(platform: str):
+    return get_client_class(platform)()
+
+def create_clients(platforms: Optional[List[str]] = None) -> Dict[str, object]:
+    clients = {}
+    for platform in enabled_platforms(platforms):
+        try:
+            clients[platform] = create_client(platform)
+            logger.info(f"{platform} client loaded successfully")
+        except Exception as e:
+            if platform_config(platform).get('required', False):
+                logger.error(f"{platform} client not available: {e}")
+                raise
+            logger.warning(f"{platform} client not available: {e}")
+    return clients
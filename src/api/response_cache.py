@@ -0,0 +1,92 @@
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, parse_qsl
+from typing import Dict, Any, Optional
+from .transport import SECRET_PARAMS
+from src.core.utils import data_path
+
+class CacheMiss(LookupError):
+    pass
+
+class ResponseCache:
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024,
+                 offline: bool = False):
+        self.path = path or data_path('cache', 'responses.db')
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.logger = logging.getLogger("response_cache")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, platform TEXT NOT NULL, endpoint TEXT NOT NULL, etag TEXT, "
+                "body BLOB NOT NULL, size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_by_access ON responses (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(platform: str, endpoint: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query))
+        query.update({name: str(value) for name, value in (params or {}).items() if value is not None})
+        query = {name: value for name, value in query.items() if name not in SECRET_PARAMS}
+        raw = json.dumps([platform, endpoint, f"{parts.netloc}{parts.path}", sorted(query.items())])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT etag, body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        fresh = time.time() - row[2] < ttl
+        if fresh:
+            self.hits += 1
+        return {'etag': row[0], 'body': json.loads(gzip.decompress(row[1])), 'fresh': fresh}
+
+    def put(self, key: str, platform: str, endpoint: str, body: Dict[str, Any], etag: Optional[str] = None):
+        blob = gzip.compress(json.dumps(body).encode())
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, platform, endpoint, etag, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, platform, endpoint, etag, blob, len(blob), now, now)
+            )
+            self._evict(conn)
+
+    def touch(self, key: str):
+        self.revalidated += 1
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self.logger.info(f"Evicted {evicted} least recently used responses")
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated}
\ No newline at end of file
@@ -0,0 +1,81 @@
+import logging
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence
+
+RAW_COLUMNS = ['post_id', 'content', 'likes', 'comments', 'shares', 'post_date', 'author_id', 'author_name']
+STAT_COLUMNS = ['likes', 'comments', 'shares']
+TEXT_DEFAULTS = {'content': '', 'author_id': '', 'author_name': ''}
+
+def _flatten_arrow(records: Sequence[Dict[str, Any]], paths: Sequence[str]) -> Optional[pd.DataFrame]:
+    import pyarrow as pa
+    try:
+        table = pa.Table.from_struct_array(pa.array(records))
+        while any(pa.types.is_struct(field.type) for field in table.schema):
+            table = table.flatten()
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Payloads whose fields change type between items cannot be one Arrow struct
+        return None
+    columns = {path: table.column(path).to_pandas() if path in table.column_names else None for path in paths}
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(records)))
+
+def flatten_records(records: Sequence[Any], paths: Sequence[str]) -> pd.DataFrame:
+    if records and isinstance(records[0], dict):
+        flat = _flatten_arrow(records, paths)
+        if flat is not None:
+            return flat
+    # Walks the payload one column at a time; each nesting level is resolved once and shared by its children
+    levels = {'': list(records)}
+    for path in paths:
+        parent = ''
+        for key in path.split('.'):
+            current = f"{parent}.{key}" if parent else key
+            if current not in levels:
+                levels[current] = [value.get(key) if isinstance(value, dict) else getattr(value, key, None)
+                                   for value in levels[parent]]
+            parent = current
+    return pd.DataFrame({path: levels[path] for path in paths}, index=pd.RangeIndex(len(records)))
+
+def _blank_to_null(values: pd.Series) -> pd.Series:
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        return values.where(values != '')
+    return values
+
+def build_frame(flat: pd.DataFrame, fields: Dict[str, Optional[str]], date_format: str,
+                logger: Optional[logging.Logger] = None, label: str = "items") -> pd.DataFrame:
+    columns = {}
+    malformed = {}
+    for name in RAW_COLUMNS:
+        source = fields.get(name)
+        if source is None or source not in flat.columns:
+            if name in STAT_COLUMNS:
+                columns[name] = pd.Series(0, index=flat.index, dtype='int64')
+            elif name == 'post_date':
+                columns[name] = pd.Series(pd.NaT, index=flat.index, dtype='datetime64[ns]')
+            else:
+                columns[name] = pd.Series(TEXT_DEFAULTS.get(name), index=flat.index, dtype=object)
+            continue
+        values = flat[source]
+        if name in STAT_COLUMNS:
+            numbers = pd.to_numeric(values, errors='coerce')
+            malformed[name] = numbers.isna() & values.notna()
+            columns[name] = numbers.fillna(0).astype('int64')
+        elif name == 'post_date':
+            values = _blank_to_null(values)
+            parsed = pd.to_datetime(values, format=date_format, errors='coerce', utc=True).dt.tz_convert(None)
+            malformed[name] = parsed.isna() & values.notna()
+            columns[name] = parsed
+        elif name == 'post_id':
+            malformed[name] = values.isna()
+            columns[name] = values.astype(str).where(values.notna())
+        else:
+            columns[name] = values.where(values.notna(), TEXT_DEFAULTS.get(name))
+    df = pd.DataFrame(columns)
+    if malformed:
+        bad = pd.concat(malformed, axis=1)
+        dropped = bad.any(axis=1)
+        if dropped.any():
+            reasons = ", ".join(f"{int(count)} bad {name}" for name, count in bad.sum().items() if count)
+            if logger is not None:
+                logger.warning(f"Dropped {int(dropped.sum())} of {len(df)} malformed {label} ({reasons})")
+            df = df[~dropped.to_numpy()].reset_index(drop=True)
+    return df
@@ -0,0 +1,110 @@
+import re
+import asyncio
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    # Google APIs only gzip responses for user agents that mention gzip
+    'User-Agent': 'social-media-analytics/1.0 (gzip)'
+}
+
+SECRET_PARAMS = {'key', 'access_token', 'appsecret_proof'}
+_SECRET_VALUES = re.compile(r"\b(" + "|".join(sorted(SECRET_PARAMS)) + r")=[^&\s'\"]+")
+
+def redact_secrets(text) -> str:
+    # API keys and tokens travel in query strings, and connection errors quote the full URL
+    return _SECRET_VALUES.sub(r'\1=REDACTED', str(text))
+
+class TransportError(Exception):
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+
+def _retry_after(headers) -> Optional[float]:
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+def _clean_params(params: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if params is None:
+        return None
+    return {key: value for key, value in params.items() if value is not None}
+
+class HTTPTransport:
+    def __init__(self, timeout: float = 60, pool_size: int = 16):
+        self.timeout = timeout
+        self.logger = logging.getLogger("transport")
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.get_json_conditional(url, params, headers, timeout)[0]
+
+    def get_json_conditional(self, url: str, params: Optional[Dict[str, Any]] = None,
+                             headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                             etag: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        if etag:
+            headers = {**(headers or {}), 'If-None-Match': etag}
+        try:
+            response = self.session.get(url, params=_clean_params(params), headers=headers,
+                                        timeout=timeout or self.timeout)
+        except requests.RequestException as e:
+            raise type(e)(redact_secrets(e)) from None
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code >= 400:
+            raise TransportError(response.status_code, response.text[:500], _retry_after(response.headers))
+        body = response.json()
+        return body, response.headers.get('ETag') or (body.get('etag') if isinstance(body, dict) else None)
+
+    def close(self):
+        self.session.close()
+
+class AsyncHTTPTransport:
+    def __init__(self, timeout: float = 60, concurrency: int = 8):
+        self.timeout = timeout
+        self.concurrency = concurrency
+
+    async def _get_json(self, session, semaphore, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        async with semaphore:
+            async with session.get(url, params=_clean_params(params)) as response:
+                if response.status >= 400:
+                    raise TransportError(response.status, (await response.text())[:500],
+                                         _retry_after(response.headers))
+                return await response.json(content_type=None)
+
+    async def _gather(self, requests_: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+                      return_exceptions: bool = False) -> List[Dict[str, Any]]:
+        import aiohttp
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=DEFAULT_HEADERS) as session:
+            return await asyncio.gather(*(self._get_json(session, semaphore, url, params)
+                                          for url, params in requests_), return_exceptions=return_exceptions)
+
+    def get_json_many(self, requests_: Sequence[Tuple[str, Optional[Dict[str, Any]]]],
+                      return_exceptions: bool = False) -> List[Dict[str, Any]]:
+        # With return_exceptions a failed request leaves its exception in place instead of losing the whole batch
+        return asyncio.run(self._gather(requests_, return_exceptions))
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+def shared_transport() -> HTTPTransport:
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HTTPTransport()
+        return _shared_transport
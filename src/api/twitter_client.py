@@ -1,19 +1,38 @@
-import tweepy
 import pandas as pd
 from typing import Dict, Any, List
 from .base_client import BaseAPIClient
+from .transform import flatten_records, build_frame
+from src.core.data_processor import DataProcessor
 from config.credentials import Credentials
 import logging
 import os
 from dotenv import load_dotenv
-import snscrape.modules.twitter as sntwitter
 
 class TwitterClient(BaseAPIClient):
+    STATS_BATCH_SIZE = 100
+    TWEEPY_FIELDS = {
+        'post_id': 'id_str',
+        'content': 'full_text',
+        'likes': 'favorite_count',
+        'shares': 'retweet_count',
+        'post_date': 'created_at',
+        'author_id': 'user.id_str',
+        'author_name': 'user.screen_name'
+    }
+    SNSCRAPE_FIELDS = {
+        'post_id': 'id',
+        'content': 'content',
+        'post_date': 'date',
+        'author_id': 'user.username',
+        'author_name': 'user.displayname'
+    }
+
     def __init__(self):
         super().__init__("twitter")
         self.logger = logging.getLogger("twitter_client")
         load_dotenv()
         try:
+            import tweepy
             self.auth = tweepy.OAuthHandler(
                 os.getenv('TWITTER_API_KEY'),
                 os.getenv('TWITTER_API_SECRET')
@@ -22,17 +41,53 @@ class TwitterClient(BaseAPIClient):
                 os.getenv('TWITTER_ACCESS_TOKEN'),
                 os.getenv('TWITTER_ACCESS_SECRET')
             )
-            self.api = tweepy.API(self.auth, wait_on_rate_limit=True)
+            self.api = tweepy.API(self.auth, wait_on_rate_limit=False)
+            self.api.session = self.transport.session
             self.use_tweepy = True
             self.logger.info("Twitter client initialized with Tweepy")
         except Exception as e:
             self.logger.warning(f"Tweepy init failed: {e}")
             self.use_tweepy = False
 
+    def _search_tweets(self, **params) -> List[Any]:
+        import tweepy
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            try:
+                tweets = self.api.search_tweets(**params)
+            except tweepy.TooManyRequests as e:
+                if attempt == self.max_retries:
+                    raise
+                reset_time = e.response.headers.get('x-rate-limit-reset') if e.response is not None else None
+                self._handle_rate_limit(reset_time=float(reset_time) if reset_time else None)
+                continue
+            if self.rate_limiter is not None:
+                self.rate_limiter.succeeded()
+            return tweets
+
+    @property
+    def supports_stats_refresh(self) -> bool:
+        # snscrape cannot look up tweets by id, so only the Twitter API can refresh statistics
+        return self.use_tweepy
+
+    def _fetch_stats_batch(self, post_ids: List[str]) -> List[Dict[str, Any]]:
+        self._acquire()
+        statuses = self.api.lookup_statuses([int(post_id) for post_id in post_ids])
+        return [{
+            'post_id': status.id_str,
+            'likes': status.favorite_count,
+            'comments': 0,
+            'shares': status.retweet_count
+        } for status in statuses]
+
     def _make_request(self, query: str = "#datascience OR #machinelearning", count: int = 100) -> List[Any]:
+        # Tweepy and snscrape keep their own sessions, so there are no cached tweets to replay
+        self._require_online('search')
+        watermark = self._get_watermark(query)
+        since_id = watermark['post_id'] if watermark else None
         if self.use_tweepy:
             try:
-                tweets = self.api.search_tweets(q=query, count=count, tweet_mode='extended')
+                tweets = self._search_tweets(q=query, count=count, tweet_mode='extended', since_id=since_id)
                 self.logger.info(f"Fetched {len(tweets)} tweets")
                 return tweets
             except Exception as e:
@@ -40,7 +95,9 @@ class TwitterClient(BaseAPIClient):
                 self.use_tweepy = False
         tweets = []
         try:
-            for i, tweet in enumerate(sntwitter.TwitterSearchScraper(query).get_items()):
+            import snscrape.modules.twitter as sntwitter
+            scrape_query = f"{query} since_id:{since_id}" if since_id else query
+            for i, tweet in enumerate(sntwitter.TwitterSearchScraper(scrape_query).get_items()):
                 if i >= count:
                     break
                 tweets.append(tweet)
@@ -49,32 +106,18 @@ class TwitterClient(BaseAPIClient):
             self.logger.error(f"snscrape failed: {e}")
         return tweets
 
-    def _transform_response(self, tweets: List[Any]) -> List[Dict[str, Any]]:
-        transformed = []
-        if not tweets:
-            return transformed
-        if self.use_tweepy and isinstance(tweets[0], tweepy.Tweet):
-            for tweet in tweets:
-                transformed.append({
-                    'post_id': tweet.id_str,
-                    'content': tweet.full_text,
-                    'likes': tweet.favorite_count,
-                    'comments': 0,
-                    'shares': tweet.retweet_count,
-                    'post_date': tweet.created_at,
-                    'author_id': tweet.user.id_str,
-                    'author_name': tweet.user.screen_name
-                })
-        else:
-            for tweet in tweets:
-                transformed.append({
-                    'post_id': str(tweet.id),
-                    'content': tweet.content,
-                    'likes': 0,
-                    'comments': 0,
-                    'shares': 0,
-                    'post_date': tweet.date,
-                    'author_id': tweet.user.username,
-                    'author_name': tweet.user.displayname
-                })
-        return transformed
\ No newline at end of file
+    def _transform_response(self, tweets: List[Any]) -> pd.DataFrame:
+        # Tweepy statuses carry id_str/full_text; snscrape tweets expose id/content/date instead
+        fields = self.TWEEPY_FIELDS if tweets and hasattr(tweets[0], 'id_str') else self.SNSCRAPE_FIELDS
+        flat = flatten_records(tweets or [], list(fields.values()))
+        return build_frame(flat, fields, DataProcessor.DATETIME_FORMATS['twitter'], self.logger, "tweets")
+
+    def fetch_data(self, query: str = "#datascience OR #machinelearning", count: int = 100) -> pd.DataFrame:
+        df = super().fetch_data(query=query, count=count)
+        self._stage_watermark(query, df)
+        return df
+
+    def fetch_arrow(self, query: str = "#datascience OR #machinelearning", count: int = 100):
+        table = super().fetch_arrow(query=query, count=count)
+        self._stage_watermark(query, table)
+        return table
\ No newline at end of file
@@ -1,76 +1,196 @@
-import googleapiclient.discovery
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, Optional
 from .base_client import BaseAPIClient
+from .transport import redact_secrets
+from .transform import flatten_records, build_frame
 from config.credentials import Credentials
 from config.api_config import APIConfig
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import dateutil.parser
 
 class YouTubeClient(BaseAPIClient):
+    API_URL = "https://www.googleapis.com/youtube/v3"
+    MAX_IDS_PER_REQUEST = 50
+    supports_stats_refresh = True
+    SEARCH_FIELDS = "nextPageToken,items(id/videoId)"
+    VIDEO_FIELDS = "items(id,snippet(publishedAt,title,channelId,channelTitle),statistics(likeCount,commentCount))"
+    STATS_FIELDS = "items(id,statistics(likeCount,commentCount))"
+    TRANSFORM_FIELDS = {
+        'post_id': 'id',
+        'content': 'snippet.title',
+        'likes': 'statistics.likeCount',
+        'comments': 'statistics.commentCount',
+        'post_date': 'snippet.publishedAt',
+        'author_id': 'snippet.channelId',
+        'author_name': 'snippet.channelTitle'
+    }
+
     def __init__(self):
         super().__init__("youtube")
         self.logger = logging.getLogger("youtube_client")
-        try:
-            self.youtube = googleapiclient.discovery.build(
-                "youtube", "v3", developerKey=Credentials.YOUTUBE_API_KEY
-            )
-            self.config = APIConfig.load_config().youtube
-            self.logger.info("YouTube client initialized successfully")
-        except Exception as e:
-            self.logger.error(f"Failed to initialize YouTube client: {e}")
-            raise
+        self.api_key = Credentials.YOUTUBE_API_KEY
+        if not self.api_key:
+            self.logger.error("Failed to initialize YouTube client: YOUTUBE_API_KEY is not set")
+            raise ValueError("YOUTUBE_API_KEY is not set")
+        self.config = APIConfig.load_config().youtube
+        self.request_timeout = self.config.get('timeout', self.request_timeout)
+        self.cache_ttls = self.config.get('cache_ttl', {})
+        self.stats_concurrency = max(1, self.config.get('batch_concurrency', 1))
+        self._fetch_complete = False
+        self.logger.info("YouTube client initialized successfully")
+
+    def _cost(self, endpoint: str) -> float:
+        return self.config.get('request_costs', {}).get(endpoint, 1)
+
+    def _search_request(self, page_size: int, page_token: Optional[str],
+                        published_after: Optional[str]) -> tuple:
+        return f"{self.API_URL}/search", {
+            'key': self.api_key,
+            'q': self.config['search_query'],
+            'part': "id",
+            'maxResults': page_size,
+            'type': "video",
+            'order': "date",
+            'pageToken': page_token,
+            'publishedAfter': published_after,
+            'fields': self.SEARCH_FIELDS
+        }
+
+    def _videos_request(self, video_ids: List[str]) -> tuple:
+        return f"{self.API_URL}/videos", {
+            'key': self.api_key,
+            'part': self.config.get('part', "snippet,statistics"),
+            'id': ",".join(video_ids),
+            'maxResults': self.MAX_IDS_PER_REQUEST,
+            'fields': self.VIDEO_FIELDS
+        }
+
+    def _iter_video_ids(self) -> Iterator[str]:
+        max_videos = self.config.get('max_videos', self.config['max_results'])
+        page_size = min(self.config['max_results'], self.MAX_IDS_PER_REQUEST)
+        page_token = None
+        fetched = 0
+        watermark = self._get_watermark(self.config['search_query'])
+        published_after = None
+        if watermark and watermark['post_date']:
+            published_after = watermark['post_date'].strftime('%Y-%m-%dT%H:%M:%SZ')
+            # Results come newest first, so stopping at max_videos would skip the rest down to the watermark
+            # for good; max_videos only bounds the first run
+            max_videos = float('inf')
+            self.logger.info(f"Requesting all YouTube videos published after {published_after}")
+        while fetched < max_videos:
+            search_response = self._get_json(
+                *self._search_request(int(min(page_size, max_videos - fetched)), page_token, published_after),
+                cost=self._cost('search'), endpoint='search')
+            for item in search_response.get('items', []):
+                video_id = item.get('id', {}).get('videoId')
+                if video_id:
+                    fetched += 1
+                    yield video_id
+            page_token = search_response.get('nextPageToken')
+            if not page_token or not search_response.get('items'):
+                break
+
+    def _iter_id_batches(self) -> Iterator[List[str]]:
+        batch = []
+        for video_id in self._iter_video_ids():
+            batch.append(video_id)
+            if len(batch) == self.MAX_IDS_PER_REQUEST:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
 
-    def _make_request(self) -> Dict[str, Any]:
+    def _fetch_video_batch(self, video_ids: List[str]) -> Dict[str, Any]:
+        return self._get_json(*self._videos_request(video_ids), cost=self._cost('videos'), endpoint='videos')
+
+    def _fetch_stats_batch(self, video_ids: List[str]) -> List[Dict[str, Any]]:
+        response = self._get_json(f"{self.API_URL}/videos", {
+            'key': self.api_key,
+            'part': "statistics",
+            'id': ",".join(video_ids),
+            'maxResults': self.MAX_IDS_PER_REQUEST,
+            'fields': self.STATS_FIELDS
+        }, cost=self._cost('videos'))
+        return [{
+            'post_id': item['id'],
+            'likes': int(item.get('statistics', {}).get('likeCount', 0)),
+            'comments': int(item.get('statistics', {}).get('commentCount', 0)),
+            'shares': 0
+        } for item in response.get('items', [])]
+
+    def _make_request_async(self, in_flight: int) -> Iterator[Dict[str, Any]]:
+        batches = []
+        for batch in self._iter_id_batches():
+            batches.append(self._videos_request(batch))
+            if len(batches) >= in_flight:
+                yield from self._get_json_many(batches, in_flight, cost=self._cost('videos'), endpoint='videos')
+                batches = []
+        if batches:
+            yield from self._get_json_many(batches, in_flight, cost=self._cost('videos'), endpoint='videos')
+
+    def _make_request(self) -> Iterator[Dict[str, Any]]:
+        in_flight = max(1, self.config.get('batch_concurrency', 1))
+        self._fetch_complete = False
         try:
-            search_request = self.youtube.search().list(
-                q=self.config['search_query'],
-                part="id",
-                maxResults=self.config['max_results'],
-                type="video",
-                order="date"
-            )
-            search_response = search_request.execute()
-            video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
-            if not video_ids:
-                return {}
-            videos_request = self.youtube.videos().list(
-                part="snippet,statistics",
-                id=",".join(video_ids)
-            )
-            return videos_request.execute()
+            if self.config.get('async_transport'):
+                yield from self._make_request_async(in_flight)
+            else:
+                with ThreadPoolExecutor(max_workers=in_flight, thread_name_prefix="youtube") as executor:
+                    futures = deque()
+                    for batch in self._iter_id_batches():
+                        futures.append(executor.submit(self._fetch_video_batch, batch))
+                        if len(futures) >= in_flight:
+                            yield futures.popleft().result()
+                    while futures:
+                        yield futures.popleft().result()
+            self._fetch_complete = True
         except Exception as e:
-            self.logger.error(f"YouTube API error: {e}")
-            return {}
+            self.logger.error(f"YouTube API error: {redact_secrets(e)}")
+
+    def _check_complete(self):
+        if not self._fetch_complete:
+            self.logger.warning("YouTube fetch stopped early, keeping the previous watermark")
+            self._unstage_watermark(self.config['search_query'])
 
-    def _transform_response(self, raw_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        transformed = []
-        if 'items' not in raw_data or not raw_data['items']:
+    def iter_batches(self, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        for raw_data in self._make_request():
+            df = self._transform_response(raw_data)
+            if not df.empty:
+                df['platform'] = self.platform_name
+                df['collected_at'] = datetime.now()
+                self._stage_watermark(self.config['search_query'], df)
+                yield df
+        self._check_complete()
+
+    def fetch_arrow(self):
+        from src.core.columnar import RecordBatchBuilder
+        self.logger.info(f"Fetching data from {self.platform_name} (arrow)")
+        builder = RecordBatchBuilder(self.platform_name)
+        for raw_data in self._make_request():
+            df = self._transform_response(raw_data)
+            self._stage_watermark(self.config['search_query'], df)
+            builder.extend_frame(df)
+        self._check_complete()
+        table = builder.finish()
+        self.logger.info(f"Successfully fetched {table.num_rows} records from {self.platform_name}")
+        return table
+
+    def fetch_data(self) -> pd.DataFrame:
+        self.logger.info(f"Fetching data from {self.platform_name}")
+        frames = list(self.iter_batches())
+        if not frames:
             self.logger.warning("No videos found in YouTube response")
-            return transformed
-        for item in raw_data.get('items', []):
-            try:
-                stats = item.get('statistics', {})
-                snippet = item.get('snippet', {})
-                published_at = snippet.get('publishedAt', '')
-                if published_at:
-                    dt = dateutil.parser.parse(published_at)
-                    published_at_naive = dt.replace(tzinfo=None)
-                else:
-                    published_at_naive = None
-                transformed.append({
-                    'post_id': item['id'],
-                    'content': snippet.get('title', ''),
-                    'likes': int(stats.get('likeCount', 0)),
-                    'comments': int(stats.get('commentCount', 0)),
-                    'shares': 0,
-                    'post_date': published_at_naive,
-                    'author_id': snippet.get('channelId', ''),
-                    'author_name': snippet.get('channelTitle', '')
-                })
-            except Exception as e:
-                self.logger.warning(f"Failed to transform video: {e}")
-                continue
-        self.logger.info(f"Transformed {len(transformed)} YouTube videos")
-        return transformed
\ No newline at end of file
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        self.logger.info(f"Successfully fetched {len(df)} records from {self.platform_name}")
+        return df
+
+    def _transform_response(self, raw_data: Dict[str, Any]) -> pd.DataFrame:
+        items = raw_data.get('items') or []
+        flat = flatten_records(items, list(self.TRANSFORM_FIELDS.values()))
+        df = build_frame(flat, self.TRANSFORM_FIELDS, 'ISO8601', self.logger, "YouTube videos")
+        self.logger.debug(f"Transformed {len(df)} YouTube videos")
+        return df
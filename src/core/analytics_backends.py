@@ -0,0 +1,148 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from src.core.analyzer import AnalyticsEngine
+
+BACKENDS = ('pandas', 'process', 'polars', 'duckdb')
+METRIC_COLUMNS = ['platform', 'post_date', 'engagement_score', 'likes', 'comments', 'shares']
+SUM_COLUMNS = {'engagement_score_sum': 'engagement_score', 'likes_sum': 'likes',
+               'comments_sum': 'comments', 'shares_sum': 'shares'}
+MIN_PARALLEL_ROWS = 200_000
+
+def _num_workers(workers: Optional[int]) -> int:
+    return max(1, workers or os.cpu_count() or 1)
+
+def _daily_partitions(df: pd.DataFrame, parts: int) -> List[np.ndarray]:
+    # Whole (platform, day) groups go to one partition so every group is reduced in its original row order
+    platforms = pd.Categorical(df['platform']).codes.astype('int64')
+    days = df['post_date'].to_numpy().astype('datetime64[D]').astype('int64')
+    keys = pd.MultiIndex.from_arrays([platforms, days])
+    group_ids, uniques = pd.factorize(keys, sort=True)
+    counts = np.bincount(group_ids[group_ids >= 0], minlength=len(uniques))
+    bounds = np.cumsum(counts) - counts
+    group_partition = np.minimum(bounds * parts // max(counts.sum(), 1), parts - 1)
+    row_partition = np.where(group_ids >= 0, group_partition[np.maximum(group_ids, 0)], -1)
+    return [np.flatnonzero(row_partition == part) for part in range(parts)]
+
+def _run_partitioned(func, frames: List[pd.DataFrame], workers: int) -> List[pd.DataFrame]:
+    if len(frames) <= 1 or workers == 1:
+        return [func(frame) for frame in frames]
+    with ProcessPoolExecutor(max_workers=min(workers, len(frames))) as executor:
+        return list(executor.map(func, frames))
+
+def _restore_platform(metrics: pd.DataFrame, platform: pd.Series) -> pd.DataFrame:
+    if isinstance(platform.dtype, pd.CategoricalDtype):
+        metrics['platform'] = metrics['platform'].astype(platform.dtype)
+    return metrics.sort_values(['platform', 'date'], kind='stable').reset_index(drop=True)
+
+def _conform_daily(metrics: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+    metrics['date'] = pd.to_datetime(metrics['date']).dt.date
+    for target, source in SUM_COLUMNS.items():
+        metrics[target] = metrics[target].astype(df[source].dtype)
+    metrics['engagement_score_count'] = metrics['engagement_score_count'].astype('int64')
+    metrics = metrics[['platform', 'date', 'engagement_score_sum', 'engagement_score_mean',
+                       'engagement_score_count', 'likes_sum', 'comments_sum', 'shares_sum']].round(2)
+    return _restore_platform(metrics, df['platform'])
+
+def _process_daily_metrics(df: pd.DataFrame, workers: int, min_rows: int) -> pd.DataFrame:
+    df = df[METRIC_COLUMNS]
+    if len(df) < min_rows or workers == 1:
+        return AnalyticsEngine.compute_daily_metrics(df)
+    frames = [df.iloc[rows] for rows in _daily_partitions(df, workers) if len(rows)]
+    results = [part for part in _run_partitioned(AnalyticsEngine.compute_daily_metrics, frames, workers)
+               if not part.empty]
+    if not results:
+        return pd.DataFrame()
+    return _restore_platform(pd.concat(results, ignore_index=True), df['platform'])
+
+def _polars_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    import polars as pl
+    frame = pl.from_pandas(df[METRIC_COLUMNS].assign(platform=df['platform'].astype(str)))
+    metrics = frame.drop_nulls(['platform', 'post_date']).group_by(
+        'platform', pl.col('post_date').dt.date().alias('date')
+    ).agg(
+        pl.col('engagement_score').sum().alias('engagement_score_sum'),
+        pl.col('engagement_score').mean().alias('engagement_score_mean'),
+        pl.col('engagement_score').count().alias('engagement_score_count'),
+        pl.col('likes').sum().alias('likes_sum'),
+        pl.col('comments').sum().alias('comments_sum'),
+        pl.col('shares').sum().alias('shares_sum')
+    ).to_pandas()
+    return _conform_daily(metrics, df)
+
+def _duckdb_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    import duckdb
+    posts = df[METRIC_COLUMNS].assign(platform=df['platform'].astype(str))
+    with duckdb.connect() as con:
+        con.register('posts', posts)
+        metrics = con.execute("""
+            SELECT platform, CAST(post_date AS DATE) AS date,
+                   SUM(engagement_score) AS engagement_score_sum,
+                   AVG(engagement_score) AS engagement_score_mean,
+                   COUNT(engagement_score) AS engagement_score_count,
+                   SUM(likes) AS likes_sum, SUM(comments) AS comments_sum, SUM(shares) AS shares_sum
+            FROM posts
+            WHERE platform IS NOT NULL AND post_date IS NOT NULL
+            GROUP BY 1, 2
+        """).df()
+    return _conform_daily(metrics, df)
+
+def compute_daily_metrics(df: pd.DataFrame, backend: str = 'pandas', workers: Optional[int] = None,
+                          min_rows: int = MIN_PARALLEL_ROWS) -> pd.DataFrame:
+    df = AnalyticsEngine._as_frame(df)
+    if backend == 'pandas' or df.empty:
+        return AnalyticsEngine.compute_daily_metrics(df)
+    if backend == 'process':
+        return _process_daily_metrics(df, _num_workers(workers), min_rows)
+    if backend == 'polars':
+        return _polars_daily_metrics(df)
+    if backend == 'duckdb':
+        return _duckdb_daily_metrics(df)
+    raise ValueError(f"Unsupported analytics backend: {backend}")
+
+def _moving_average_partition(args) -> pd.DataFrame:
+    metrics_df, window = args
+    return AnalyticsEngine.compute_moving_average(metrics_df, window)
+
+def compute_moving_average(metrics_df: pd.DataFrame, window: int = 7, backend: str = 'pandas',
+                           workers: Optional[int] = None, min_rows: int = MIN_PARALLEL_ROWS) -> pd.DataFrame:
+    if backend == 'pandas' or metrics_df.empty:
+        return AnalyticsEngine.compute_moving_average(metrics_df, window)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported analytics backend: {backend}")
+    metrics_df = metrics_df.sort_values(['platform', 'date'])
+    if backend == 'process':
+        workers = _num_workers(workers)
+        # The rolling mean runs over the daily rows, however many posts they summarize, so only a long daily
+        # series is worth the pool's startup and pickling
+        if len(metrics_df) < min_rows or workers == 1:
+            return AnalyticsEngine.compute_moving_average(metrics_df, window)
+        platforms = pd.Categorical(metrics_df['platform']).codes
+        starts = np.flatnonzero(np.r_[True, platforms[1:] != platforms[:-1]])
+        pieces = np.split(np.arange(len(metrics_df)), starts[1:])
+        results = _run_partitioned(_moving_average_partition,
+                                   [(metrics_df.iloc[rows], window) for rows in pieces], workers)
+        return pd.concat(results)
+    values = metrics_df[['platform', 'engagement_score_sum']].assign(
+        platform=metrics_df['platform'].astype(str), _row=np.arange(len(metrics_df)))
+    if backend == 'polars':
+        import polars as pl
+        moving_average = pl.from_pandas(values).select(
+            pl.col('engagement_score_sum').cast(pl.Float64)
+            .rolling_mean(window_size=window, min_samples=1).over('platform')
+        ).to_series().to_numpy()
+    else:
+        import duckdb
+        with duckdb.connect() as con:
+            con.register('metrics', values)
+            moving_average = con.execute(f"""
+                SELECT AVG(engagement_score_sum) OVER (
+                    PARTITION BY platform ORDER BY _row ROWS BETWEEN {int(window) - 1} PRECEDING AND CURRENT ROW
+                ) AS engagement_ma
+                FROM metrics ORDER BY _row
+            """).df()['engagement_ma'].to_numpy()
+    metrics_df['engagement_ma'] = moving_average
+    return metrics_df
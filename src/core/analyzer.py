@@ -1,15 +1,40 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+HASHTAG_PATTERN = r'#\w+'
+TERM_PATTERN = r'\b[^\W\d_]{4,}\b'
+STOPWORDS = frozenset([
+    'about', 'after', 'again', 'also', 'been', 'being', 'could', 'does', 'from', 'have', 'here', 'into',
+    'just', 'more', 'most', 'much', 'only', 'other', 'over', 'some', 'such', 'than', 'that', 'their',
+    'them', 'then', 'there', 'these', 'they', 'this', 'those', 'very', 'want', 'were', 'what', 'when',
+    'where', 'which', 'while', 'will', 'with', 'would', 'your'
+])
 
 class AnalyticsEngine:
+    TREND_WINDOW_DAYS = 1
+    TREND_BASELINE_DAYS = 7
+
     @staticmethod
-    def compute_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    def _as_frame(df) -> pd.DataFrame:
+        if not isinstance(df, pd.DataFrame):
+            from src.core.columnar import to_arrow_pandas
+            return to_arrow_pandas(df)
+        return df
+
+    @staticmethod
+    def compute_daily_metrics(df: pd.DataFrame, backend: str = 'pandas',
+                              workers: Optional[int] = None) -> pd.DataFrame:
+        if backend != 'pandas':
+            from src.core.analytics_backends import compute_daily_metrics
+            return compute_daily_metrics(df, backend, workers)
+        df = AnalyticsEngine._as_frame(df)
         if df.empty:
             return pd.DataFrame()
         df = df.copy()
         df['date'] = df['post_date'].dt.date
-        metrics = df.groupby(['platform', 'date']).agg({
+        metrics = df.groupby(['platform', 'date'], observed=True).agg({
             'engagement_score': ['sum', 'mean', 'count'],
             'likes': 'sum',
             'comments': 'sum',
@@ -20,27 +45,250 @@ class AnalyticsEngine:
         return metrics
 
     @staticmethod
-    def compute_moving_average(metrics_df: pd.DataFrame, window: int = 7) -> pd.DataFrame:
+    def partial_daily_metrics(df: pd.DataFrame) -> pd.DataFrame:
+        df = AnalyticsEngine._as_frame(df)
+        if df.empty:
+            return pd.DataFrame()
+        dates = df['post_date'].dt.date.rename('date')
+        return df.groupby([df['platform'].astype(str), dates], observed=True).agg(
+            engagement_score_sum=('engagement_score', 'sum'),
+            engagement_score_count=('engagement_score', 'count'),
+            likes_sum=('likes', 'sum'),
+            comments_sum=('comments', 'sum'),
+            shares_sum=('shares', 'sum')
+        )
+
+    @staticmethod
+    def merge_partial_metrics(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        if left is None or left.empty:
+            return right
+        if right is None or right.empty:
+            return left
+        return pd.concat([left, right]).groupby(level=['platform', 'date']).sum()
+
+    @staticmethod
+    def finalize_daily_metrics(partial: pd.DataFrame) -> pd.DataFrame:
+        if partial is None or partial.empty:
+            return pd.DataFrame()
+        metrics = partial.sort_index().reset_index()
+        metrics['engagement_score_mean'] = (metrics['engagement_score_sum'] /
+                                            metrics['engagement_score_count']).round(2)
+        return metrics[['platform', 'date', 'engagement_score_sum', 'engagement_score_mean',
+                        'engagement_score_count', 'likes_sum', 'comments_sum', 'shares_sum']]
+
+    @staticmethod
+    def compute_moving_average(metrics_df: pd.DataFrame, window: int = 7, backend: str = 'pandas',
+                               workers: Optional[int] = None) -> pd.DataFrame:
+        if backend != 'pandas':
+            from src.core.analytics_backends import compute_moving_average
+            return compute_moving_average(metrics_df, window, backend, workers)
         if metrics_df.empty:
             return pd.DataFrame()
         metrics_df = metrics_df.sort_values(['platform', 'date'])
-        metrics_df['engagement_ma'] = metrics_df.groupby('platform')['engagement_score_sum'] \
+        metrics_df['engagement_ma'] = metrics_df.groupby('platform', observed=True)['engagement_score_sum'] \
             .transform(lambda x: x.rolling(window=window, min_periods=1).mean())
         return metrics_df
 
+    @staticmethod
+    def select_refresh_candidates(df: pd.DataFrame, budget: int, now: Optional[datetime] = None) -> pd.DataFrame:
+        df = AnalyticsEngine._as_frame(df)
+        if df.empty:
+            return df
+        now = pd.Timestamp(now or datetime.now())
+        age_hours = ((now - df['post_date']).dt.total_seconds() / 3600).clip(lower=1)
+        # Engagement per hour since publishing: young posts that are still gaining come first
+        velocity = df['engagement_score'].astype('float64') / age_hours
+        order = np.argsort(-velocity.fillna(0).to_numpy(), kind='stable')
+        return df.iloc[order[:budget]]
+
     @staticmethod
     def identify_top_posts(df: pd.DataFrame, overall_n: int = 5, platform_n: int = 3) -> Dict[str, pd.DataFrame]:
+        from src.core.topk import TopPostsTracker
+        df = AnalyticsEngine._as_frame(df)
         if df.empty:
             return {}
-        top_overall = df.nlargest(overall_n, 'engagement_score')[
-            ['platform', 'post_id', 'content', 'engagement_score', 'likes', 'comments', 'shares']
-        ]
-        top_per_platform = df.groupby('platform', group_keys=False, observed=True).apply(
-            lambda x: x.nlargest(platform_n, 'engagement_score')[
-                ['post_id', 'content', 'engagement_score', 'likes', 'comments', 'shares']
-            ]
-        ).reset_index(drop=True)
-        return {
-            'top_overall': top_overall,
-            'top_per_platform': top_per_platform
-        }
\ No newline at end of file
+        return TopPostsTracker(overall_n, platform_n).update(df).result()
+
+    @staticmethod
+    def top_post_candidates(df: pd.DataFrame, overall_n: int = 5, platform_n: int = 3) -> pd.DataFrame:
+        # The overall leaders are among the leaders of their platform, so these rows are all a later top list needs
+        df = AnalyticsEngine._as_frame(df)
+        if df.empty:
+            return df
+        ranked = df.sort_values('engagement_score', ascending=False, kind='stable')
+        return ranked.groupby(ranked['platform'].astype(str), sort=False).head(max(overall_n, platform_n)) \
+            .reset_index(drop=True)
+
+    @staticmethod
+    def _post_texts(df: pd.DataFrame) -> Tuple[np.ndarray, pd.Series]:
+        # Reposts and templated posts repeat their text, so terms are extracted once per distinct text
+        codes, texts = pd.factorize(df['content'].fillna('').astype(str))
+        texts = pd.Series(texts, dtype=object)
+        if 'hashtags' in df.columns:
+            # Tags listed beside the text ("DataScience, AI") are appended to it as #tags
+            tag_codes, tags = pd.factorize(df['hashtags'].fillna('').astype(str))
+            codes, pairs = pd.factorize(codes.astype('int64') * len(tags) + tag_codes)
+            tags = ('#' + pd.Series(tags, dtype=object).str.replace(r'[,\s]+', ' #', regex=True)).to_numpy()
+            texts = pd.Series(texts.to_numpy()[pairs // len(tags)] + ' ' + tags[pairs % len(tags)], dtype=object)
+        return codes, texts.str.lower()
+
+    @staticmethod
+    def extract_terms(df: pd.DataFrame) -> pd.DataFrame:
+        columns = ['platform', 'date', 'term', 'engagement_score']
+        df = AnalyticsEngine._as_frame(df)
+        if df.empty or 'content' not in df.columns:
+            return pd.DataFrame(columns=columns)
+        codes, texts = AnalyticsEngine._post_texts(df)
+        words = texts.str.replace(r'#\w+|@\w+|https?://\S+', ' ', regex=True).str.findall(TERM_PATTERN).explode()
+        found = pd.concat([texts.str.findall(HASHTAG_PATTERN).explode(), words[~words.isin(STOPWORDS)]]).dropna()
+        tokens = pd.DataFrame({'text': found.index.to_numpy(), 'term': found.to_numpy(dtype=object)}) \
+            .drop_duplicates().sort_values('text', kind='stable')
+        token_terms, vocabulary = pd.factorize(tokens['term'].to_numpy())
+        # Every post takes the slice of tokens that belongs to its text
+        counts = np.bincount(tokens['text'].to_numpy(), minlength=len(texts))
+        starts = np.cumsum(counts) - counts
+        per_post = counts[codes]
+        rows = np.repeat(np.arange(len(codes)), per_post)
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(per_post) - per_post, per_post)
+        platforms = df['platform'].astype(str).astype('category')
+        terms = pd.DataFrame({
+            'platform': pd.Categorical.from_codes(platforms.cat.codes.to_numpy()[rows], platforms.cat.categories),
+            'date': df['post_date'].dt.floor('D').to_numpy(dtype='datetime64[ns]')[rows],
+            'term': pd.Categorical.from_codes(token_terms[np.repeat(starts[codes], per_post) + offsets],
+                                              pd.Index(vocabulary, dtype=object)),
+            'engagement_score': df['engagement_score'].to_numpy(dtype='float64', na_value=0)[rows]
+        })
+        return terms[terms['date'].notna()].reset_index(drop=True)
+
+    @staticmethod
+    def topic_sketches(df: pd.DataFrame, width: int = 2048, depth: int = 4,
+                       capacity: int = 200) -> Dict[Tuple[str, date], 'TopicSketch']:
+        from src.core.sketches import TopicSketch, hash_values
+        terms = AnalyticsEngine.extract_terms(df)
+        if terms.empty:
+            return {}
+        # Each distinct term is hashed once; buckets take their rows' keys from it
+        vocabulary = terms['term'].cat.categories.to_numpy(dtype=object)
+        codes = terms['term'].cat.codes.to_numpy()
+        keys = hash_values(vocabulary)[codes]
+        engagement = terms['engagement_score'].to_numpy()
+        sketches = {}
+        for (platform, day), rows in terms.groupby(['platform', 'date'], observed=True, sort=True).indices.items():
+            sketches[(platform, day.date())] = TopicSketch(width, depth, capacity).add(
+                keys[rows], engagement[rows], vocabulary[np.unique(codes[rows])])
+        return sketches
+
+    @staticmethod
+    def trending_topics(sketches: Dict[Tuple[str, date], 'TopicSketch'], as_of: Optional[date] = None,
+                        window_days: int = TREND_WINDOW_DAYS, baseline_days: int = TREND_BASELINE_DAYS,
+                        n: int = 10, by_platform: bool = True) -> pd.DataFrame:
+        from src.core.sketches import TopicSketch
+        columns = ['platform', 'term', 'mentions', 'engagement', 'baseline_engagement', 'growth', 'trend_score']
+        if not sketches:
+            return pd.DataFrame(columns=columns)
+        as_of = as_of or max(day for _, day in sketches)
+        recent_start = as_of - timedelta(days=window_days - 1)
+        baseline_start = recent_start - timedelta(days=baseline_days)
+        windows = {}
+        for (platform, day), sketch in sketches.items():
+            if day > as_of or day < baseline_start:
+                continue
+            key = (platform if by_platform else 'all', 'recent' if day >= recent_start else 'baseline')
+            if key not in windows:
+                windows[key] = TopicSketch(sketch.mentions.width, sketch.mentions.depth, sketch.capacity)
+            windows[key].merge(sketch)
+        frames = []
+        for group in sorted({group for group, _ in windows}):
+            recent = windows.get((group, 'recent'))
+            if recent is None or len(recent.candidates) == 0:
+                continue
+            terms = recent.candidates
+            mentions, engagement = recent.estimate(terms)
+            baseline = windows.get((group, 'baseline'))
+            baseline_engagement = baseline.estimate(terms)[1] if baseline is not None else np.zeros(len(terms))
+            recent_rate = engagement / window_days
+            baseline_rate = baseline_engagement / baseline_days
+            # Growth alone favours terms seen once; dividing by the baseline's spread keeps volume in the score
+            trends = pd.DataFrame({
+                'platform': group,
+                'term': terms,
+                'mentions': np.round(mentions).astype('int64'),
+                'engagement': np.round(engagement).astype('int64'),
+                'baseline_engagement': np.round(baseline_engagement).astype('int64'),
+                'growth': ((recent_rate + 1) / (baseline_rate + 1)).round(2),
+                'trend_score': ((recent_rate - baseline_rate) / np.sqrt(baseline_rate + 1)).round(2)
+            })
+            frames.append(trends.sort_values(['trend_score', 'term'], ascending=[False, True]).head(n))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)[columns]
+
+
+    @staticmethod
+    def daily_sketches(df: pd.DataFrame, precision: int = 14,
+                       compression: float = 200) -> Dict[str, Dict[Tuple[str, date], object]]:
+        from src.core.sketches import HyperLogLog, TDigest, hash_values
+        sketches = {'authors': {}, 'engagement': {}}
+        df = AnalyticsEngine._as_frame(df)
+        if df.empty:
+            return sketches
+        has_author = df['author_id'].notna().to_numpy()
+        authors = hash_values(df['author_id'].astype(str).to_numpy(dtype=object))
+        engagement = df['engagement_score'].to_numpy(dtype='float64', na_value=np.nan)
+        buckets = pd.DataFrame({'platform': df['platform'].astype(str).to_numpy(dtype=object),
+                                'date': df['post_date'].dt.floor('D').to_numpy(dtype='datetime64[ns]')})
+        for (platform, day), rows in buckets.groupby(['platform', 'date'], sort=True).indices.items():
+            key = (platform, day.date())
+            sketches['authors'][key] = HyperLogLog(precision).add(authors[rows[has_author[rows]]])
+            sketches['engagement'][key] = TDigest(compression).add(engagement[rows])
+        return sketches
+
+    @staticmethod
+    def _period_start(day: date, period: str) -> date:
+        if period == 'D':
+            return day
+        if period == 'W':
+            return day - timedelta(days=day.weekday())
+        if period == 'M':
+            return day.replace(day=1)
+        raise ValueError(f"Unsupported period: {period}")
+
+    @staticmethod
+    def sketch_metrics(authors: Dict[Tuple[str, date], 'HyperLogLog'],
+                       engagement: Dict[Tuple[str, date], 'TDigest'], period: str = 'D') -> pd.DataFrame:
+        from src.core.sketches import HyperLogLog, TDigest
+        columns = ['platform', 'date', 'unique_authors', 'engagement_p50', 'engagement_p90', 'engagement_p99']
+        # Weekly and monthly figures merge the daily sketches of the period into fresh ones
+        merged_authors, merged_engagement = {}, {}
+        for (platform, day), sketch in authors.items():
+            key = (platform, AnalyticsEngine._period_start(day, period))
+            merged_authors.setdefault(key, HyperLogLog(sketch.precision)).merge(sketch)
+        for (platform, day), sketch in engagement.items():
+            key = (platform, AnalyticsEngine._period_start(day, period))
+            merged_engagement.setdefault(key, TDigest(sketch.compression)).merge(sketch)
+        keys = sorted(set(merged_authors) | set(merged_engagement))
+        if not keys:
+            return pd.DataFrame(columns=columns)
+        percentiles = np.array([merged_engagement[key].quantile([0.5, 0.9, 0.99]) if key in merged_engagement
+                                else np.full(3, np.nan) for key in keys])
+        metrics = pd.DataFrame({
+            'platform': [platform for platform, _ in keys],
+            'date': [day for _, day in keys],
+            'unique_authors': [round(merged_authors[key].estimate()) if key in merged_authors else 0
+                               for key in keys],
+            'engagement_p50': percentiles[:, 0],
+            'engagement_p90': percentiles[:, 1],
+            'engagement_p99': percentiles[:, 2]
+        })
+        metrics[columns[3:]] = metrics[columns[3:]].round(2)
+        return metrics
+
+    @staticmethod
+    def add_sketch_metrics(daily_metrics: pd.DataFrame, sketch_metrics: pd.DataFrame) -> pd.DataFrame:
+        if daily_metrics.empty or sketch_metrics.empty:
+            return daily_metrics
+        extra = sketch_metrics.assign(platform=sketch_metrics['platform'].astype(str))
+        merged = daily_metrics.assign(platform=daily_metrics['platform'].astype(str)).merge(
+            extra, on=['platform', 'date'], how='left')
+        merged.index = daily_metrics.index
+        return merged.assign(platform=daily_metrics['platform'])
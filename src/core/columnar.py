@@ -0,0 +1,93 @@
+import pyarrow as pa
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, List, Iterable, Optional
+
+RAW_SCHEMA = pa.schema([
+    ('post_id', pa.string()),
+    ('content', pa.string()),
+    ('likes', pa.int64()),
+    ('comments', pa.int64()),
+    ('shares', pa.int64()),
+    ('post_date', pa.timestamp('ns')),
+    ('author_id', pa.string()),
+    ('author_name', pa.string()),
+    ('platform', pa.string()),
+    ('collected_at', pa.timestamp('ns'))
+])
+
+PANDAS_TO_ARROW = {
+    'object': pa.string(),
+    'int64': pa.int64(),
+    'datetime64[ns]': pa.timestamp('ns'),
+    'category': pa.dictionary(pa.int32(), pa.string())
+}
+
+def arrow_schema_from_pandas(schema: Dict[str, str]) -> pa.Schema:
+    return pa.schema([(col, PANDAS_TO_ARROW[dtype]) for col, dtype in schema.items()])
+
+class RecordBatchBuilder:
+    def __init__(self, platform: str, schema: pa.Schema = RAW_SCHEMA, batch_size: int = 10_000,
+                 collected_at: Optional[datetime] = None):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.constants = {'platform': platform, 'collected_at': collected_at or datetime.now()}
+        self.batches: List[pa.RecordBatch] = []
+        self._columns = {name: [] for name in schema.names if name not in self.constants}
+        self._pending = 0
+
+    def append(self, row: Dict[str, Any]):
+        for name, values in self._columns.items():
+            values.append(row.get(name))
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.append(row)
+
+    def extend_frame(self, df: pd.DataFrame):
+        self.flush()
+        if df.empty:
+            return
+        arrays = []
+        for field in self.schema:
+            if field.name in self.constants:
+                arrays.append(pa.repeat(pa.scalar(self.constants[field.name], type=field.type), len(df)))
+            else:
+                arrays.append(pa.array(df[field.name], type=field.type, from_pandas=True))
+        self.batches.append(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def flush(self):
+        if not self._pending:
+            return
+        arrays = []
+        for field in self.schema:
+            if field.name in self.constants:
+                arrays.append(pa.repeat(pa.scalar(self.constants[field.name], type=field.type), self._pending))
+            else:
+                arrays.append(pa.array(self._columns[field.name], type=field.type, from_pandas=True))
+                self._columns[field.name] = []
+        self.batches.append(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self._pending = 0
+
+    def finish(self) -> pa.Table:
+        self.flush()
+        return pa.Table.from_batches(self.batches, schema=self.schema)
+
+def concat_tables(tables: List[pa.Table]) -> pa.Table:
+    tables = [table for table in tables if table.num_rows]
+    if not tables:
+        return RAW_SCHEMA.empty_table()
+    return pa.concat_tables(tables)
+
+def to_arrow_pandas(data) -> pd.DataFrame:
+    if isinstance(data, pa.Table):
+        return data.to_pandas(types_mapper=pd.ArrowDtype)
+    return data
+
+def row_count(data) -> int:
+    if isinstance(data, pa.Table):
+        return data.num_rows
+    return len(data)
\ No newline at end of file
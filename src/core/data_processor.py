@@ -1,51 +1,166 @@
 import pandas as pd
 import numpy as np
+import logging
 from datetime import datetime
 from typing import Dict, Any, List
 
+logger = logging.getLogger("data_processor")
+
 class DataProcessor:
     SCHEMA = {
-        'platform': 'object',
+        'platform': 'category',
         'post_id': 'object',
         'content': 'object',
         'likes': 'int64',
         'comments': 'int64',
         'shares': 'int64',
         'post_date': 'datetime64[ns]',
-        'author_id': 'object',
+        'author_id': 'category',
         'engagement_score': 'int64',
         'collected_at': 'datetime64[ns]'
     }
+    DATETIME_FORMATS = {
+        'youtube': '%Y-%m-%dT%H:%M:%S%z',
+        'facebook': '%Y-%m-%dT%H:%M:%S%z',
+        'twitter': '%a %b %d %H:%M:%S %z %Y'
+    }
+    FILL_VALUES = {'likes': 0, 'comments': 0, 'shares': 0, 'content': ''}
+    _plan = None
+
+    @classmethod
+    def _normalization_plan(cls) -> Dict[str, Any]:
+        if cls._plan is None:
+            datetime_cols = [col for col, dtype in cls.SCHEMA.items() if dtype.startswith('datetime64')]
+            cls._plan = {
+                'missing_cols': [col for col in cls.SCHEMA if col != 'engagement_score'],
+                'datetime_cols': datetime_cols,
+                'dtypes': {col: dtype for col, dtype in cls.SCHEMA.items()
+                           if col not in datetime_cols and col != 'engagement_score'},
+                'fill_values': dict(cls.FILL_VALUES)
+            }
+        return cls._plan
 
     @staticmethod
-    def normalize_data(df: pd.DataFrame) -> pd.DataFrame:
+    def _parse_datetimes(values: pd.Series, platforms: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            if getattr(values.dt, 'tz', None) is not None:
+                return values.dt.tz_convert(None)
+            return values
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        unparsed = values.notna()
+        for platform, fmt in DataProcessor.DATETIME_FORMATS.items():
+            mask = unparsed & (platforms == platform)
+            if mask.any():
+                parsed[mask] = pd.to_datetime(values[mask], format=fmt, errors='coerce', utc=True).dt.tz_convert(None)
+        unparsed &= parsed.isna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(values[unparsed], errors='coerce', utc=True).dt.tz_convert(None)
+        return parsed
+
+    @staticmethod
+    def normalize_data(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         if df.empty:
             return df
-        for col in DataProcessor.SCHEMA.keys():
-            if col not in df.columns and col != 'engagement_score':
+        plan = DataProcessor._normalization_plan()
+        if copy:
+            df = df.copy(deep=False)
+        for col in plan['missing_cols']:
+            if col not in df.columns:
                 df[col] = np.nan
-        numeric_cols = ['likes', 'comments', 'shares']
-        df[numeric_cols] = df[numeric_cols].fillna(0)
-        df['content'] = df['content'].fillna('')
-        if 'post_date' in df.columns:
-            df['post_date'] = pd.to_datetime(df['post_date'], errors='coerce', utc=True).dt.tz_convert(None)
-        if 'collected_at' in df.columns:
-            df['collected_at'] = pd.to_datetime(df['collected_at'], errors='coerce', utc=True).dt.tz_convert(None)
-        for col, dtype in DataProcessor.SCHEMA.items():
-            if col in df.columns and col not in ['post_date', 'collected_at']:
+        for col, value in plan['fill_values'].items():
+            if df[col].hasnans:
+                df[col] = df[col].fillna(value)
+        platforms = df['platform'].astype('object')
+        for col in plan['datetime_cols']:
+            df[col] = DataProcessor._parse_datetimes(df[col], platforms)
+        try:
+            df = df.astype(plan['dtypes'])
+        except (ValueError, TypeError):
+            for col, dtype in plan['dtypes'].items():
                 try:
                     df[col] = df[col].astype(dtype)
-                except Exception as e:
-                    print(f"Warning: Could not convert {col} to {dtype}: {e}")
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Could not convert {col} to {dtype}: {e}")
         df['engagement_score'] = df['likes'] + df['comments'] + df['shares']
         return df
 
+    @staticmethod
+    def normalize_arrow(table):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        from src.core.columnar import arrow_schema_from_pandas
+        if table.num_rows == 0:
+            return table
+        target = arrow_schema_from_pandas(DataProcessor.SCHEMA)
+        columns = {}
+        for field in target:
+            if field.name == 'engagement_score':
+                continue
+            if field.name in table.column_names:
+                column = table.column(field.name)
+            else:
+                column = pa.nulls(table.num_rows, type=field.type.value_type
+                                  if pa.types.is_dictionary(field.type) else field.type)
+            if field.name in DataProcessor.FILL_VALUES and column.null_count:
+                column = pc.fill_null(column, DataProcessor.FILL_VALUES[field.name])
+            try:
+                if pa.types.is_dictionary(field.type) and not pa.types.is_dictionary(column.type):
+                    column = pc.dictionary_encode(column.cast(field.type.value_type))
+                elif not column.type.equals(field.type):
+                    column = column.cast(field.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                logger.warning(f"Could not convert {field.name} to {field.type}: {e}")
+            columns[field.name] = column
+        columns['engagement_score'] = pc.add(pc.add(columns['likes'], columns['comments']), columns['shares'])
+        for name in table.column_names:
+            if name not in columns:
+                columns[name] = table.column(name)
+        return pa.table(columns)
+
     @staticmethod
     def validate_data(df: pd.DataFrame) -> bool:
-        if df.empty:
+        columns = df.column_names if hasattr(df, 'column_names') else df.columns
+        if len(df) == 0:
             return True
         required_cols = list(DataProcessor.SCHEMA.keys())
-        missing_cols = [col for col in required_cols if col not in df.columns]
+        missing_cols = [col for col in required_cols if col not in columns]
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
-        return True
\ No newline at end of file
+        return True
+
+    @staticmethod
+    def merge_incremental(existing: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+        if existing is None or existing.empty:
+            return delta
+        if delta.empty:
+            return existing
+        merged = pd.concat([existing, delta], ignore_index=True)
+        merged = merged.drop_duplicates(subset=['platform', 'post_id'], keep='last')
+        categorical = {col: dtype for col, dtype in DataProcessor.SCHEMA.items()
+                       if dtype == 'category' and col in merged.columns}
+        return merged.astype(categorical).reset_index(drop=True)
+
+    @staticmethod
+    def apply_refreshed_stats(stored: pd.DataFrame, refreshed: pd.DataFrame,
+                              collected_at: datetime = None) -> pd.DataFrame:
+        if stored.empty or refreshed.empty:
+            return stored.iloc[0:0]
+        stats = ['likes', 'comments', 'shares']
+        refreshed = refreshed.drop_duplicates('post_id', keep='last')
+        refreshed = pd.DataFrame(refreshed[stats].to_numpy(dtype='int64'), columns=stats,
+                                 index=pd.Index(refreshed['post_id'].astype(str).to_numpy(dtype=object)))
+        current = stored[stored['post_id'].astype(str).isin(refreshed.index)]
+        new_values = refreshed.loc[current['post_id'].astype(str).values].to_numpy(dtype='int64')
+        changed = (current[stats].to_numpy(dtype='int64') != new_values).any(axis=1)
+        updated = current[changed].copy()
+        updated[stats] = new_values[changed]
+        updated['engagement_score'] = updated['likes'] + updated['comments'] + updated['shares']
+        updated['collected_at'] = collected_at or datetime.now()
+        return updated.reset_index(drop=True)
+    @staticmethod
+    def classify_records(df: pd.DataFrame, index) -> pd.Series:
+        status = index.classify(df)
+        counts = status.value_counts()
+        logger.info(f"Dedup: {counts.get('new', 0)} new, {counts.get('updated', 0)} updated, "
+                    f"{counts.get('unchanged', 0)} unchanged records")
+        return status
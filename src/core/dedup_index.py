@@ -0,0 +1,225 @@
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from src.core.utils import data_path
+
+KEY_COLUMNS = ['platform', 'post_id']
+STATS_COLUMNS = ['likes', 'comments', 'shares']
+STATUSES = ['new', 'updated', 'unchanged']
+
+def hash_keys(df: pd.DataFrame) -> np.ndarray:
+    keys = pd.DataFrame({col: df[col].astype(str).to_numpy(dtype=object) for col in KEY_COLUMNS})
+    # Post ids are nearly all distinct, so factorizing them first (categorize=True) only costs time
+    return pd.util.hash_pandas_object(keys, index=False, categorize=False).to_numpy()
+
+def hash_stats(df: pd.DataFrame) -> np.ndarray:
+    stats = pd.DataFrame({col: df[col].to_numpy(dtype='int64', na_value=0) if col in df.columns
+                          else np.zeros(len(df), dtype='int64') for col in STATS_COLUMNS})
+    return pd.util.hash_pandas_object(stats, index=False).to_numpy()
+
+class BloomFilter:
+    def __init__(self, bits: np.ndarray, num_hashes: int):
+        self.bits = bits
+        self.num_bits = len(bits) * 8
+        self.num_hashes = num_hashes
+
+    @classmethod
+    def create(cls, capacity: int, bits_per_key: int = 10) -> 'BloomFilter':
+        num_bytes = max(8, (capacity * bits_per_key + 7) // 8)
+        return cls(np.zeros(num_bytes, dtype=np.uint8), max(1, round(bits_per_key * 0.693)))
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        # Double hashing: the two 32-bit halves of the 64-bit key give all k probe positions
+        low = keys & np.uint64(0xFFFFFFFF)
+        high = (keys >> np.uint64(32)) | np.uint64(1)
+        probes = np.arange(self.num_hashes, dtype=np.uint64)
+        return (low[:, None] + probes[None, :] * high[:, None]) % np.uint64(self.num_bits)
+
+    def add(self, keys: np.ndarray):
+        if len(keys) == 0:
+            return
+        positions = np.sort(self._positions(keys), axis=None)
+        offsets = (positions >> np.uint64(3)).astype(np.int64)
+        masks = np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)
+        # Positions are sorted, so every byte's bits are contiguous and can be OR-ed with one reduceat
+        starts = np.flatnonzero(np.append(True, offsets[1:] != offsets[:-1]))
+        self.bits[offsets[starts]] |= np.bitwise_or.reduceat(masks, starts)
+
+    def might_contain(self, keys: np.ndarray) -> np.ndarray:
+        positions = self._positions(keys)
+        found = self.bits[(positions >> np.uint64(3)).astype(np.int64)] >> (positions & np.uint64(7)).astype(np.uint8)
+        return (found & 1).astype(bool).all(axis=1)
+
+def _keep_last(keys: np.ndarray, stats: np.ndarray):
+    # Stable sort keeps arrival order among equal keys, so the last occurrence holds the newest stats
+    order = np.argsort(keys, kind='stable')
+    keys, stats = keys[order], stats[order]
+    last = np.append(keys[1:] != keys[:-1], True) if len(keys) else np.zeros(0, dtype=bool)
+    return keys[last], stats[last]
+
+class IndexSegment:
+    def __init__(self, keys: np.ndarray, stats: np.ndarray, bloom: Optional[BloomFilter] = None):
+        self.keys = keys
+        self.stats = stats
+        self.bloom = bloom
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, keys: np.ndarray):
+        positions = np.zeros(len(keys), dtype=np.int64)
+        found = np.zeros(len(keys), dtype=bool)
+        if len(self.keys) == 0 or len(keys) == 0:
+            return found, positions
+        candidates = np.arange(len(keys))
+        if self.bloom is not None:
+            candidates = candidates[self.bloom.might_contain(keys)]
+        if len(candidates):
+            hits = np.searchsorted(self.keys, keys[candidates])
+            hits = np.minimum(hits, len(self.keys) - 1)
+            matched = self.keys[hits] == keys[candidates]
+            found[candidates[matched]] = True
+            positions[candidates[matched]] = hits[matched]
+        return found, positions
+
+class DedupIndex:
+    # Every flush writes the run's ids as a small sorted segment, LSM style, instead of rewriting the base
+    # arrays; once there are more than this many segments they are compacted into the base
+    MAX_SEGMENTS = 8
+
+    def __init__(self, path: Optional[str] = None, use_bloom: bool = True, bits_per_key: int = 10,
+                 max_segments: Optional[int] = None):
+        self.path = path or data_path('state', 'dedup_index')
+        self.use_bloom = use_bloom
+        self.bits_per_key = bits_per_key
+        self.max_segments = max_segments or self.MAX_SEGMENTS
+        self.logger = logging.getLogger("dedup_index")
+        os.makedirs(self.path, exist_ok=True)
+        self.staged: List[IndexSegment] = []
+        self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        self.manifest = {'segments': [], 'next': 0, 'keys': None}
+        if os.path.exists(self._file('segments.json')):
+            with open(self._file('segments.json')) as f:
+                self.manifest = json.load(f)
+        self.base = self._open_segment('')
+        self.segments = [self._open_segment(f"{name}.") for name in self.manifest['segments']]
+        if self.manifest['keys'] is None:
+            self.manifest['keys'] = len(self.base)
+
+    def _open_segment(self, prefix: str) -> IndexSegment:
+        if not os.path.exists(self._file(f"{prefix}keys.npy")):
+            return IndexSegment(np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64))
+        bloom = None
+        if self.use_bloom and os.path.exists(self._file(f"{prefix}bloom.npy")):
+            with open(self._file(f"{prefix}bloom.json")) as f:
+                meta = json.load(f)
+            bloom = BloomFilter(np.load(self._file(f"{prefix}bloom.npy"), mmap_mode='r'), meta['num_hashes'])
+        return IndexSegment(np.load(self._file(f"{prefix}keys.npy"), mmap_mode='r'),
+                            np.load(self._file(f"{prefix}stats.npy"), mmap_mode='r'), bloom)
+
+    def __len__(self) -> int:
+        return self.manifest['keys']
+
+    def _newest_first(self) -> List[IndexSegment]:
+        return self.staged[::-1] + self.segments[::-1] + [self.base]
+
+    def _lookup(self, keys: np.ndarray, segments: List[IndexSegment]):
+        # A key in a newer segment shadows its older copies, so each key stops at the first segment holding it
+        found = np.zeros(len(keys), dtype=bool)
+        stats = np.zeros(len(keys), dtype=np.uint64)
+        for segment in segments:
+            pending = np.flatnonzero(~found)
+            if len(pending) == 0:
+                break
+            hit, positions = segment.lookup(keys[pending])
+            found[pending[hit]] = True
+            stats[pending[hit]] = segment.stats[positions[hit]]
+        return found, stats
+
+    def classify(self, df: pd.DataFrame) -> pd.Series:
+        codes = np.zeros(len(df), dtype=np.int8)
+        if len(df):
+            found, stats = self._lookup(hash_keys(df), self._newest_first())
+            unchanged = found.copy()
+            unchanged[found] = stats[found] == hash_stats(df)[found]
+            codes[found] = 1
+            codes[unchanged] = 2
+        return pd.Series(pd.Categorical.from_codes(codes, categories=STATUSES), index=df.index, name='record_status')
+
+    def stage(self, df: pd.DataFrame):
+        # Staged ids count for classify right away but only reach disk with flush()
+        if len(df):
+            self.staged.append(IndexSegment(*_keep_last(hash_keys(df), hash_stats(df))))
+
+    def discard_staged(self):
+        self.staged = []
+
+    def flush(self) -> Dict[str, int]:
+        if not self.staged:
+            return {'keys': len(self), 'added': 0}
+        keys, stats = _keep_last(np.concatenate([segment.keys for segment in self.staged]),
+                                 np.concatenate([segment.stats for segment in self.staged]))
+        added = int((~self._lookup(keys, self.segments[::-1] + [self.base])[0]).sum())
+        name = f"segment-{self.manifest['next']:06d}"
+        self._write_segment(f"{name}.", keys, stats)
+        self.manifest = {'segments': self.manifest['segments'] + [name], 'next': self.manifest['next'] + 1,
+                         'keys': len(self) + added}
+        self._save_manifest()
+        self.discard_staged()
+        self._load()
+        self.logger.info(f"Dedup index now holds {len(self)} ids ({added} added, {len(self.segments)} segments)")
+        if len(self.segments) > self.max_segments:
+            self.compact()
+        return {'keys': len(self), 'added': added}
+
+    def add(self, df: pd.DataFrame) -> Dict[str, int]:
+        self.stage(df)
+        return self.flush()
+
+    def compact(self):
+        if not self.segments:
+            return
+        # Oldest first, so keeping the last copy of each key keeps the newest stats
+        runs = [self.base] + self.segments
+        keys, stats = _keep_last(np.concatenate([np.asarray(run.keys) for run in runs]),
+                                 np.concatenate([np.asarray(run.stats) for run in runs]))
+        merged = list(self.manifest['segments'])
+        self._write_segment('', keys, stats)
+        self.manifest = {'segments': [], 'next': self.manifest['next'], 'keys': len(keys)}
+        self._save_manifest()
+        for name in merged:
+            for suffix in ('keys.npy', 'stats.npy', 'bloom.npy', 'bloom.json'):
+                if os.path.exists(self._file(f"{name}.{suffix}")):
+                    os.remove(self._file(f"{name}.{suffix}"))
+        self._load()
+        self.logger.info(f"Compacted {len(merged)} dedup segments into {len(keys)} ids")
+
+    def _write_segment(self, prefix: str, keys: np.ndarray, stats: np.ndarray):
+        self._save(f"{prefix}keys.npy", keys)
+        self._save(f"{prefix}stats.npy", stats)
+        if self.use_bloom:
+            bloom = BloomFilter.create(max(1024, len(keys)), self.bits_per_key)
+            bloom.add(keys)
+            self._save(f"{prefix}bloom.npy", bloom.bits)
+            with open(self._file(f"{prefix}bloom.json"), 'w') as f:
+                json.dump({'capacity': max(1024, len(keys)), 'num_hashes': bloom.num_hashes}, f)
+
+    def _save_manifest(self):
+        tmp = self._file(".segments.json.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self._file('segments.json'))
+
+    def _save(self, name: str, array: np.ndarray):
+        tmp = self._file(f".{name}.tmp")
+        with open(tmp, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp, self._file(name))
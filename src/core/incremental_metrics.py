@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import logging
+import pandas as pd
+from typing import List, Optional, Tuple
+from src.core.utils import data_path
+
+class IncrementalDailyMetrics:
+    SUM_COLUMNS = ['engagement_score', 'likes', 'comments', 'shares']
+
+    @staticmethod
+    def default_path() -> str:
+        return data_path('state', 'daily_metrics.db')
+
+    def __init__(self, path: Optional[str] = None, window: int = 7):
+        self.path = path or self.default_path()
+        self.window = window
+        self.logger = logging.getLogger("incremental_metrics")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS contributions ("
+                "platform TEXT NOT NULL, post_id TEXT NOT NULL, date TEXT NOT NULL, "
+                "engagement_score INTEGER, likes INTEGER, comments INTEGER, shares INTEGER, "
+                "PRIMARY KEY (platform, post_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_aggregates ("
+                "platform TEXT NOT NULL, date TEXT NOT NULL, "
+                "engagement_score_sum INTEGER NOT NULL, engagement_score_count INTEGER NOT NULL, "
+                "likes_sum INTEGER NOT NULL, comments_sum INTEGER NOT NULL, shares_sum INTEGER NOT NULL, "
+                "engagement_ma REAL, PRIMARY KEY (platform, date))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM daily_aggregates LIMIT 1").fetchone() is None
+
+    def folded_run(self) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'folded_run'").fetchone()
+        return row[0] if row else None
+
+    def rebuild(self, df: pd.DataFrame, run_id: Optional[str] = None) -> pd.DataFrame:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM contributions")
+            conn.execute("DELETE FROM daily_aggregates")
+            conn.execute("DELETE FROM meta")
+        self.logger.info(f"Rebuilding daily metrics from {len(df)} stored posts")
+        return self.update(df, run_id)
+
+    def update(self, df: pd.DataFrame, run_id: Optional[str] = None) -> pd.DataFrame:
+        if df.empty:
+            if run_id is not None:
+                with self._connect() as conn:
+                    self._set_folded_run(conn, run_id)
+            return self.to_frame()
+        incoming = df[['platform', 'post_id', 'post_date'] + self.SUM_COLUMNS].dropna(subset=['post_date'])
+        incoming = incoming.drop_duplicates(subset=['platform', 'post_id'], keep='last')
+        incoming = pd.DataFrame({
+            'platform': incoming['platform'].astype(str).values,
+            'post_id': incoming['post_id'].astype(str).values,
+            'date': incoming['post_date'].dt.strftime('%Y-%m-%d').values,
+            **{col: incoming[col].astype('int64').values for col in self.SUM_COLUMNS}
+        })
+        with self._connect() as conn:
+            previous = self._load_contributions(conn, incoming[['platform', 'post_id']])
+            delta = self._aggregate_delta(previous, incoming)
+            self._apply_delta(conn, delta)
+            conn.executemany(
+                "INSERT OR REPLACE INTO contributions "
+                "(platform, post_id, date, engagement_score, likes, comments, shares) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                incoming[['platform', 'post_id', 'date'] + self.SUM_COLUMNS].itertuples(index=False, name=None)
+            )
+            self._refresh_moving_average(conn, delta)
+            if run_id is not None:
+                self._set_folded_run(conn, run_id)
+        self.logger.info(f"Folded {len(incoming)} posts into daily metrics "
+                         f"({len(previous)} retracted, {len(delta)} buckets touched)")
+        return self.to_frame()
+
+    @staticmethod
+    def _set_folded_run(conn: sqlite3.Connection, run_id: str):
+        # The last run whose processed rows were folded in, to tell whether a run wrote posts without us
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('folded_run', ?)", (run_id,))
+
+    def _load_contributions(self, conn: sqlite3.Connection, keys: pd.DataFrame) -> pd.DataFrame:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming_keys (platform TEXT, post_id TEXT)")
+        conn.execute("DELETE FROM incoming_keys")
+        conn.executemany("INSERT INTO incoming_keys VALUES (?, ?)", keys.itertuples(index=False, name=None))
+        return pd.read_sql_query(
+            "SELECT c.platform, c.post_id, c.date, c.engagement_score, c.likes, c.comments, c.shares "
+            "FROM contributions c JOIN incoming_keys k ON c.platform = k.platform AND c.post_id = k.post_id",
+            conn
+        )
+
+    def _aggregate_delta(self, previous: pd.DataFrame, incoming: pd.DataFrame) -> pd.DataFrame:
+        retracted = previous.assign(count=-1)
+        retracted[self.SUM_COLUMNS] = -retracted[self.SUM_COLUMNS]
+        added = incoming.assign(count=1)
+        delta = pd.concat([retracted, added], ignore_index=True) \
+            .groupby(['platform', 'date'], as_index=False)[self.SUM_COLUMNS + ['count']].sum()
+        return delta
+
+    def _apply_delta(self, conn: sqlite3.Connection, delta: pd.DataFrame):
+        conn.executemany(
+            "INSERT INTO daily_aggregates (platform, date, engagement_score_sum, engagement_score_count, "
+            "likes_sum, comments_sum, shares_sum) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(platform, date) DO UPDATE SET "
+            "engagement_score_sum = engagement_score_sum + excluded.engagement_score_sum, "
+            "engagement_score_count = engagement_score_count + excluded.engagement_score_count, "
+            "likes_sum = likes_sum + excluded.likes_sum, "
+            "comments_sum = comments_sum + excluded.comments_sum, "
+            "shares_sum = shares_sum + excluded.shares_sum",
+            (
+                (row.platform, row.date, int(row.engagement_score), int(row.count),
+                 int(row.likes), int(row.comments), int(row.shares))
+                for row in delta.itertuples(index=False)
+            )
+        )
+        conn.execute("DELETE FROM daily_aggregates WHERE engagement_score_count <= 0")
+
+    def _refresh_moving_average(self, conn: sqlite3.Connection, delta: pd.DataFrame):
+        updates: List[Tuple[float, str, str]] = []
+        for platform, first_date in delta.groupby('platform')['date'].min().items():
+            lead_in = conn.execute(
+                "SELECT date FROM daily_aggregates WHERE platform = ? AND date < ? "
+                "ORDER BY date DESC LIMIT ?",
+                (platform, first_date, self.window - 1)
+            ).fetchall()
+            start_date = lead_in[-1][0] if lead_in else first_date
+            rows = pd.read_sql_query(
+                "SELECT date, engagement_score_sum FROM daily_aggregates "
+                "WHERE platform = ? AND date >= ? ORDER BY date",
+                conn, params=(platform, start_date)
+            )
+            rolling = rows['engagement_score_sum'].rolling(window=self.window, min_periods=1).mean()
+            refreshed = rows['date'] >= first_date
+            updates.extend(zip(rolling[refreshed].astype(float), [platform] * int(refreshed.sum()),
+                               rows.loc[refreshed, 'date']))
+        conn.executemany(
+            "UPDATE daily_aggregates SET engagement_ma = ? WHERE platform = ? AND date = ?", updates
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        with self._connect() as conn:
+            metrics = pd.read_sql_query(
+                "SELECT platform, date, engagement_score_sum, engagement_score_count, "
+                "likes_sum, comments_sum, shares_sum, engagement_ma "
+                "FROM daily_aggregates ORDER BY platform, date",
+                conn
+            )
+        if metrics.empty:
+            return pd.DataFrame()
+        metrics['date'] = pd.to_datetime(metrics['date']).dt.date
+        metrics['engagement_score_mean'] = (metrics['engagement_score_sum'] /
+                                            metrics['engagement_score_count']).round(2)
+        return metrics[['platform', 'date', 'engagement_score_sum', 'engagement_score_mean',
+                        'engagement_score_count', 'likes_sum', 'comments_sum', 'shares_sum',
+                        'engagement_ma']]
\ No newline at end of file
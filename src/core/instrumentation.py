@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from src.core.utils import data_path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def path_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for directory, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+    return total
+
+def _task_suffix(report: Dict[str, Any]) -> str:
+    return f"_{report['task']}" if report.get('task') else ""
+
+class JsonReportExporter:
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+
+    def export(self, report: Dict[str, Any]) -> str:
+        # Defaults are resolved per export, so a data root set after construction is still honoured
+        directory = self.directory or data_path('reports')
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run_{report['run_id']}{_task_suffix(report)}.json")
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        return path
+
+class PrometheusTextfileExporter:
+    METRICS = {
+        'wall_seconds': 'Wall-clock time spent in the stage',
+        'cpu_seconds': 'CPU time spent in the stage (by the fetching thread for per-platform stages)',
+        'rss_mb': 'Resident set size at the end of the stage',
+        'rss_delta_mb': 'Change in resident set size over the stage',
+        'peak_rss_mb': 'Process peak resident set size, when the stage raised it',
+        'traced_peak_mb': 'Peak Python heap allocated during the stage (tracemalloc)',
+        'rows': 'Rows handled by the stage',
+        'bytes_written': 'Bytes written by the stage'
+    }
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+
+    def export(self, report: Dict[str, Any]) -> str:
+        path = self.path or data_path('reports', 'pipeline.prom')
+        if report.get('task'):
+            # Each DAG task reports from its own process; the textfile collector reads every *.prom file
+            path = f"{os.path.splitext(path)[0]}{_task_suffix(report)}.prom"
+        lines = []
+        for metric, help_text in self.METRICS.items():
+            name = f"social_media_pipeline_stage_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for stage in report['stages']:
+                if stage.get(metric) is None:
+                    continue
+                labels = f'stage="{stage["stage"]}",platform="{stage.get("platform") or ""}"'
+                if report.get('task'):
+                    labels += f',task="{report["task"]}"'
+                lines.append(f"{name}{{{labels}}} {stage[metric]}")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path + '.tmp', 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + '.tmp', path)
+        return path
+
+class PipelineInstrumentation:
+    def __init__(self, exporters: Optional[List[Any]] = None, trace_memory: bool = False,
+                 profile_stage: Optional[str] = None, profile_dir: Optional[str] = None):
+        self.exporters = exporters if exporters is not None else [JsonReportExporter(), PrometheusTextfileExporter()]
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.logger = logging.getLogger("instrumentation")
+        self.stages: List[Dict[str, Any]] = []
+        self.run_id = None
+        self.task = None
+        self._lock = threading.Lock()
+
+    def start_run(self, run_id: str, task: Optional[str] = None):
+        # task names the part of a run this process handles when a run is split across processes (DAG tasks)
+        self.run_id = run_id
+        self.task = task
+        self.stages = []
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, platform: Optional[str] = None):
+        record = {'stage': name, 'platform': platform, 'rows': None, 'bytes_written': None}
+        profiler = None
+        if self.profile_stage == name and platform is None:
+            profiler = cProfile.Profile()
+        if self.trace_memory and tracemalloc.is_tracing() and platform is None:
+            tracemalloc.reset_peak()
+        # Per-platform stages run side by side in fetch threads: their CPU is the thread's own, and process-wide
+        # memory figures would mix the platforms, so those are only reported for the other stages
+        cpu_clock = time.thread_time if platform is not None else time.process_time
+        rss_start, peak_start = (_current_rss_mb(), _peak_rss_mb()) if platform is None else (None, None)
+        wall_start = time.perf_counter()
+        cpu_start = cpu_clock()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_seconds'] = round(cpu_clock() - cpu_start, 6)
+            if platform is None:
+                rss = _current_rss_mb()
+                record['rss_mb'] = round(rss, 3) if rss is not None else None
+                record['rss_delta_mb'] = round(rss - rss_start, 3) if rss is not None and rss_start is not None \
+                    else None
+                # The lifetime peak only says something about this stage if the stage pushed it higher
+                peak = _peak_rss_mb()
+                record['peak_rss_mb'] = round(peak, 3) if peak is not None and peak_start is not None \
+                    and peak > peak_start else None
+            if self.trace_memory and tracemalloc.is_tracing():
+                record['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+            if profiler:
+                profile_dir = self.profile_dir or data_path('reports')
+                os.makedirs(profile_dir, exist_ok=True)
+                record['profile'] = os.path.join(profile_dir, f"run_{self.run_id}_{name}.prof")
+                profiler.dump_stats(record['profile'])
+            with self._lock:
+                self.stages.append(record)
+
+    def report(self, status: str = 'success') -> Dict[str, Any]:
+        return {
+            'run_id': self.run_id,
+            'task': self.task,
+            'status': status,
+            'generated_at': datetime.now().isoformat(),
+            'stages': list(self.stages)
+        }
+
+    def finish_run(self, status: str = 'success') -> Dict[str, Any]:
+        report = self.report(status)
+        for exporter in self.exporters:
+            try:
+                exporter.export(report)
+            except Exception as e:
+                self.logger.error(f"Could not export run report with {type(exporter).__name__}: {e}")
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return report
\ No newline at end of file
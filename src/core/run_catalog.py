@@ -0,0 +1,96 @@
+import os
+import json
+import uuid
+import sqlite3
+import logging
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, Optional
+from src.core.utils import data_path
+
+class RunCatalog:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path('run_catalog.db')
+        self.logger = logging.getLogger("run_catalog")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, started_at TEXT NOT NULL, finished_at TEXT, "
+                "status TEXT NOT NULL, record_count INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_by_status ON runs (status, finished_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                "run_id TEXT NOT NULL, name TEXT NOT NULL, path TEXT NOT NULL, format TEXT, "
+                "rows INTEGER, columns TEXT, PRIMARY KEY (run_id, name))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def start_run(self, run_id: Optional[str] = None) -> str:
+        run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO runs (run_id, started_at, status) VALUES (?, ?, ?)",
+                         (run_id, datetime.now().isoformat(), 'running'))
+        return run_id
+
+    def record_artifact(self, run_id: str, name: str, path: str, data=None, rows: Optional[int] = None):
+        columns = None
+        if data is not None:
+            if isinstance(data, pd.DataFrame):
+                columns = {col: str(dtype) for col, dtype in data.dtypes.items()}
+            elif hasattr(data, 'schema'):
+                columns = {field.name: str(field.type) for field in data.schema}
+            if rows is None:
+                rows = len(data)
+        file_format = os.path.splitext(path)[1].lstrip('.') or 'dataset'
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO artifacts (run_id, name, path, format, rows, columns) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, name, path, file_format, rows, json.dumps(columns) if columns else None)
+            )
+
+    def finish_run(self, run_id: str, status: str = 'success', record_count: Optional[int] = None):
+        with self._connect() as conn:
+            conn.execute("UPDATE runs SET finished_at = ?, status = ?, record_count = ? WHERE run_id = ?",
+                         (datetime.now().isoformat(), status, record_count, run_id))
+
+    def latest_run(self, status: Optional[str] = 'success', artifact: Optional[str] = None,
+                   exclude: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # status=None matches runs in any state; artifact only matches runs that recorded one of that name
+        conditions, params = [], []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if artifact is not None:
+            conditions.append("run_id IN (SELECT run_id FROM artifacts WHERE name = ?)")
+            params.append(artifact)
+        if exclude is not None:
+            conditions.append("run_id != ?")
+            params.append(exclude)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT * FROM runs {where}ORDER BY COALESCE(finished_at, started_at) DESC LIMIT 1", params
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def artifacts(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM artifacts WHERE run_id = ?", (run_id,)).fetchall()
+        artifacts = {}
+        for row in rows:
+            artifact = dict(row)
+            artifact['columns'] = json.loads(artifact['columns']) if artifact['columns'] else {}
+            artifacts[artifact['name']] = artifact
+        return artifacts
\ No newline at end of file
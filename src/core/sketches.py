@@ -0,0 +1,306 @@
+import io
+import os
+import sqlite3
+import logging
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from src.core.utils import data_path
+
+def hash_values(values) -> np.ndarray:
+    return pd.util.hash_array(np.asarray(values, dtype=object), categorize=False)
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4, table: Optional[np.ndarray] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype='float64')
+
+    def _columns(self, keys: np.ndarray) -> np.ndarray:
+        # Double hashing over the two 32-bit halves of the key, one probe per row
+        low = keys & np.uint64(0xFFFFFFFF)
+        high = (keys >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)
+        return ((low[None, :] + rows[:, None] * high[None, :]) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, keys: np.ndarray, weights: Optional[np.ndarray] = None):
+        if len(keys) == 0:
+            return
+        columns = self._columns(keys)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=weights, minlength=self.width)
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        if len(keys) == 0:
+            return np.zeros(0, dtype='float64')
+        columns = self._columns(keys)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        if self.table.shape != other.table.shape:
+            raise ValueError(f"Cannot merge count-min sketches of shape {self.table.shape} and {other.table.shape}")
+        self.table += other.table
+        return self
+
+class TopicSketch:
+    def __init__(self, width: int = 2048, depth: int = 4, capacity: int = 200):
+        self.mentions = CountMinSketch(width, depth)
+        self.engagement = CountMinSketch(width, depth)
+        self.capacity = capacity
+        self.candidates = np.empty(0, dtype=object)
+
+    def update(self, terms: np.ndarray, engagement: np.ndarray) -> 'TopicSketch':
+        terms = np.asarray(terms, dtype=object)
+        return self.add(hash_values(terms), engagement, pd.unique(terms))
+
+    def add(self, keys: np.ndarray, engagement: np.ndarray, distinct_terms: np.ndarray) -> 'TopicSketch':
+        self.mentions.add(keys)
+        self.engagement.add(keys, np.asarray(engagement, dtype='float64'))
+        self._track(distinct_terms)
+        return self
+
+    def _track(self, terms: np.ndarray):
+        # Heavy hitters: the sketch counts every term, only the heaviest few keep their text
+        candidates = pd.unique(np.concatenate([self.candidates, terms]))
+        if len(candidates) > self.capacity:
+            keep = np.argpartition(-self.weights(candidates), self.capacity - 1)[:self.capacity]
+            candidates = candidates[np.sort(keep)]
+        self.candidates = candidates
+
+    def weights(self, terms: np.ndarray) -> np.ndarray:
+        keys = hash_values(terms)
+        return self.mentions.estimate(keys) + self.engagement.estimate(keys)
+
+    def estimate(self, terms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keys = hash_values(terms)
+        return self.mentions.estimate(keys), self.engagement.estimate(keys)
+
+    def merge(self, other: 'TopicSketch') -> 'TopicSketch':
+        self.mentions.merge(other.mentions)
+        self.engagement.merge(other.engagement)
+        self._track(other.candidates)
+        return self
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, mentions=self.mentions.table, engagement=self.engagement.table,
+                            candidates=self.candidates.astype(str), capacity=self.capacity)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'TopicSketch':
+        with np.load(io.BytesIO(payload)) as arrays:
+            depth, width = arrays['mentions'].shape
+            sketch = cls(width, depth, int(arrays['capacity']))
+            sketch.mentions.table = arrays['mentions']
+            sketch.engagement.table = arrays['engagement']
+            sketch.candidates = arrays['candidates'].astype(object)
+        return sketch
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # frexp is exact on each 32-bit half, where a cast of the whole 64-bit value to float would round
+    high = np.frexp((values >> np.uint64(32)).astype('float64'))[1]
+    low = np.frexp((values & np.uint64(0xFFFFFFFF)).astype('float64'))[1]
+    return np.where(high > 0, high + 32, low)
+
+class HyperLogLog:
+    def __init__(self, precision: int = 14, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, keys: np.ndarray) -> 'HyperLogLog':
+        if len(keys) == 0:
+            return self
+        suffix_bits = 64 - self.precision
+        index = (keys >> np.uint64(suffix_bits)).astype(np.intp)
+        rank = suffix_bits - _bit_length(keys & np.uint64((1 << suffix_bits) - 1)) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    @staticmethod
+    def _sigma(x: float) -> float:
+        if x == 1.0:
+            return np.inf
+        y, z = 1.0, x
+        while True:
+            x *= x
+            previous, z = z, z + x * y
+            y += y
+            if z == previous:
+                return z
+
+    @staticmethod
+    def _tau(x: float) -> float:
+        if x == 0.0 or x == 1.0:
+            return 0.0
+        y, z = 1.0, 1.0 - x
+        while True:
+            x = np.sqrt(x)
+            y *= 0.5
+            previous, z = z, z - (1.0 - x) ** 2 * y
+            if z == previous:
+                return z / 3
+
+    def estimate(self) -> float:
+        # Ertl's improved estimator: no bias tables, and no switch to linear counting for small sets
+        m = len(self.registers)
+        q = 64 - self.precision
+        counts = np.bincount(self.registers, minlength=q + 2).astype('float64')
+        z = m * self._tau(1.0 - counts[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + counts[k])
+        z += m * self._sigma(counts[0] / m)
+        return float(m * m / (2 * np.log(2) * z))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if self.precision != other.precision:
+            raise ValueError(f"Cannot merge HyperLogLog sketches of precision {self.precision} and {other.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, registers=self.registers)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'HyperLogLog':
+        with np.load(io.BytesIO(payload)) as arrays:
+            registers = arrays['registers']
+        return cls(int(np.log2(len(registers))), registers)
+
+class TDigest:
+    def __init__(self, compression: float = 200):
+        self.compression = compression
+        self.means = np.empty(0, dtype='float64')
+        self.weights = np.empty(0, dtype='float64')
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values: np.ndarray) -> 'TDigest':
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        quantiles = (cumulative - weights / 2) / cumulative[-1]
+        # Arcsine scale: centroids may cover one unit of k each, so they stay small near both tails
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * quantiles - 1, -1, 1)))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q) -> np.ndarray:
+        q = np.atleast_1d(np.asarray(q, dtype='float64'))
+        if len(self.weights) == 0:
+            return np.full(len(q), np.nan)
+        cumulative = np.cumsum(self.weights)
+        # Centroids sit at their mean rank, so a digest of single points matches numpy's linear quantiles
+        ranks = np.concatenate([[0.0], cumulative - (self.weights + 1) / 2, [cumulative[-1] - 1]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q * (cumulative[-1] - 1), ranks, values)
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        if len(other.weights) == 0:
+            return self
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, means=self.means, weights=self.weights,
+                            bounds=np.array([self.min, self.max]), compression=self.compression)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'TDigest':
+        with np.load(io.BytesIO(payload)) as arrays:
+            digest = cls(float(arrays['compression']))
+            digest.means = arrays['means']
+            digest.weights = arrays['weights']
+            digest.min, digest.max = (float(bound) for bound in arrays['bounds'])
+        return digest
+
+def merge_sketches(left: Dict, right: Dict) -> Dict:
+    merged = dict(left)
+    for key, sketch in right.items():
+        merged[key] = merged[key].merge(sketch) if key in merged else sketch
+    return merged
+
+class SketchStore:
+    SKETCH_TYPES = {'topics': TopicSketch, 'authors': HyperLogLog, 'engagement': TDigest}
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path('state', 'sketches.db')
+        self.logger = logging.getLogger("sketches")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sketches ("
+                "kind TEXT NOT NULL, platform TEXT NOT NULL, date TEXT NOT NULL, payload BLOB NOT NULL, "
+                "PRIMARY KEY (kind, platform, date))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def merge(self, kind: str, sketches: Dict[Tuple[str, date], object]):
+        if not sketches:
+            return
+        sketch_type = self.SKETCH_TYPES[kind]
+        with self._connect() as conn:
+            rows = []
+            for (platform, day), sketch in sketches.items():
+                stored = conn.execute(
+                    "SELECT payload FROM sketches WHERE kind = ? AND platform = ? AND date = ?",
+                    (kind, platform, day.isoformat())
+                ).fetchone()
+                if stored is not None:
+                    sketch = sketch_type.from_bytes(stored[0]).merge(sketch)
+                rows.append((kind, platform, day.isoformat(), sketch.to_bytes()))
+            conn.executemany("INSERT OR REPLACE INTO sketches (kind, platform, date, payload) VALUES (?, ?, ?, ?)",
+                             rows)
+        self.logger.info(f"Merged {len(rows)} {kind} sketches")
+
+    def load(self, kind: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+             platforms: Optional[Iterable[str]] = None) -> Dict[Tuple[str, date], object]:
+        query = "SELECT platform, date, payload FROM sketches WHERE kind = ?"
+        params = [kind]
+        if start_date is not None:
+            query += " AND date >= ?"
+            params.append(start_date.isoformat())
+        if end_date is not None:
+            query += " AND date <= ?"
+            params.append(end_date.isoformat())
+        if platforms is not None:
+            platforms = list(platforms)
+            query += f" AND platform IN ({', '.join('?' * len(platforms))})"
+            params.extend(platforms)
+        sketch_type = self.SKETCH_TYPES[kind]
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return {(platform, date.fromisoformat(day)): sketch_type.from_bytes(payload)
+                for platform, day, payload in rows}
+
+    def latest_date(self, kind: str) -> Optional[date]:
+        with self._connect() as conn:
+            latest = conn.execute("SELECT MAX(date) FROM sketches WHERE kind = ?", (kind,)).fetchone()[0]
+        return date.fromisoformat(latest) if latest else None
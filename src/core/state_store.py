@@ -0,0 +1,69 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any
+from src.core.utils import data_path
+
+class StateStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or data_path('state', 'pipeline_state.db')
+        self.logger = logging.getLogger("state_store")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                "platform TEXT NOT NULL, source TEXT NOT NULL, "
+                "post_date TEXT, post_id TEXT, updated_at TEXT NOT NULL, "
+                "PRIMARY KEY (platform, source))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "platform TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_watermark(self, platform: str, source: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT post_date, post_id FROM watermarks WHERE platform = ? AND source = ?",
+                (platform, source)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'post_date': datetime.fromisoformat(row[0]) if row[0] else None,
+            'post_id': row[1]
+        }
+
+    def update_watermark(self, platform: str, source: str, post_date: Optional[datetime], post_id: Optional[str]):
+        current = self.get_watermark(platform, source)
+        if current and current['post_date'] and post_date and post_date <= current['post_date']:
+            return
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO watermarks (platform, source, post_date, post_id, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (platform, source, post_date.isoformat() if post_date else None, post_id,
+                 datetime.now().isoformat())
+            )
+        self.logger.info(f"Watermark for {platform}/{source} advanced to {post_date} ({post_id})")
+
+    def consume_tokens(self, platform: str, cost: float, rate: float, capacity: float,
+                       now: Optional[float] = None) -> float:
+        # Refill and spend in one write transaction, so every process sharing the quota sees the others' spending
+        now = time.time() if now is None else now
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE platform = ?",
+                               (platform,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(now - row[1], 0) * rate)
+            tokens -= cost
+            conn.execute("INSERT OR REPLACE INTO rate_limits (platform, tokens, updated_at) VALUES (?, ?, ?)",
+                         (platform, tokens, now))
+        return tokens
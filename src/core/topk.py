@@ -0,0 +1,137 @@
+import heapq
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+class TopKTracker:
+    def __init__(self, k: int, by: Sequence[str] = (), score: str = 'engagement_score',
+                 columns: Optional[Sequence[str]] = None, ties: str = 'first'):
+        if ties not in ('first', 'all'):
+            raise ValueError(f"Unsupported ties mode: {ties}")
+        self.k = k
+        self.by = list(by)
+        self.score = score
+        self.columns = list(columns) if columns is not None else None
+        self.ties = ties
+        self._heaps: Dict[Tuple, List[Tuple]] = {}
+        self._tied: Dict[Tuple, List[Tuple]] = {}
+        self._seen = 0
+        self._columns_order: Optional[List[str]] = None
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        if 'date' in self.by and 'date' not in df.columns:
+            df = df.assign(date=df['post_date'].dt.date)
+        keep = list(dict.fromkeys(self.by + [self.score] + (self.columns or list(df.columns))))
+        return df[[col for col in keep if col in df.columns]].reset_index(drop=True)
+
+    def _preselect(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.by:
+            ranked = df.sort_values(self.by + [self.score], ascending=[True] * len(self.by) + [False],
+                                    kind='stable')
+            rank = ranked.groupby(self.by, observed=True, sort=False).cumcount().to_numpy()
+        else:
+            ranked = df.sort_values(self.score, ascending=False, kind='stable')
+            rank = np.arange(len(ranked))
+        if self.ties == 'first':
+            return ranked[rank < self.k]
+        kth = ranked[rank == self.k - 1]
+        if not self.by:
+            return ranked[ranked[self.score] >= kth[self.score].iloc[0]] if len(kth) else ranked
+        cutoff = ranked[self.by].merge(kth[self.by + [self.score]].rename(columns={self.score: '_cutoff'}),
+                                       on=self.by, how='left')['_cutoff'].to_numpy()
+        scores = ranked[self.score].to_numpy()
+        return ranked[np.isnan(cutoff.astype('float64')) | (scores >= cutoff)]
+
+    def _thresholds(self, df: pd.DataFrame) -> np.ndarray:
+        full = {key: heap[0][0] for key, heap in self._heaps.items() if len(heap) >= self.k}
+        if not full:
+            return np.full(len(df), -np.inf)
+        if self.by:
+            keys = df[self.by].itertuples(index=False, name=None)
+            return np.fromiter((full.get(key, -np.inf) for key in keys), dtype='float64', count=len(df))
+        return np.full(len(df), full.get((), -np.inf))
+
+    def update(self, df: pd.DataFrame) -> 'TopKTracker':
+        if df is None or len(df) == 0:
+            return self
+        df = self._prepare(df)
+        offset = self._seen
+        self._seen += len(df)
+        candidates = self._preselect(df)
+        scores = candidates[self.score].to_numpy()
+        thresholds = self._thresholds(candidates)
+        if self.ties == 'first':
+            candidates = candidates[scores > thresholds]
+        else:
+            candidates = candidates[scores >= thresholds]
+        if candidates.empty:
+            return self
+        key_positions = [candidates.columns.get_loc(col) for col in self.by]
+        score_position = candidates.columns.get_loc(self.score)
+        self._columns_order = list(candidates.columns)
+        for index, row in zip(candidates.index.to_numpy(), candidates.itertuples(index=False, name=None)):
+            key = tuple(row[i] for i in key_positions)
+            self._push(key, (row[score_position], -(offset + index), row))
+        return self
+
+    def _push(self, key: Tuple, item: Tuple):
+        heap = self._heaps.setdefault(key, [])
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+            return
+        if self.ties == 'all' and item[0] == heap[0][0]:
+            self._tied.setdefault(key, []).append(item)
+            return
+        if item[:2] <= heap[0][:2]:
+            return
+        evicted = heapq.heappushpop(heap, item)
+        if self.ties == 'all':
+            if evicted[0] == heap[0][0]:
+                self._tied.setdefault(key, []).append(evicted)
+            else:
+                self._tied.pop(key, None)
+
+    def merge(self, other: 'TopKTracker') -> 'TopKTracker':
+        offset = self._seen
+        self._seen += other._seen
+        for key, heap in other._heaps.items():
+            for score, seq, row in heap + other._tied.get(key, []):
+                self._push(key, (score, seq - offset, row))
+        if self._columns_order is None:
+            self._columns_order = other._columns_order
+        return self
+
+    def result(self) -> pd.DataFrame:
+        items = []
+        for key in sorted(self._heaps, key=lambda key: tuple(str(part) for part in key)):
+            group = self._heaps[key] + self._tied.get(key, [])
+            items.extend(sorted(group, key=lambda item: (-item[0], -item[1])))
+        if not items:
+            return pd.DataFrame(columns=self.columns or [])
+        result = pd.DataFrame([item[2] for item in items], columns=self._columns_order)
+        return result[self.columns] if self.columns is not None else result
+
+class TopPostsTracker:
+    COLUMNS = ['platform', 'post_id', 'content', 'engagement_score', 'likes', 'comments', 'shares']
+
+    def __init__(self, overall_n: int = 5, platform_n: int = 3, ties: str = 'first'):
+        self.overall = TopKTracker(overall_n, columns=self.COLUMNS, ties=ties)
+        self.per_platform = TopKTracker(platform_n, by=['platform'], columns=self.COLUMNS, ties=ties)
+
+    def update(self, df: pd.DataFrame) -> 'TopPostsTracker':
+        if df is not None and len(df):
+            df = df.assign(platform=df['platform'].astype(str))
+            self.overall.update(df)
+            self.per_platform.update(df)
+        return self
+
+    def merge(self, other: 'TopPostsTracker') -> 'TopPostsTracker':
+        self.overall.merge(other.overall)
+        self.per_platform.merge(other.per_platform)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'top_overall': self.overall.result(),
+            'top_per_platform': self.per_platform.result()[self.COLUMNS[1:]]
+        }
\ No newline at end of file
@@ -1,9 +1,22 @@
 import logging
 import pandas as pd
 import os
-from typing import Union
+from typing import Optional, Union
 import sys
 
+DATA_ROOT_ENV = 'SOCIAL_MEDIA_DATA_ROOT'
+_data_root = None
+
+def set_data_root(root: Optional[str]) -> str:
+    # Every state file, dataset and report lives under this directory; workers sharing state must share it
+    global _data_root
+    if root:
+        _data_root = root
+    return data_path()
+
+def data_path(*parts: str) -> str:
+    return os.path.join(_data_root or os.environ.get(DATA_ROOT_ENV) or 'data', *parts)
+
 def setup_logging(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
@@ -16,6 +29,12 @@ def setup_logging(name: str) -> logging.Logger:
 
 def save_data(data: pd.DataFrame, filepath: str):
     os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    if not isinstance(data, pd.DataFrame):
+        if filepath.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            pq.write_table(data, filepath)
+            return
+        data = data.to_pandas()
     if filepath.endswith('.parquet'):
         data.to_parquet(filepath, index=False)
     elif filepath.endswith('.csv'):
@@ -23,4 +42,149 @@ def save_data(data: pd.DataFrame, filepath: str):
     elif filepath.endswith('.json'):
         data.to_json(filepath, orient='records', indent=2)
     else:
-        raise ValueError(f"Unsupported file format: {filepath}")
\ No newline at end of file
+        raise ValueError(f"Unsupported file format: {filepath}")
+
+DATASET_PARTITION_SCHEMA = [('platform', 'string'), ('date', 'string')]
+DATASET_DEDUP_KEYS = ['platform', 'post_id']
+
+def _dataset_partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([(name, getattr(pa, dtype)()) for name, dtype in DATASET_PARTITION_SCHEMA]),
+                           flavor='hive')
+
+def _conform_table(data):
+    import pyarrow as pa
+    from src.core.columnar import arrow_schema_from_pandas
+    from src.core.data_processor import DataProcessor
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    target = arrow_schema_from_pandas(DataProcessor.SCHEMA)
+    # Every file of a dataset gets one column order: schema columns in schema order, then any others by name,
+    # so files written by the arrow and pandas paths can be concatenated when a partition is compacted
+    names = [name for name in target.names if name in table.column_names] + \
+        sorted(name for name in table.column_names if name not in target.names)
+    table = table.select(names)
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        if pa.types.is_large_string(column.type):
+            column = column.cast(pa.string())
+        if field.name in target.names and not pa.types.is_dictionary(target.field(field.name).type):
+            wanted = target.field(field.name).type
+            if not column.type.equals(wanted):
+                try:
+                    column = column.cast(wanted)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    pass
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+def _deduplicate_table(table):
+    keys = [key for key in DATASET_DEDUP_KEYS if key in table.column_names]
+    if 'post_id' not in keys:
+        return table
+    key_frame = table.select(keys + (['collected_at'] if 'collected_at' in table.column_names else [])).to_pandas()
+    if 'collected_at' in key_frame.columns:
+        key_frame = key_frame.sort_values('collected_at', kind='stable')
+    keep = key_frame.drop_duplicates(subset=keys, keep='last').index.sort_values()
+    if len(keep) == table.num_rows:
+        return table
+    return table.take(keep.to_numpy())
+
+def write_partitioned_dataset(data, root: str, compact_threshold: int = 8, max_rows_per_group: int = 128_000):
+    import uuid
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    logger = logging.getLogger("dataset_store")
+    table = _conform_table(data)
+    if table.num_rows == 0:
+        return {'files': [], 'rows': 0, 'bytes': 0}
+    post_dates = table.column('post_date')
+    if not pa.types.is_timestamp(post_dates.type):
+        post_dates = pa.array(pd.to_datetime(post_dates.to_pandas(), errors='coerce', utc=True)
+                              .dt.tz_convert(None), type=pa.timestamp('ns'))
+    dates = pc.fill_null(pc.strftime(post_dates, format='%Y-%m-%d'), 'unknown')
+    if 'date' in table.column_names:
+        table = table.drop(['date'])
+    table = _deduplicate_table(table.append_column('date', dates))
+    written = []
+    ds.write_dataset(
+        table, root, format='parquet',
+        partitioning=_dataset_partitioning(),
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_group=max_rows_per_group,
+        min_rows_per_group=min(max_rows_per_group, table.num_rows),
+        file_visitor=lambda written_file: written.append(written_file.path)
+    )
+    written_bytes = sum(os.path.getsize(path) for path in written)
+    logger.info(f"Appended {table.num_rows} rows ({written_bytes} bytes) to {root} across {len(written)} partition files")
+    touched = sorted({os.path.dirname(path) for path in written})
+    compact_dataset(root, partitions=touched, min_files=compact_threshold)
+    return {'files': written, 'rows': table.num_rows, 'bytes': written_bytes}
+
+def compact_dataset(root: str, partitions=None, min_files: int = 2) -> int:
+    import glob
+    import uuid
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    logger = logging.getLogger("dataset_store")
+    if partitions is None:
+        partitions = sorted({os.path.dirname(path) for path in glob.glob(os.path.join(root, '*', '*', '*.parquet'))})
+    compacted = 0
+    for partition in partitions:
+        files = sorted(glob.glob(os.path.join(partition, '*.parquet')))
+        if len(files) < max(min_files, 2):
+            continue
+        # Files written before the column order was fixed, or by another path, may still differ in order or types
+        tables = [_conform_table(pq.ParquetFile(path).read()) for path in files]
+        table = _deduplicate_table(pa.concat_tables(tables, promote_options='permissive'))
+        target = os.path.join(partition, f"part-{uuid.uuid4().hex}-compacted.parquet")
+        pq.write_table(table, target + '.tmp', write_statistics=True)
+        os.replace(target + '.tmp', target)
+        for path in files:
+            os.remove(path)
+        compacted += 1
+        logger.info(f"Compacted {len(files)} files into one ({table.num_rows} rows) in {partition}")
+    return compacted
+
+def read_partitioned_dataset(root: str, platforms=None, start_date=None, end_date=None,
+                             columns=None, deduplicate: bool = True, partitions=None) -> pd.DataFrame:
+    import pyarrow.dataset as ds
+    if not os.path.isdir(root) or (partitions is not None and not len(partitions)):
+        return pd.DataFrame()
+    dataset = ds.dataset(root, format='parquet', partitioning=_dataset_partitioning())
+    predicate = None
+    conditions = []
+    if partitions is not None:
+        # (platform, date) pairs; each platform's dates become one isin so the predicate stays small
+        days = {}
+        for platform, day in partitions:
+            days.setdefault(str(platform), set()).add(str(day)[:10])
+        selected = [(ds.field('platform') == platform) & ds.field('date').isin(sorted(dates))
+                    for platform, dates in days.items()]
+        condition = selected[0]
+        for other in selected[1:]:
+            condition = condition | other
+        conditions.append(condition)
+    if platforms:
+        conditions.append(ds.field('platform').isin(list(platforms)))
+    if start_date is not None:
+        conditions.append(ds.field('date') >= str(start_date)[:10])
+    if end_date is not None:
+        conditions.append(ds.field('date') <= str(end_date)[:10])
+    for condition in conditions:
+        predicate = condition if predicate is None else predicate & condition
+    read_columns = None
+    if columns is not None:
+        extra = DATASET_DEDUP_KEYS + ['collected_at'] if deduplicate else []
+        read_columns = [col for col in dict.fromkeys(list(columns) + extra) if col in dataset.schema.names]
+    table = dataset.to_table(columns=read_columns, filter=predicate)
+    if deduplicate:
+        table = _deduplicate_table(table)
+    frame = table.to_pandas()
+    if columns is not None:
+        frame = frame[[col for col in columns if col in frame.columns]]
+    return frame
\ No newline at end of file
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Sequence
+from src.core.utils import data_path
+
+POST_COLUMNS = ['platform', 'post_id', 'author_id', 'author_name', 'content', 'likes', 'comments', 'shares',
+                'engagement_score', 'post_date', 'post_day', 'post_hour', 'collected_at']
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS posts ("
+    "platform TEXT NOT NULL, post_id TEXT NOT NULL, author_id TEXT, author_name TEXT, content TEXT, "
+    "likes BIGINT, comments BIGINT, shares BIGINT, engagement_score DOUBLE, post_date TEXT, post_day TEXT, "
+    "post_hour INTEGER, collected_at TEXT, PRIMARY KEY (platform, post_id))",
+    "CREATE INDEX IF NOT EXISTS posts_by_author ON posts (platform, author_id)",
+    "CREATE INDEX IF NOT EXISTS posts_by_day ON posts (platform, post_day)",
+    "CREATE INDEX IF NOT EXISTS posts_by_hour ON posts (platform, post_hour, engagement_score)",
+    "CREATE TABLE IF NOT EXISTS daily_metrics ("
+    "platform TEXT NOT NULL, date TEXT NOT NULL, engagement_score_sum DOUBLE, engagement_score_count BIGINT, "
+    "likes_sum BIGINT, comments_sum BIGINT, shares_sum BIGINT, PRIMARY KEY (platform, date))",
+    "CREATE TABLE IF NOT EXISTS authors ("
+    "platform TEXT NOT NULL, author_id TEXT NOT NULL, author_name TEXT, post_count BIGINT, "
+    "engagement_sum DOUBLE, likes_sum BIGINT, comments_sum BIGINT, shares_sum BIGINT, "
+    "first_post TEXT, last_post TEXT, PRIMARY KEY (platform, author_id))",
+    "CREATE INDEX IF NOT EXISTS authors_by_engagement ON authors (engagement_sum)"
+]
+
+UPSERT_POSTS = (
+    "INSERT INTO posts SELECT {columns} FROM stage_posts WHERE true "
+    "ON CONFLICT (platform, post_id) DO UPDATE SET "
+    + ', '.join(f"{col} = excluded.{col}" for col in POST_COLUMNS[2:])
+).format(columns=', '.join(POST_COLUMNS))
+
+REFRESH_DAILY_METRICS = (
+    "INSERT OR REPLACE INTO daily_metrics "
+    "SELECT platform, post_day, SUM(engagement_score), COUNT(engagement_score), SUM(likes), SUM(comments), "
+    "SUM(shares) FROM posts WHERE (platform, post_day) IN (SELECT DISTINCT platform, post_day FROM stage_posts) "
+    "GROUP BY platform, post_day"
+)
+
+REFRESH_AUTHORS = (
+    "INSERT OR REPLACE INTO authors "
+    "SELECT platform, author_id, MAX(author_name), COUNT(*), SUM(engagement_score), SUM(likes), SUM(comments), "
+    "SUM(shares), MIN(post_date), MAX(post_date) FROM posts "
+    "WHERE (platform, author_id) IN (SELECT DISTINCT platform, author_id FROM stage_posts) "
+    "GROUP BY platform, author_id"
+)
+
+QUERIES = {
+    'author_engagement': (
+        "SELECT platform, author_id, author_name, post_count, engagement_sum, "
+        "ROUND(engagement_sum / post_count, 2) AS avg_engagement, first_post, last_post "
+        "FROM authors {where} ORDER BY engagement_sum DESC LIMIT ?",
+        {'platform': 'platform = ?'}
+    ),
+    'hour_of_day': (
+        "SELECT platform, post_hour, COUNT(*) AS posts, ROUND(AVG(engagement_score), 2) AS avg_engagement "
+        "FROM posts {where} GROUP BY platform, post_hour ORDER BY platform, post_hour LIMIT ?",
+        {'platform': 'platform = ?', 'start_date': 'post_day >= ?', 'end_date': 'post_day <= ?'}
+    ),
+    'platform_comparison': (
+        "SELECT platform, COUNT(*) AS days, SUM(engagement_score_count) AS posts, "
+        "SUM(engagement_score_sum) AS engagement, "
+        "ROUND(SUM(engagement_score_sum) / SUM(engagement_score_count), 2) AS avg_engagement, "
+        "SUM(likes_sum) AS likes, SUM(comments_sum) AS comments, SUM(shares_sum) AS shares "
+        "FROM daily_metrics {where} GROUP BY platform ORDER BY engagement DESC LIMIT ?",
+        {'platform': 'platform = ?', 'start_date': 'date >= ?', 'end_date': 'date <= ?'}
+    ),
+    'daily_metrics': (
+        "SELECT platform, date, engagement_score_sum, engagement_score_count, "
+        "ROUND(engagement_score_sum / engagement_score_count, 2) AS engagement_score_mean, "
+        "likes_sum, comments_sum, shares_sum FROM daily_metrics {where} ORDER BY platform, date LIMIT ?",
+        {'platform': 'platform = ?', 'start_date': 'date >= ?', 'end_date': 'date <= ?'}
+    )
+}
+
+# Under the data root
+WAREHOUSE_FILES = {'sqlite': "warehouse.db", 'duckdb': "warehouse.duckdb"}
+
+class AnalyticsWarehouse:
+    def __init__(self, path: Optional[str] = None, engine: str = "sqlite"):
+        if engine not in WAREHOUSE_FILES:
+            raise ValueError(f"Unsupported warehouse engine: {engine}")
+        self.path = path or data_path(WAREHOUSE_FILES[engine])
+        self.engine = engine
+        self.logger = logging.getLogger("warehouse")
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = self._connect()
+        try:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self, read_only: bool = False):
+        if self.engine == 'duckdb':
+            import duckdb
+            return duckdb.connect(self.path, read_only=read_only and os.path.exists(self.path))
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _post_rows(df: pd.DataFrame) -> pd.DataFrame:
+        post_date = df['post_date'].to_numpy(dtype='datetime64[s]', na_value=np.datetime64('NaT'))
+        missing = np.isnat(post_date)
+        days = post_date.astype('datetime64[D]')
+        hours = pd.array((post_date - days).astype('timedelta64[h]').astype('int64'), dtype='Int64')
+        hours[missing] = pd.NA
+        frame = pd.DataFrame({
+            'platform': df['platform'].astype(str).to_numpy(),
+            'post_id': df['post_id'].astype(str).to_numpy(),
+            'author_id': df['author_id'].astype(object).to_numpy() if 'author_id' in df.columns else None,
+            'author_name': df['author_name'].astype(object).to_numpy() if 'author_name' in df.columns else None,
+            'content': df['content'].astype(object).to_numpy() if 'content' in df.columns else None,
+            'likes': df['likes'].to_numpy(dtype='int64', na_value=0),
+            'comments': df['comments'].to_numpy(dtype='int64', na_value=0),
+            'shares': df['shares'].to_numpy(dtype='int64', na_value=0),
+            'engagement_score': df['engagement_score'].to_numpy(dtype='float64', na_value=np.nan),
+            'post_date': np.where(missing, None, np.datetime_as_string(post_date, unit='s')),
+            'post_day': np.where(missing, None, np.datetime_as_string(days, unit='D')),
+            'post_hour': hours,
+            'collected_at': pd.to_datetime(df['collected_at']).astype(str).to_numpy()
+                            if 'collected_at' in df.columns else None
+        })
+        return frame.drop_duplicates(['platform', 'post_id'], keep='last')
+
+    def _stage(self, conn, frame: pd.DataFrame):
+        if self.engine == 'duckdb':
+            conn.register('stage_posts', frame)
+            return
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS stage_posts AS SELECT * FROM posts WHERE 0")
+        conn.execute("DELETE FROM stage_posts")
+        records = frame.astype(object).where(frame.notna(), None)
+        conn.executemany(f"INSERT INTO stage_posts ({', '.join(POST_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(POST_COLUMNS))})",
+                         records[POST_COLUMNS].itertuples(index=False, name=None))
+
+    def load_posts(self, df) -> int:
+        if not isinstance(df, pd.DataFrame):
+            df = df.to_pandas()
+        if df.empty:
+            return 0
+        frame = self._post_rows(df)
+        conn = self._connect()
+        try:
+            self._stage(conn, frame)
+            conn.execute(UPSERT_POSTS)
+            conn.execute(REFRESH_DAILY_METRICS)
+            conn.execute(REFRESH_AUTHORS)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        self.logger.info(f"Loaded {len(frame)} posts into {self.path}")
+        return len(frame)
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        conn = self._connect(read_only=True)
+        try:
+            cursor = conn.execute(sql, list(params))
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def run_query(self, name: str, limit: int = 20, **filters) -> List[Dict[str, Any]]:
+        if name not in QUERIES:
+            raise ValueError(f"Unknown query '{name}'. Available: {', '.join(QUERIES)}")
+        sql, allowed = QUERIES[name]
+        unknown = [key for key, value in filters.items() if value is not None and key not in allowed]
+        if unknown:
+            raise ValueError(f"Query '{name}' does not support filters: {', '.join(unknown)}")
+        clauses, params = [], []
+        for key, clause in allowed.items():
+            if filters.get(key) is not None:
+                clauses.append(clause)
+                params.append(str(filters[key]))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self.query(sql.format(where=where), params + [int(limit)])
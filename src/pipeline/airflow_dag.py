@@ -1,35 +1,81 @@
-from airflow import DAG
+import re
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
-from airflow.providers.standard.operators.python import PythonOperator
+try:
+    from airflow.sdk import dag, task, Variable
+except ImportError:
+    from airflow.decorators import dag, task
+    from airflow.models import Variable
 
-from src.pipeline.main import SocialMediaPipeline
+# Passed to every task's SocialMediaPipeline, e.g. {'incremental': True, 'columnar': 'arrow'}
+PIPELINE_OPTIONS = {}
+
+# Every task opens the same run catalog, dedup index, sketches, state and datasets under this root, so it must be
+# one filesystem mounted at the same path on every worker (NFS, EFS, a shared volume). The relative default,
+# data, only works when all tasks run on one machine from the same working directory.
+DATA_ROOT_VARIABLE = 'social_media_data_root'
+# Tasks hand each other Parquet files under this root; defaults to <data root>/staging
+STAGING_PATH_VARIABLE = 'social_media_staging_path'
 
 default_args = {
     'owner': 'data_engineer',
     'depends_on_past': False,
-    'start_date': datetime(2024, 1, 1),
     'email_on_failure': False,
     'email_on_retry': False,
     'retries': 1,
     'retry_delay': timedelta(minutes=5)
 }
 
-dag = DAG(
-    'social_media_analytics',
+# Variables are read when a task runs rather than at parse time, so parsing the DAG never queries the metadata
+# database
+def _data_root() -> str:
+    from src.core.utils import set_data_root
+    return set_data_root(Variable.get(DATA_ROOT_VARIABLE, None))
+
+# Tasks import the pipeline when they run, so the scheduler's DAG parse loop never loads pandas or the API SDKs
+def _pipeline(platforms: Optional[List[str]] = None):
+    from src.pipeline.main import SocialMediaPipeline
+    staging_path = Variable.get(STAGING_PATH_VARIABLE, None)
+    return SocialMediaPipeline(platforms=platforms, staging_path=staging_path, data_root=_data_root(),
+                               **PIPELINE_OPTIONS)
+
+@dag(
+    dag_id='social_media_analytics',
     default_args=default_args,
     description='Daily social media analytics pipeline',
-    schedule_interval='@daily',
+    schedule='@daily',
+    start_date=datetime(2024, 1, 1),
     catchup=False,
     tags=['social_media', 'analytics']
 )
+def social_media_analytics():
+    @task
+    def start_run(**context) -> str:
+        from src.core.run_catalog import RunCatalog
+        _data_root()
+        return RunCatalog().start_run(re.sub(r'[^A-Za-z0-9_.-]', '_', context['run_id']))
+
+    @task
+    def enabled_platforms() -> List[str]:
+        from src.api.registry import enabled_platforms
+        return enabled_platforms()
+
+    @task(retries=3)
+    def collect(platform: str, catalog_run_id: str) -> Optional[str]:
+        return _pipeline([platform]).collect_platform(catalog_run_id, platform)
+
+    # all_done: a platform that still fails after its retries must not hold back the others
+    @task(trigger_rule='all_done')
+    def process(catalog_run_id: str, raw_paths: List[Optional[str]]) -> Optional[Dict[str, str]]:
+        return _pipeline([]).process_staged(catalog_run_id, list(raw_paths))
+
+    @task
+    def analyze(catalog_run_id: str, staged: Optional[Dict[str, str]]):
+        _pipeline([]).analyze_staged(catalog_run_id, staged)
 
-def run_pipeline():
-    pipeline = SocialMediaPipeline()
-    pipeline.run()
+    catalog_run_id = start_run()
+    raw_paths = collect.partial(catalog_run_id=catalog_run_id).expand(platform=enabled_platforms())
+    analyze(catalog_run_id, process(catalog_run_id, raw_paths))
 
-pipeline_task = PythonOperator(
-    task_id='run_social_media_pipeline',
-    python_callable=run_pipeline,
-    dag=dag
-)
\ No newline at end of file
+dag = social_media_analytics()
@@ -1,9 +1,14 @@
 import sys
 import os
+import glob
+import json
 import pandas as pd
 import logging
-from datetime import datetime
-from typing import Dict, Any
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Iterator, List
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 src_path = os.path.abspath(os.path.join(current_dir, '..', '..'))
@@ -11,73 +16,193 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 try:
-    from src.api.twitter_client import TwitterClient
-    from src.api.youtube_client import YouTubeClient
     from src.core.data_processor import DataProcessor
     from src.core.analyzer import AnalyticsEngine
-    from src.core.utils import setup_logging, save_data
+    from src.core.topk import TopPostsTracker
+    from src.core.utils import setup_logging, save_data, write_partitioned_dataset, read_partitioned_dataset, \
+        set_data_root, data_path
+    from src.core.state_store import StateStore
+    from src.core.incremental_metrics import IncrementalDailyMetrics
+    from src.core.run_catalog import RunCatalog
+    from src.core.warehouse import AnalyticsWarehouse
+    from src.core.dedup_index import DedupIndex
+    from src.core.sketches import SketchStore, merge_sketches
+    from src.api.response_cache import ResponseCache
+    from src.api.transport import redact_secrets
+    from src.api.registry import create_clients
+    from src.core.instrumentation import PipelineInstrumentation, path_size
+    from config.api_config import APIConfig
 except ImportError as e:
     print(f"Import error: {e}")
     print("Current sys.path:", sys.path)
     raise
 
 class SocialMediaPipeline:
-    def __init__(self):
+
+    def __init__(self, concurrent: bool = False, fetch_timeout: Optional[float] = None,
+                 incremental: bool = False, columnar: str = "pandas",
+                 instrumentation: Optional[PipelineInstrumentation] = None,
+                 analytics_backend: str = "pandas", analytics_workers: Optional[int] = None,
+                 warehouse: Optional[str] = "sqlite", response_cache: bool = False, offline: bool = False,
+                 dedup: bool = True, platforms: Optional[List[str]] = None, staging_path: Optional[str] = None,
+                 data_root: Optional[str] = None):
         self.logger = setup_logging("pipeline")
-        self.clients = {}
-        try:
-            from src.api.youtube_client import YouTubeClient
-            self.clients['youtube'] = YouTubeClient()
-            self.logger.info("YouTube client loaded successfully")
-        except Exception as e:
-            self.logger.error(f"YouTube client not available: {e}")
-            raise
-        try:
-            from src.api.facebook_client import FacebookClient
-            self.clients['facebook'] = FacebookClient()
-            self.logger.info("Facebook client loaded successfully")
-        except Exception as e:
-            self.logger.warning(f"Facebook client not available: {e}")
-        try:
-            from src.api.twitter_client import TwitterClient
-            self.clients['twitter'] = TwitterClient()
-            self.logger.info("Twitter client loaded successfully")
-        except Exception as e:
-            self.logger.warning(f"Twitter client not available: {e}")
-        if not self.clients:
+        # Set before anything opens its state, including the rate limiters the clients create
+        self.data_root = set_data_root(data_root)
+        self.raw_dataset_path = data_path('raw', 'dataset')
+        self.processed_dataset_path = data_path('processed', 'dataset')
+        self.top_post_candidates_path = data_path('state', 'top_post_candidates.parquet')
+        self.instrumentation = instrumentation or PipelineInstrumentation()
+        self.concurrent = concurrent
+        self.incremental = incremental
+        self.columnar = columnar
+        self.fetch_timeout = fetch_timeout
+        self.analytics_backend = analytics_backend
+        self.analytics_workers = analytics_workers
+        self.fetch_latencies = {}
+        self.collected_platforms = set()
+        self.staging_path = staging_path or data_path('staging')
+        self.clients = create_clients(platforms)
+        # platforms=[] builds a pipeline that only processes staged data, as the Airflow DAG does
+        if not self.clients and platforms != []:
             self.logger.error("No API clients available")
             raise ValueError("No API clients available")
+        self.state_store = None
+        self.daily_metrics_engine = None
+        if self.incremental:
+            self.state_store = StateStore()
+            for client in self.clients.values():
+                client.state_store = self.state_store
+        # Once incremental metrics exist every run folds its posts in, so a later incremental run is not stale
+        if self.incremental or os.path.exists(IncrementalDailyMetrics.default_path()):
+            self.daily_metrics_engine = IncrementalDailyMetrics()
+        self.response_cache = None
+        if response_cache or offline:
+            self.response_cache = ResponseCache(offline=offline)
+            for client in self.clients.values():
+                client.response_cache = self.response_cache
         self.processor = DataProcessor()
         self.analyzer = AnalyticsEngine()
+        self.catalog = RunCatalog()
+        self.warehouse = AnalyticsWarehouse(engine=warehouse) if warehouse else None
+        self.dedup_index = DedupIndex() if dedup else None
+        if self.dedup_index is None:
+            self.logger.warning("Dedup is disabled: stored sketches are not updated, so trending topics go stale")
+        self.sketch_store = SketchStore()
 
     def collect_data(self) -> pd.DataFrame:
+        if self.concurrent:
+            return self._collect_real_data_concurrent()
         return self._collect_real_data()
 
     def _collect_real_data(self) -> pd.DataFrame:
         all_data = []
+        self.fetch_latencies = {}
+        self.collected_platforms = set()
         for platform, client in self.clients.items():
             try:
                 self.logger.info(f"Collecting data from {platform}...")
-                platform_data = client.fetch_data()
-                if not platform_data.empty:
-                    all_data.append(platform_data)
-                    self.logger.info(f"Collected {len(platform_data)} records from {platform}")
-                else:
-                    self.logger.warning(f"No data collected from {platform}")
+                start = time.perf_counter()
+                platform_data = self._fetch(client)
+                self.fetch_latencies[platform] = time.perf_counter() - start
+                self._add_platform_data(all_data, platform, platform_data)
             except Exception as e:
-                self.logger.error(f"Error collecting data from {platform}: {str(e)}")
+                client.discard_watermarks()
+                self.logger.error(f"Error collecting data from {platform}: {redact_secrets(e)}")
                 continue
+        return self._combine_platform_data(all_data)
+
+    def _collect_real_data_concurrent(self) -> pd.DataFrame:
+        all_data = []
+        self.fetch_latencies = {}
+        self.collected_platforms = set()
+        executor = ThreadPoolExecutor(max_workers=len(self.clients), thread_name_prefix="collect")
+        try:
+            started = {}
+            futures = {}
+            for platform, client in self.clients.items():
+                self.logger.info(f"Collecting data from {platform} (concurrent)...")
+                started[platform] = time.perf_counter()
+                futures[executor.submit(self._fetch, client)] = platform
+            deadlines = {}
+            for platform in started:
+                timeout = self._get_fetch_timeout(platform)
+                if timeout is not None:
+                    deadlines[platform] = started[platform] + timeout
+            pending = set(futures)
+            while pending:
+                now = time.perf_counter()
+                waiting = [deadlines[futures[f]] - now for f in pending if futures[f] in deadlines]
+                done, pending = wait(pending, timeout=max(min(waiting), 0) if waiting else None,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    platform = futures[future]
+                    self.fetch_latencies[platform] = time.perf_counter() - started[platform]
+                    try:
+                        self._add_platform_data(all_data, platform, future.result())
+                    except Exception as e:
+                        self.clients[platform].discard_watermarks()
+                        self.logger.error(f"Error collecting data from {platform}: {redact_secrets(e)}")
+                now = time.perf_counter()
+                for future in [f for f in pending if deadlines.get(futures[f], float('inf')) <= now]:
+                    platform = futures[future]
+                    pending.discard(future)
+                    future.cancel()
+                    self.clients[platform].discard_watermarks()
+                    self.fetch_latencies[platform] = now - started[platform]
+                    self.logger.error(f"Timed out collecting data from {platform} after "
+                                      f"{self.fetch_latencies[platform]:.2f}s, continuing with partial results")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return self._combine_platform_data(all_data)
+
+    def _fetch(self, client):
+        client.begin_watermarks()
+        with self.instrumentation.stage('fetch', platform=client.platform_name) as stage:
+            if self.columnar == "arrow":
+                data = client.fetch_arrow()
+            else:
+                data = client.fetch_data()
+            stage['rows'] = len(data)
+        return data
+
+    def _get_fetch_timeout(self, platform: str) -> Optional[float]:
+        if isinstance(self.fetch_timeout, dict):
+            return self.fetch_timeout.get(platform)
+        if self.fetch_timeout is not None:
+            return self.fetch_timeout
+        return getattr(APIConfig.load_config(), platform, {}).get('timeout')
+
+    def _add_platform_data(self, all_data: list, platform: str, platform_data: pd.DataFrame):
+        latency = self.fetch_latencies.get(platform, 0.0)
+        if len(platform_data):
+            all_data.append(platform_data)
+            self.collected_platforms.add(platform)
+            self.logger.info(f"Collected {len(platform_data)} records from {platform} in {latency:.2f}s")
+        else:
+            self.logger.warning(f"No data collected from {platform} ({latency:.2f}s)")
+
+    def _combine_platform_data(self, all_data: list) -> pd.DataFrame:
+        if self.fetch_latencies:
+            summary = ", ".join(f"{p}={t:.2f}s" for p, t in self.fetch_latencies.items())
+            self.logger.info(f"Per-platform fetch latency: {summary}")
         if all_data:
+            if self.columnar == "arrow":
+                from src.core.columnar import concat_tables
+                return concat_tables(all_data)
             return pd.concat(all_data, ignore_index=True)
         else:
             self.logger.error("No data collected from any platform")
             return pd.DataFrame()
 
     def process_data(self, raw_data: pd.DataFrame) -> pd.DataFrame:
-        if raw_data.empty:
+        if len(raw_data) == 0:
             return raw_data
         try:
-            processed_data = self.processor.normalize_data(raw_data)
+            if isinstance(raw_data, pd.DataFrame):
+                processed_data = self.processor.normalize_data(raw_data)
+            else:
+                processed_data = self.processor.normalize_arrow(raw_data)
             self.processor.validate_data(processed_data)
             self.logger.info(f"Processed {len(processed_data)} records")
             return processed_data
@@ -85,43 +210,522 @@ class SocialMediaPipeline:
             self.logger.error(f"Error processing data: {str(e)}")
             raise
 
-    def analyze_data(self, processed_data: pd.DataFrame) -> Dict[str, Any]:
+    def _prepare(self, raw_data):
+        processed_data = self.process_data(raw_data)
+        if self.columnar == "arrow":
+            from src.core.columnar import to_arrow_pandas
+            processed_data = to_arrow_pandas(processed_data)
+        changed, new = self._record_masks(processed_data)
+        # Without the index every run would look new and re-add its posts to the sketches
+        first_seen = self._select_rows(processed_data, new) if self.dedup_index is not None else None
+        return (self._select_rows(raw_data, changed), processed_data, self._select_rows(processed_data, changed),
+                first_seen)
+
+    def _record_masks(self, processed_data):
+        if self.dedup_index is None or len(processed_data) == 0:
+            return None, None
+        status = self.processor.classify_records(processed_data, self.dedup_index)
+        return (status != 'unchanged').to_numpy(), (status == 'new').to_numpy()
+
+    @staticmethod
+    def _select_rows(data, mask):
+        if mask is None:
+            return data
+        if isinstance(data, pd.DataFrame):
+            return data[mask].reset_index(drop=True)
+        import pyarrow as pa
+        return data.filter(pa.array(mask))
+
+    def merge_with_history(self, processed_data: pd.DataFrame, run_id: Optional[str] = None) -> pd.DataFrame:
+        # The stored top-post candidates carry the history, so while they cover every earlier write to the
+        # processed dataset only the partitions the delta touches are re-read
+        if not self._candidates_are_current(run_id):
+            existing = read_partitioned_dataset(self.processed_dataset_path)
+        else:
+            touched = read_partitioned_dataset(self.processed_dataset_path,
+                                               partitions=self._touched_partitions(processed_data))
+            existing = self.processor.merge_incremental(pd.read_parquet(self.top_post_candidates_path),
+                                                        touched.drop(columns=['date'], errors='ignore'))
+        existing = existing.drop(columns=['date'], errors='ignore')
+        merged = self.processor.merge_incremental(existing, processed_data)
+        self.logger.info(f"Merged {len(processed_data)} new records into {len(existing)} existing records")
+        return merged
+
+    @staticmethod
+    def _touched_partitions(data: pd.DataFrame) -> List[tuple]:
+        if len(data) == 0:
+            return []
+        # Same (platform, date) keys write_partitioned_dataset partitions by
+        days = pd.to_datetime(data['post_date'], errors='coerce').dt.strftime('%Y-%m-%d').fillna('unknown')
+        return sorted(set(zip(data['platform'].astype(str), days)))
+
+    def _candidates_are_current(self, run_id: Optional[str]) -> bool:
+        if not os.path.exists(self.top_post_candidates_path):
+            return False
+        written = self.catalog.latest_run(status=None, artifact='processed', exclude=run_id)
+        saved = self.catalog.latest_run(status=None, artifact='top_post_candidates', exclude=run_id)
+        return written is not None and saved is not None and written['run_id'] == saved['run_id']
+
+    def _save_top_post_candidates(self, run_id: str, processed_data):
+        candidates = self.analyzer.top_post_candidates(processed_data)
+        if not candidates.empty:
+            save_data(candidates, self.top_post_candidates_path)
+            self.catalog.record_artifact(run_id, 'top_post_candidates', self.top_post_candidates_path, candidates)
+
+    def _commit_watermarks(self):
+        for platform, client in self.clients.items():
+            # Posts of a platform whose data was dropped must be fetched again next run
+            if platform not in self.collected_platforms:
+                client.discard_watermarks()
+                continue
+            try:
+                client.commit_watermarks()
+            except Exception as e:
+                self.logger.error(f"Could not save watermark for {platform}: {str(e)}")
+
+    def analyze_data(self, processed_data: pd.DataFrame, new_data: Optional[pd.DataFrame] = None,
+                     sketches: Optional[Dict[str, Dict]] = None) -> Dict[str, Any]:
         try:
-            daily_metrics = self.analyzer.compute_daily_metrics(processed_data)
-            daily_metrics = self.analyzer.compute_moving_average(daily_metrics)
+            if self.daily_metrics_engine is not None and new_data is not None:
+                # The run's posts were folded in when they were written to the processed dataset
+                daily_metrics = self.daily_metrics_engine.to_frame()
+                sketch_metrics = self.sketch_metrics(pending=sketches)
+            else:
+                daily_metrics = self.analyzer.compute_daily_metrics(
+                    processed_data, backend=self.analytics_backend, workers=self.analytics_workers)
+                daily_metrics = self.analyzer.compute_moving_average(
+                    daily_metrics, backend=self.analytics_backend, workers=self.analytics_workers)
+                sketch_metrics = self.analyzer.sketch_metrics(**self.analyzer.daily_sketches(processed_data))
+            daily_metrics = self.analyzer.add_sketch_metrics(daily_metrics, sketch_metrics)
             top_posts = self.analyzer.identify_top_posts(processed_data)
+            trending_topics = self.trending_topics(pending=sketches)
             self.logger.info("Analytics completed successfully")
             return {
                 'daily_metrics': daily_metrics,
-                'top_posts': top_posts
+                'top_posts': top_posts,
+                'trending_topics': trending_topics
             }
         except Exception as e:
             self.logger.error(f"Error during analytics: {str(e)}")
             raise
 
+    def _build_sketches(self, new_data) -> Dict[str, Dict]:
+        # Sketches only ever add, so a post is folded in once, the first time the dedup index sees it
+        if new_data is None:
+            return {}
+        return {'topics': self.analyzer.topic_sketches(new_data), **self.analyzer.daily_sketches(new_data)}
+
+    @staticmethod
+    def _filter_sketches(sketches: Dict, start_date=None, end_date=None, platforms=None) -> Dict:
+        return {(platform, day): sketch for (platform, day), sketch in sketches.items()
+                if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+                and (platforms is None or platform in platforms)}
+
+    def sketch_metrics(self, period: str = 'D', start_date=None, end_date=None,
+                       platforms: Optional[List[str]] = None,
+                       pending: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+        pending = pending or {}
+        authors, engagement = (
+            merge_sketches(self.sketch_store.load(kind, start_date, end_date, platforms),
+                           self._filter_sketches(pending.get(kind, {}), start_date, end_date, platforms))
+            for kind in ('authors', 'engagement'))
+        return self.analyzer.sketch_metrics(authors, engagement, period)
+
+    def trending_topics(self, pending: Optional[Dict[str, Dict]] = None) -> pd.DataFrame:
+        pending = (pending or {}).get('topics', {})
+        days = [day for _, day in pending] + [self.sketch_store.latest_date('topics')]
+        days = [day for day in days if day is not None]
+        if not days:
+            return self.analyzer.trending_topics({})
+        as_of = max(days)
+        since = as_of - timedelta(days=self.analyzer.TREND_WINDOW_DAYS + self.analyzer.TREND_BASELINE_DAYS)
+        sketches = merge_sketches(self.sketch_store.load('topics', start_date=since),
+                                  self._filter_sketches(pending, start_date=since))
+        return self.analyzer.trending_topics(sketches, as_of=as_of)
+
+    def _load_warehouse(self, run_id: str, data):
+        if self.warehouse is None:
+            return
+        with self.instrumentation.stage('load_warehouse') as stage:
+            stage['rows'] = self.warehouse.load_posts(data)
+        self.catalog.record_artifact(run_id, 'warehouse', self.warehouse.path, rows=stage['rows'])
+
+    def _save_artifact(self, run_id: str, name: str, data, filepath: str):
+        with self.instrumentation.stage(f'write_{name}') as stage:
+            save_data(data, filepath)
+            stage['rows'] = len(data)
+            stage['bytes_written'] = path_size(filepath)
+        self.catalog.record_artifact(run_id, name, filepath, data)
+
+    def _save_dataset(self, run_id: str, name: str, data, root: str):
+        with self.instrumentation.stage(f'write_{name}') as stage:
+            written = write_partitioned_dataset(data, root)
+            stage['rows'] = written['rows']
+            stage['bytes_written'] = written['bytes']
+        self.catalog.record_artifact(run_id, name, root, data)
+
+    def _save_datasets(self, run_id: str, raw_data, changed_data):
+        self._save_dataset(run_id, 'raw', raw_data, self.raw_dataset_path)
+        self._save_dataset(run_id, 'processed', changed_data, self.processed_dataset_path)
+        self._fold_daily_metrics(run_id, changed_data)
+
+    def _fold_daily_metrics(self, run_id: str, written):
+        # Keeps the daily metrics in step with the processed dataset. If some other run wrote to the dataset
+        # without folding its posts in (or nothing was folded yet), the metrics are rebuilt from the dataset,
+        # which already holds this run's rows.
+        engine = self.daily_metrics_engine
+        if engine is None:
+            return
+        previous = self.catalog.latest_run(status=None, artifact='processed', exclude=run_id)
+        folded = engine.folded_run()
+        if engine.is_empty() or folded not in (run_id, previous['run_id'] if previous else None):
+            with self.instrumentation.stage('rebuild_daily_metrics') as stage:
+                stored = read_partitioned_dataset(self.processed_dataset_path,
+                                                  columns=['platform', 'post_id', 'post_date'] +
+                                                  IncrementalDailyMetrics.SUM_COLUMNS)
+                engine.rebuild(stored, run_id)
+                stage['rows'] = len(stored)
+        else:
+            engine.update(written, run_id)
+
+    def _commit_run_state(self, changed_data, sketches: Dict[str, Dict]):
+        # Only called once analytics are saved; after a failure the run's posts are still new to the next run
+        for kind, kind_sketches in sketches.items():
+            self.sketch_store.merge(kind, kind_sketches)
+        if self.dedup_index is not None:
+            if changed_data is not None:
+                self.dedup_index.stage(changed_data)
+            self.dedup_index.flush()
+
+    def _save_analytics(self, run_id: str, daily_metrics: pd.DataFrame, top_posts: Dict[str, pd.DataFrame],
+                        trending_topics: pd.DataFrame):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._save_artifact(run_id, 'daily_metrics', daily_metrics,
+                            data_path('analytics', f"real_daily_metrics_{timestamp}.csv"))
+        self._save_artifact(run_id, 'top_posts_overall', top_posts['top_overall'],
+                            data_path('analytics', f"real_top_posts_overall_{timestamp}.csv"))
+        self._save_artifact(run_id, 'top_posts_platform', top_posts['top_per_platform'],
+                            data_path('analytics', f"real_top_posts_platform_{timestamp}.csv"))
+        self._save_artifact(run_id, 'trending_topics', trending_topics,
+                            data_path('analytics', f"real_trending_topics_{timestamp}.csv"))
+
     def run(self):
         self.logger.info("Starting social media analytics pipeline with REAL APIs")
+        run_id = self.catalog.start_run()
+        self.instrumentation.start_run(run_id)
         try:
-            raw_data = self.collect_data()
-            if raw_data.empty:
+            with self.instrumentation.stage('collect') as stage:
+                raw_data = self.collect_data()
+                stage['rows'] = len(raw_data)
+            if len(raw_data) == 0:
                 self.logger.warning("No data collected from any platform")
+                self.catalog.finish_run(run_id, 'empty', 0)
+                self.instrumentation.finish_run('empty')
                 return
-            processed_data = self.process_data(raw_data)
-            analytics_results = self.analyze_data(processed_data)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            save_data(raw_data, f"data/raw/real_data_{timestamp}.parquet")
-            save_data(processed_data, f"data/processed/processed_real_data_{timestamp}.parquet")
-            save_data(analytics_results['daily_metrics'], f"data/analytics/real_daily_metrics_{timestamp}.csv")
-            save_data(analytics_results['top_posts']['top_overall'],
-                      f"data/analytics/real_top_posts_overall_{timestamp}.csv")
-            save_data(analytics_results['top_posts']['top_per_platform'],
-                      f"data/analytics/real_top_posts_platform_{timestamp}.csv")
+            with self.instrumentation.stage('process') as stage:
+                raw_data, processed_data, changed_data, first_seen = self._prepare(raw_data)
+                new_data = None
+                if self.incremental:
+                    new_data = changed_data
+                    processed_data = self.merge_with_history(new_data, run_id)
+                stage['rows'] = len(processed_data)
+            self._load_warehouse(run_id, changed_data)
+            self._save_datasets(run_id, raw_data, changed_data)
+            with self.instrumentation.stage('analyze') as stage:
+                sketches = self._build_sketches(first_seen)
+                analytics_results = self.analyze_data(processed_data, new_data, sketches)
+                stage['rows'] = len(analytics_results['daily_metrics'])
+            self._save_analytics(run_id, analytics_results['daily_metrics'], analytics_results['top_posts'],
+                                 analytics_results['trending_topics'])
+            self._commit_run_state(changed_data, sketches)
+            if self.incremental:
+                self._save_top_post_candidates(run_id, processed_data)
+                self._commit_watermarks()
+            self.catalog.finish_run(run_id, 'success', len(processed_data))
+            self.instrumentation.finish_run('success')
             self.logger.info(f"Pipeline completed successfully. Processed {len(processed_data)} REAL records")
         except Exception as e:
+            self.catalog.finish_run(run_id, 'failed')
+            self.instrumentation.finish_run('failed')
+            self.logger.error(f"Pipeline failed: {str(e)}")
+            raise
+
+    def _staging_path(self, run_id: str, name: str) -> str:
+        return os.path.join(self.staging_path, run_id, f"{name}.parquet")
+
+    def _read_staged(self, path: str, processed: bool = False):
+        import pyarrow.parquet as pq
+        from src.core.columnar import to_arrow_pandas
+        table = pq.read_table(path)
+        if self.columnar != "arrow":
+            return table.to_pandas()
+        return to_arrow_pandas(table) if processed else table
+
+    def collect_platform(self, run_id: str, platform: str) -> Optional[str]:
+        # Each DAG task runs in its own process, so each writes its own part of the run report
+        self.instrumentation.start_run(run_id, task=f"collect_{platform}")
+        try:
+            client = self.clients[platform]
+            data = self._fetch(client)
+            if len(data) == 0:
+                self.logger.warning(f"No data collected from {platform}")
+                self.instrumentation.finish_run('empty')
+                return None
+            path = self._staging_path(run_id, f"raw_{platform}")
+            with self.instrumentation.stage('stage_raw', platform=platform) as stage:
+                save_data(data, path)
+                stage['rows'] = len(data)
+                stage['bytes_written'] = path_size(path)
+            if self.incremental:
+                self._stage_watermarks(run_id, platform, client)
+        except Exception:
+            self.instrumentation.finish_run('failed')
+            raise
+        self.instrumentation.finish_run('success')
+        self.logger.info(f"Staged {len(data)} records from {platform} at {path}")
+        return path
+
+    def _stage_watermarks(self, run_id: str, platform: str, client):
+        # Watermarks travel with the staged data and are committed by the final task once the run succeeded
+        path = os.path.join(self.staging_path, run_id, f"watermarks_{platform}.json")
+        with open(path, 'w') as f:
+            json.dump({source: [post_date.isoformat(), post_id]
+                       for source, (post_date, post_id) in client.pending_watermarks.items()}, f)
+        client.discard_watermarks()
+
+    def _commit_staged_watermarks(self, run_id: str):
+        if self.state_store is None:
+            return
+        for path in glob.glob(os.path.join(self.staging_path, run_id, "watermarks_*.json")):
+            platform = os.path.basename(path)[len("watermarks_"):-len(".json")]
+            with open(path) as f:
+                for source, (post_date, post_id) in json.load(f).items():
+                    self.state_store.update_watermark(platform, source, datetime.fromisoformat(post_date), post_id)
+
+    def process_staged(self, run_id: str, paths: List[Optional[str]]) -> Optional[Dict[str, str]]:
+        paths = [path for path in paths if path]
+        if not paths:
+            self.logger.warning("No data collected from any platform")
+            return None
+        self.instrumentation.start_run(run_id, task='process')
+        try:
+            with self.instrumentation.stage('process') as stage:
+                frames = [self._read_staged(path) for path in paths]
+                if self.columnar == "arrow":
+                    from src.core.columnar import concat_tables
+                    raw_data = concat_tables(frames)
+                else:
+                    raw_data = pd.concat(frames, ignore_index=True)
+                raw_data, processed_data, changed_data, first_seen = self._prepare(raw_data)
+                stage['rows'] = len(processed_data)
+            self._load_warehouse(run_id, changed_data)
+            self._save_datasets(run_id, raw_data, changed_data)
+            # Incremental analytics only need the changed rows; the rest comes from the stored dataset.
+            # The dedup index and sketches are updated by the analyze task, once analytics succeeded.
+            outputs = {'changed': changed_data}
+            if first_seen is not None:
+                outputs['first_seen'] = first_seen
+            if not self.incremental:
+                outputs['processed'] = processed_data
+            staged = {}
+            for name, data in outputs.items():
+                staged[name] = self._staging_path(run_id, name)
+                save_data(data, staged[name])
+            self.instrumentation.finish_run('success')
+            return staged
+        except Exception as e:
+            self.catalog.finish_run(run_id, 'failed')
+            self.instrumentation.finish_run('failed')
+            self.logger.error(f"Processing staged data failed: {str(e)}")
+            raise
+
+    def analyze_staged(self, run_id: str, staged: Optional[Dict[str, str]]):
+        if not staged:
+            self.catalog.finish_run(run_id, 'empty', 0)
+            return
+        self.instrumentation.start_run(run_id, task='analyze')
+        try:
+            with self.instrumentation.stage('analyze') as stage:
+                changed_data = self._read_staged(staged['changed'], processed=True)
+                if self.incremental:
+                    new_data = changed_data
+                    processed_data = self.merge_with_history(new_data, run_id)
+                else:
+                    processed_data, new_data = self._read_staged(staged['processed'], processed=True), None
+                sketches = self._build_sketches(self._read_staged(staged['first_seen'], processed=True)
+                                                if 'first_seen' in staged else None)
+                analytics_results = self.analyze_data(processed_data, new_data, sketches)
+                stage['rows'] = len(analytics_results['daily_metrics'])
+            self._save_analytics(run_id, analytics_results['daily_metrics'], analytics_results['top_posts'],
+                                 analytics_results['trending_topics'])
+            self._commit_run_state(changed_data, sketches)
+            if self.incremental:
+                self._save_top_post_candidates(run_id, processed_data)
+            self._commit_staged_watermarks(run_id)
+            self.catalog.finish_run(run_id, 'success', len(processed_data))
+            shutil.rmtree(os.path.join(self.staging_path, run_id), ignore_errors=True)
+            self.instrumentation.finish_run('success')
+            self.logger.info(f"Pipeline run {run_id} completed. Processed {len(processed_data)} REAL records")
+        except Exception as e:
+            self.catalog.finish_run(run_id, 'failed')
+            self.instrumentation.finish_run('failed')
+            self.logger.error(f"Analyzing staged data failed: {str(e)}")
+            raise
+
+    def _iter_raw_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        buffer, buffered = [], 0
+        self.collected_platforms = set()
+        for platform, client in self.clients.items():
+            try:
+                self.logger.info(f"Streaming data from {platform}...")
+                client.begin_watermarks()
+                for batch in client.iter_batches(chunk_size):
+                    # Every batch a client yields is written, so its staged watermark stays valid after an error
+                    self.collected_platforms.add(platform)
+                    buffer.append(batch)
+                    buffered += len(batch)
+                    while buffered >= chunk_size:
+                        combined = pd.concat(buffer, ignore_index=True)
+                        yield combined.iloc[:chunk_size]
+                        rest = combined.iloc[chunk_size:]
+                        buffer, buffered = ([rest] if len(rest) else []), len(rest)
+            except Exception as e:
+                self.logger.error(f"Error collecting data from {platform}: {redact_secrets(e)}")
+                continue
+        if buffer:
+            yield pd.concat(buffer, ignore_index=True)
+
+    def run_chunked(self, chunk_size: int):
+        self.logger.info(f"Starting social media analytics pipeline in chunked mode ({chunk_size} rows per chunk)")
+        run_id = self.catalog.start_run()
+        self.instrumentation.start_run(run_id)
+        partial_metrics = None
+        partial_sketches = {'authors': {}, 'engagement': {}}
+        new_sketches = {}
+        top_posts_tracker = TopPostsTracker()
+        raw_rows, processed_rows, chunks = 0, 0, 0
+        try:
+            with self.instrumentation.stage('collect_process') as stage:
+                written_bytes = 0
+                for raw_chunk in self._iter_raw_chunks(chunk_size):
+                    raw_rows += len(raw_chunk)
+                    processed_chunk = self.process_data(raw_chunk)
+                    changed, new = self._record_masks(processed_chunk)
+                    changed_chunk = self._select_rows(processed_chunk, changed)
+                    written_bytes += write_partitioned_dataset(self._select_rows(raw_chunk, changed),
+                                                               self.raw_dataset_path)['bytes']
+                    del raw_chunk
+                    written_bytes += write_partitioned_dataset(changed_chunk, self.processed_dataset_path)['bytes']
+                    if self.warehouse is not None:
+                        self.warehouse.load_posts(changed_chunk)
+                    if self.dedup_index is not None:
+                        # Staged so later chunks see these posts; written once the run succeeded
+                        self.dedup_index.stage(changed_chunk)
+                        for kind, sketches in self._build_sketches(self._select_rows(processed_chunk, new)).items():
+                            new_sketches[kind] = merge_sketches(new_sketches.get(kind, {}), sketches)
+                    self._fold_daily_metrics(run_id, changed_chunk)
+                    if not self.incremental:
+                        partial_metrics = self.analyzer.merge_partial_metrics(
+                            partial_metrics, self.analyzer.partial_daily_metrics(processed_chunk))
+                        for kind, sketches in self.analyzer.daily_sketches(processed_chunk).items():
+                            partial_sketches[kind] = merge_sketches(partial_sketches[kind], sketches)
+                    top_posts_tracker.update(processed_chunk)
+                    processed_rows += len(processed_chunk)
+                    chunks += 1
+                    self.logger.info(f"Chunk {chunks}: {processed_rows} records processed so far")
+                stage['rows'] = processed_rows
+                stage['bytes_written'] = written_bytes
+            if processed_rows == 0:
+                self.logger.warning("No data collected from any platform")
+                self.catalog.finish_run(run_id, 'empty', 0)
+                self.instrumentation.finish_run('empty')
+                return
+            self.catalog.record_artifact(run_id, 'raw', self.raw_dataset_path, rows=raw_rows)
+            self.catalog.record_artifact(run_id, 'processed', self.processed_dataset_path, rows=processed_rows)
+            if self.warehouse is not None:
+                self.catalog.record_artifact(run_id, 'warehouse', self.warehouse.path, rows=processed_rows)
+            with self.instrumentation.stage('analyze') as stage:
+                if self.incremental:
+                    daily_metrics = self.daily_metrics_engine.to_frame()
+                    sketch_metrics = self.sketch_metrics(pending=new_sketches)
+                else:
+                    daily_metrics = self.analyzer.compute_moving_average(
+                        self.analyzer.finalize_daily_metrics(partial_metrics),
+                        backend=self.analytics_backend, workers=self.analytics_workers)
+                    sketch_metrics = self.analyzer.sketch_metrics(**partial_sketches)
+                daily_metrics = self.analyzer.add_sketch_metrics(daily_metrics, sketch_metrics)
+                top_posts = top_posts_tracker.result()
+                trending_topics = self.trending_topics(pending=new_sketches)
+                stage['rows'] = len(daily_metrics)
+            self._save_analytics(run_id, daily_metrics, top_posts, trending_topics)
+            self._commit_run_state(None, new_sketches)
+            if self.incremental:
+                self._commit_watermarks()
+            self.catalog.finish_run(run_id, 'success', processed_rows)
+            self.instrumentation.finish_run('success')
+            self.logger.info(f"Pipeline completed successfully. Processed {processed_rows} REAL records "
+                             f"in {chunks} chunks")
+        except Exception as e:
+            if self.dedup_index is not None:
+                self.dedup_index.discard_staged()
+            self.catalog.finish_run(run_id, 'failed')
+            self.instrumentation.finish_run('failed')
             self.logger.error(f"Pipeline failed: {str(e)}")
             raise
 
-def main():
+    def refresh_stats(self, max_age_days: Optional[int] = None, budget: Optional[int] = None):
+        self.logger.info("Refreshing engagement statistics of stored posts")
+        run_id = self.catalog.start_run()
+        self.instrumentation.start_run(run_id)
+        try:
+            config = APIConfig.load_config()
+            updated_frames = []
+            with self.instrumentation.stage('refresh') as stage:
+                for platform, client in self.clients.items():
+                    if not client.supports_stats_refresh:
+                        self.logger.warning(f"{platform} does not support statistics refresh, skipping it")
+                        continue
+                    platform_config = getattr(config, platform, {})
+                    since = datetime.now() - timedelta(days=max_age_days or
+                                                       platform_config.get('refresh_max_age_days', 30))
+                    stored = read_partitioned_dataset(self.processed_dataset_path, platforms=[platform],
+                                                      start_date=since.date())
+                    if stored.empty:
+                        continue
+                    stored = stored.drop(columns=['date'])
+                    candidates = self.analyzer.select_refresh_candidates(
+                        stored, budget or platform_config.get('refresh_budget', 1000))
+                    refreshed = client.refresh_stats(candidates['post_id'].astype(str).tolist())
+                    updated = self.processor.apply_refreshed_stats(candidates, refreshed)
+                    self.logger.info(f"{platform}: {len(updated)} of {len(candidates)} refreshed posts changed")
+                    if not updated.empty:
+                        updated_frames.append(updated)
+                stage['rows'] = sum(len(frame) for frame in updated_frames)
+            if not updated_frames:
+                self.catalog.finish_run(run_id, 'empty', 0)
+                self.instrumentation.finish_run('empty')
+                return
+            updated = self.processor.merge_incremental(None, pd.concat(updated_frames, ignore_index=True))
+            self._save_dataset(run_id, 'processed', updated, self.processed_dataset_path)
+            self._load_warehouse(run_id, updated)
+            if self.dedup_index is not None:
+                self.dedup_index.add(updated)
+            self._fold_daily_metrics(run_id, updated)
+            self.catalog.finish_run(run_id, 'success', len(updated))
+            self.instrumentation.finish_run('success')
+            self.logger.info(f"Statistics refresh completed. Updated {len(updated)} posts")
+        except Exception as e:
+            self.catalog.finish_run(run_id, 'failed')
+            self.instrumentation.finish_run('failed')
+            self.logger.error(f"Statistics refresh failed: {str(e)}")
+            raise
+
+def main(concurrent: bool = False, fetch_timeout: Optional[float] = None, incremental: bool = False,
+         columnar: str = "pandas", profile_stage: Optional[str] = None, trace_memory: bool = False,
+         chunk_size: Optional[int] = None, analytics_backend: str = "pandas",
+         analytics_workers: Optional[int] = None, warehouse: Optional[str] = "sqlite",
+         response_cache: bool = False, offline: bool = False, refresh_stats: bool = False,
+         dedup: bool = True, platforms: Optional[List[str]] = None, data_root: Optional[str] = None):
     from config.credentials import Credentials
     from src.core.config_checker import check_environment_variables
     if not check_environment_variables():
@@ -130,8 +734,18 @@ def main():
     if not Credentials.validate():
         print("Invalid credentials. Please check your .env file")
         return
-    pipeline = SocialMediaPipeline()
-    pipeline.run()
+    instrumentation = PipelineInstrumentation(trace_memory=trace_memory, profile_stage=profile_stage)
+    pipeline = SocialMediaPipeline(concurrent=concurrent, fetch_timeout=fetch_timeout, incremental=incremental,
+                                   columnar=columnar, instrumentation=instrumentation,
+                                   analytics_backend=analytics_backend, analytics_workers=analytics_workers,
+                                   warehouse=warehouse, response_cache=response_cache, offline=offline,
+                                   dedup=dedup, platforms=platforms, data_root=data_root)
+    if refresh_stats:
+        pipeline.refresh_stats()
+    elif chunk_size:
+        pipeline.run_chunked(chunk_size)
+    else:
+        pipeline.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
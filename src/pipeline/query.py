@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core.warehouse import AnalyticsWarehouse, QUERIES, WAREHOUSE_FILES
+from src.core.utils import data_path
+
+ROLLUP_PERIODS = {'day': 'D', 'week': 'W', 'month': 'M'}
+
+def print_rows(rows):
+    if not rows:
+        print("No rows")
+        return
+    columns = list(rows[0])
+    widths = {col: max(len(col), *(len(str(row[col])) for row in rows)) for col in columns}
+    print('  '.join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print('  '.join(str(row[col]).ljust(widths[col]) for col in columns))
+
+def run_query(name=None, sql=None, path=None, engine='sqlite', limit=20, **filters):
+    path = path or data_path(WAREHOUSE_FILES[engine])
+    if not os.path.exists(path):
+        print("No warehouse found. Run the pipeline first.")
+        return []
+    warehouse = AnalyticsWarehouse(path, engine)
+    if sql:
+        return warehouse.query(sql)
+    return warehouse.run_query(name, limit=limit, **filters)
+
+def run_rollup(period='week', platform=None, start_date=None, end_date=None):
+    from datetime import date
+    from src.core.analyzer import AnalyticsEngine
+    from src.core.sketches import SketchStore
+    sketch_path = data_path('state', 'sketches.db')
+    if not os.path.exists(sketch_path):
+        print("No sketches found. Run the pipeline first.")
+        return []
+    # Unique authors and engagement percentiles come from the stored daily sketches, not from the posts
+    store = SketchStore(sketch_path)
+    start_date, end_date = (date.fromisoformat(value) if value else None for value in (start_date, end_date))
+    platforms = [platform] if platform else None
+    authors, engagement = (store.load(kind, start_date, end_date, platforms) for kind in ('authors', 'engagement'))
+    metrics = AnalyticsEngine.sketch_metrics(authors, engagement, ROLLUP_PERIODS[period])
+    return metrics.astype({'date': str}).to_dict('records')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Ad-hoc aggregations over the analytics warehouse')
+    parser.add_argument('query', nargs='?', choices=list(QUERIES), default='platform_comparison')
+    parser.add_argument('--sql', default=None, help='Run this SQL statement instead of a named query')
+    parser.add_argument('--platform', default=None)
+    parser.add_argument('--start-date', default=None, help='First post date to include (YYYY-MM-DD)')
+    parser.add_argument('--end-date', default=None, help='Last post date to include (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--path', default=None, help='Warehouse file (defaults to warehouse.db or .duckdb under the data root)')
+    parser.add_argument('--engine', choices=['sqlite', 'duckdb'], default='sqlite')
+    parser.add_argument('--rollup', choices=list(ROLLUP_PERIODS), default=None,
+                        help='Unique authors and engagement percentiles per period, merged from daily sketches')
+    args = parser.parse_args()
+    filters = {key: value for key, value in (('platform', args.platform), ('start_date', args.start_date),
+                                             ('end_date', args.end_date)) if value is not None}
+    start = time.perf_counter()
+    if args.rollup:
+        rows = run_rollup(args.rollup, **filters)
+    else:
+        rows = run_query(args.query, args.sql, args.path, args.engine, args.limit, **filters)
+    print_rows(rows)
+    print(f"{len(rows)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -1,39 +1,81 @@
-import pandas as pd
+import sys
 import os
 import glob
-from datetime import datetime
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core.run_catalog import RunCatalog
+from src.core.utils import data_path
 
 def find_latest_file(pattern):
     files = glob.glob(pattern)
     if not files:
         return None
-    return max(files, key=os.path.getctime)
+    return max(files)
+
+def find_run_artifacts(run_id=None):
+    catalog_path = data_path('run_catalog.db')
+    if os.path.exists(catalog_path):
+        catalog = RunCatalog(catalog_path)
+        # Statistics refresh runs succeed without writing analytics, so they are passed over
+        run = catalog.get_run(run_id) if run_id else catalog.latest_run(artifact='daily_metrics')
+        if run:
+            return run, catalog.artifacts(run['run_id'])
+    if run_id:
+        return None, {}
+    artifacts = {}
+    for name, pattern in (('daily_metrics', 'real_daily_metrics_*.csv'),
+                          ('top_posts_overall', 'real_top_posts_overall_*.csv'),
+                          ('top_posts_platform', 'real_top_posts_platform_*.csv')):
+        path = find_latest_file(data_path('analytics', pattern))
+        if path:
+            artifacts[name] = {'path': path, 'rows': None, 'columns': {}}
+    return None, artifacts
+
+def load_artifact(artifact, columns=None, rows=None):
+    usecols = None
+    if columns is not None:
+        known = artifact.get('columns') or {}
+        usecols = [col for col in columns if not known or col in known]
+    if artifact['path'].endswith('.parquet'):
+        df = pd.read_parquet(artifact['path'], columns=usecols)
+        return df.head(rows) if rows is not None else df
+    return pd.read_csv(artifact['path'], usecols=usecols, nrows=rows)
 
-def display_results():
+def display_results(run_id=None):
     try:
-        daily_metrics_file = find_latest_file('data/analytics/daily_metrics_*.csv')
-        top_posts_file = find_latest_file('data/analytics/top_posts_overall_*.csv')
-        top_platform_file = find_latest_file('data/analytics/top_posts_platform_*.csv')
-        if not daily_metrics_file:
+        run, artifacts = find_run_artifacts(run_id)
+        if 'daily_metrics' not in artifacts:
             print("No analytics files found. Run the pipeline first.")
             return
-        print(f"Loading results from: {daily_metrics_file}")
-        daily_metrics = pd.read_csv(daily_metrics_file)
+        daily_metrics_artifact = artifacts['daily_metrics']
+        if run:
+            print(f"Run {run['run_id']} ({run['status']}, finished {run['finished_at']}, "
+                  f"{run['record_count']} records)")
+        print(f"Loading results from: {daily_metrics_artifact['path']}")
+        daily_metrics = load_artifact(daily_metrics_artifact, rows=10)
         print("Daily Metrics:")
-        print(daily_metrics.head(10))
-        if top_posts_file:
-            top_posts = pd.read_csv(top_posts_file)
+        print(daily_metrics)
+        if 'top_posts_overall' in artifacts:
+            top_posts = load_artifact(artifacts['top_posts_overall'], rows=5)
             print("Top Posts Overall:")
-            print(top_posts.head())
-        if top_platform_file:
-            top_platform = pd.read_csv(top_platform_file)
+            print(top_posts)
+        if 'top_posts_platform' in artifacts:
+            top_platform = load_artifact(artifacts['top_posts_platform'], rows=12)
             print("Top Posts Per Platform:")
-            print(top_platform.head(12))
+            print(top_platform)
+        summary = load_artifact(daily_metrics_artifact, columns=['platform', 'date'])
         print("Summary:")
-        print(f"Total records processed: {len(daily_metrics.groupby('date').sum())} days")
-        print(f"Platforms: {', '.join(daily_metrics['platform'].unique())}")
+        print(f"Total records processed: {summary['date'].nunique()} days")
+        print(f"Platforms: {', '.join(summary['platform'].astype(str).unique())}")
     except Exception as e:
         print(f"Error loading results: {e}")
 
 if __name__ == "__main__":
-    display_results()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Show analytics results of a pipeline run')
+    parser.add_argument('--run-id', default=None,
+                        help='Run to display (defaults to the latest successful run with analytics)')
+    args = parser.parse_args()
+    display_results(args.run_id)
\ No newline at end of file
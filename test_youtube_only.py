@@ -1,7 +1,6 @@
 # test_youtube_only.py
 import os
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
 import pandas as pd
 from datetime import datetime
 
@@ -16,8 +15,10 @@ def test_youtube_pipeline():
         # اختبار YouTube client مباشرة
         from src.api.youtube_client import YouTubeClient
         from src.core.data_processor import DataProcessor
+        from src.api.response_cache import ResponseCache
 
         youtube_client = YouTubeClient()
+        youtube_client.response_cache = ResponseCache()
         data = youtube_client.fetch_data()
 
         print(f"✅ YouTube data fetched: {len(data)} records")
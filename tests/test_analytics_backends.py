@@ -0,0 +1,61 @@
+import importlib.util
+import pandas as pd
+import pytest
+
+from data.mock_data_generator import MockDataGenerator
+from src.core.data_processor import DataProcessor
+from src.core.analyzer import AnalyticsEngine
+from src.core import analytics_backends
+
+BACKENDS = [backend for backend in analytics_backends.BACKENDS if backend != 'pandas']
+
+@pytest.fixture(scope='module')
+def processed():
+    raw = MockDataGenerator(seed=42).generate_mock_social_media_data(20_000)
+    raw['collected_at'] = pd.Timestamp('2025-01-01')
+    return DataProcessor.normalize_data(raw)
+
+def require(backend: str):
+    if backend in ('polars', 'duckdb') and importlib.util.find_spec(backend) is None:
+        pytest.skip(f"{backend} is not installed")
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_daily_metrics_match_pandas(processed, backend):
+    require(backend)
+    expected = AnalyticsEngine.compute_daily_metrics(processed)
+    actual = analytics_backends.compute_daily_metrics(processed, backend, workers=4, min_rows=0)
+    # process reduces every group exactly as pandas does; the SQL engines may differ in the last float ulp
+    pd.testing.assert_frame_equal(actual, expected, check_exact=backend == 'process')
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_moving_average_matches_pandas(processed, backend):
+    require(backend)
+    daily = AnalyticsEngine.compute_daily_metrics(processed)
+    expected = AnalyticsEngine.compute_moving_average(daily.copy())
+    actual = analytics_backends.compute_moving_average(daily.copy(), 7, backend, workers=4, min_rows=0)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=backend == 'process')
+
+def record_pool_runs(monkeypatch):
+    calls = []
+    run_partitioned = analytics_backends._run_partitioned
+    monkeypatch.setattr(analytics_backends, '_run_partitioned',
+                        lambda func, frames, workers: calls.append(len(frames)) or run_partitioned(func, frames, 1))
+    return calls
+
+def test_daily_metrics_threshold_counts_input_posts(processed, monkeypatch):
+    calls = record_pool_runs(monkeypatch)
+    analytics_backends.compute_daily_metrics(processed, 'process', workers=4, min_rows=len(processed))
+    assert calls
+    calls.clear()
+    analytics_backends.compute_daily_metrics(processed, 'process', workers=4, min_rows=len(processed) + 1)
+    assert not calls
+
+def test_moving_average_threshold_counts_daily_rows(processed, monkeypatch):
+    calls = record_pool_runs(monkeypatch)
+    daily = AnalyticsEngine.compute_daily_metrics(processed)
+    # The posts behind the daily rows are far above the threshold; the series being rolled is not
+    assert len(daily) < len(processed)
+    analytics_backends.compute_moving_average(daily.copy(), 7, 'process', workers=4, min_rows=len(daily) + 1)
+    assert not calls
+    analytics_backends.compute_moving_average(daily.copy(), 7, 'process', workers=4, min_rows=len(daily))
+    assert calls
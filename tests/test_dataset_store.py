@@ -0,0 +1,36 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data.mock_data_generator import MockDataGenerator
+from src.core.data_processor import DataProcessor
+from src.core.utils import write_partitioned_dataset, read_partitioned_dataset
+
+def one_partition(seed: int, rows: int = 50) -> pd.DataFrame:
+    raw = MockDataGenerator(seed=seed).generate_mock_social_media_data(rows)
+    raw['platform'] = 'youtube'
+    raw['post_date'] = pd.Timestamp('2025-01-01 12:00')
+    raw['post_id'] = [f"{seed}_{i}" for i in range(rows)]
+    raw['author_name'] = raw['author_id']
+    raw['collected_at'] = pd.Timestamp('2025-01-02') + pd.Timedelta(seconds=seed)
+    return raw
+
+def test_compaction_mixes_arrow_and_pandas_files(tmp_path):
+    root = str(tmp_path / 'dataset')
+    expected = []
+    for seed in range(6):
+        raw = one_partition(seed)
+        if seed % 2:
+            # The arrow path keeps the raw schema's column order, which ends with author_name
+            processed = DataProcessor.normalize_arrow(pa.Table.from_pandas(raw, preserve_index=False))
+        else:
+            processed = DataProcessor.normalize_data(raw)
+        expected.append(raw['post_id'])
+        write_partitioned_dataset(processed, root, compact_threshold=3)
+    files = list((tmp_path / 'dataset' / 'platform=youtube' / 'date=2025-01-01').glob('*.parquet'))
+    assert len(files) < 6
+    names = {tuple(pq.read_schema(path).names) for path in files}
+    assert len(names) == 1
+    stored = read_partitioned_dataset(root)
+    assert sorted(stored['post_id']) == sorted(pd.concat(expected))
+    assert stored['author_name'].notna().all()
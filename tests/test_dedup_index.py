@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.data_processor import DataProcessor
+from src.core.dedup_index import DedupIndex, BloomFilter, hash_keys
+
+def make_batch(rng, pool: int, rows: int) -> pd.DataFrame:
+    ids = rng.integers(0, pool, rows)
+    return pd.DataFrame({
+        'platform': np.array(['youtube', 'facebook', 'twitter'])[ids % 3],
+        'post_id': ids.astype(str),
+        # Few distinct counts, so stored posts often come back unchanged
+        'likes': rng.integers(0, 3, rows),
+        'comments': rng.integers(0, 2, rows),
+        'shares': np.zeros(rows, dtype='int64')
+    })
+
+def brute_force_status(stored: dict, batch: pd.DataFrame) -> list:
+    status = []
+    for row in batch.itertuples(index=False):
+        previous = stored.get((row.platform, row.post_id))
+        if previous is None:
+            status.append('new')
+        elif previous == (row.likes, row.comments, row.shares):
+            status.append('unchanged')
+        else:
+            status.append('updated')
+    return status
+
+@pytest.mark.parametrize('options', [{}, {'use_bloom': False}, {'bits_per_key': 1}],
+                         ids=['bloom', 'no-bloom', 'saturated-bloom'])
+def test_classification_matches_brute_force_across_runs(tmp_path, options):
+    rng = np.random.default_rng(3)
+    stored = {}
+    compactions = 0
+    for run in range(12):
+        # Reopened every run, as each pipeline run does
+        index = DedupIndex(str(tmp_path / 'index'), max_segments=4, **options)
+        batch = make_batch(rng, pool=3000, rows=800)
+        status = DataProcessor.classify_records(batch, index)
+        assert status.tolist() == brute_force_status(stored, batch), f"run {run}"
+        segments = len(index.segments)
+        index.add(batch)
+        compactions += len(index.segments) <= segments
+        for row in batch.itertuples(index=False):
+            stored[(row.platform, row.post_id)] = (row.likes, row.comments, row.shares)
+        assert len(index) == len(stored)
+    assert compactions >= 2
+
+def test_staged_ids_count_before_flush_and_can_be_discarded(tmp_path):
+    rng = np.random.default_rng(5)
+    index = DedupIndex(str(tmp_path / 'index'))
+    first, second = make_batch(rng, 500, 300), make_batch(rng, 500, 300)
+    index.stage(first)
+    stored = {(row.platform, row.post_id): (row.likes, row.comments, row.shares)
+              for row in first.itertuples(index=False)}
+    assert index.classify(second).tolist() == brute_force_status(stored, second)
+    index.discard_staged()
+    assert (index.classify(second) == 'new').all()
+    assert DedupIndex(str(tmp_path / 'index')).classify(first).eq('new').all()
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    rng = np.random.default_rng(11)
+    batch = make_batch(rng, 10**9, 20_000)
+    keys = hash_keys(batch)
+    bloom = BloomFilter.create(len(keys), bits_per_key=10)
+    bloom.add(keys)
+    assert bloom.might_contain(keys).all()
+    others = hash_keys(make_batch(np.random.default_rng(12), 10**9, 20_000).assign(platform='other'))
+    # About 1% at 10 bits per key
+    assert bloom.might_contain(others).mean() < 0.03
@@ -0,0 +1,22 @@
+import os
+import sys
+import importlib.util
+import subprocess
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+OPTIONAL_SDKS = ['tweepy', 'snscrape', 'googleapiclient', 'aiohttp', 'duckdb', 'polars']
+
+def loaded_sdks(module: str):
+    # A fresh interpreter, since other tests import duckdb and polars into this one
+    code = f"import sys, {module}; print(','.join(m for m in {OPTIONAL_SDKS!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [name for name in result.stdout.strip().split(',') if name]
+
+def test_pipeline_import_loads_no_optional_sdk():
+    assert loaded_sdks('src.pipeline.main') == []
+
+def test_dag_import_loads_no_optional_sdk():
+    if importlib.util.find_spec('airflow') is None:
+        pytest.skip("airflow is not installed")
+    assert loaded_sdks('src.pipeline.airflow_dag') == []
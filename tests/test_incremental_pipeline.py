@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+
+from data.mock_data_generator import MockDataGenerator
+from src.api.base_client import BaseAPIClient
+from src.core.analyzer import AnalyticsEngine
+from src.core import utils
+from src.core.utils import read_partitioned_dataset, data_path
+from src.pipeline.main import SocialMediaPipeline
+
+class FrameClient(BaseAPIClient):
+    def __init__(self, platform: str, data: pd.DataFrame):
+        super().__init__(platform)
+        self.data = data
+
+    def _make_request(self, *args, **kwargs):
+        pass
+
+    def _transform_response(self, raw_data):
+        pass
+
+    def fetch_data(self, **kwargs) -> pd.DataFrame:
+        return self.data
+
+def batch(seed: int, rows: int = 600) -> pd.DataFrame:
+    raw = MockDataGenerator(seed=seed).generate_mock_social_media_data(rows)
+    # Ids repeat across seeds with other counts, so later runs update posts earlier runs stored
+    raw['collected_at'] = pd.Timestamp('2025-01-01') + pd.Timedelta(hours=seed)
+    return raw
+
+def pipeline(raw: pd.DataFrame, **options) -> SocialMediaPipeline:
+    pipe = SocialMediaPipeline(platforms=[], warehouse=None, **options)
+    pipe.clients = {platform: FrameClient(platform, rows.reset_index(drop=True))
+                    for platform, rows in raw.groupby('platform')}
+    return pipe
+
+def expected_daily_metrics() -> pd.DataFrame:
+    stored = read_partitioned_dataset(data_path('processed', 'dataset')).drop(columns=['date'])
+    metrics = AnalyticsEngine.compute_moving_average(AnalyticsEngine.compute_daily_metrics(stored))
+    metrics['platform'] = metrics['platform'].astype(str)
+    return metrics.reset_index(drop=True)
+
+def test_incremental_metrics_follow_mixed_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runs = [(1, {}), (2, {'incremental': True}), (3, {}), (4, {'incremental': True}),
+            (5, {'incremental': True, 'chunk_size': 250}), (6, {}), (7, {'incremental': True})]
+    for seed, options in runs:
+        chunk_size = options.pop('chunk_size', None)
+        pipe = pipeline(batch(seed), **options)
+        pipe.run_chunked(chunk_size) if chunk_size else pipe.run()
+        if not pipe.incremental:
+            continue
+        actual = pipe.daily_metrics_engine.to_frame()
+        expected = expected_daily_metrics()
+        columns = ['engagement_score_sum', 'engagement_score_count', 'likes_sum', 'comments_sum', 'shares_sum']
+        pd.testing.assert_frame_equal(actual[columns], expected[columns], check_dtype=False)
+        assert actual['engagement_ma'].to_numpy() == pytest.approx(expected['engagement_ma'].to_numpy())
+
+def test_incremental_chunked_run_seeds_from_stored_posts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    pipeline(batch(1)).run()
+    pipe = pipeline(batch(2), incremental=True)
+    pipe.run_chunked(200)
+    actual = pipe.daily_metrics_engine.to_frame()
+    assert actual['engagement_score_count'].sum() == len(read_partitioned_dataset(pipe.processed_dataset_path))
+
+def test_staged_run_keeps_all_state_under_the_data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, '_data_root', None)
+    root = str(tmp_path / 'shared')
+    raw = batch(1)
+    # Every task builds its own pipeline from its own working directory, as DAG tasks on different workers do
+    for task_dir in ('collect', 'process', 'analyze'):
+        (tmp_path / task_dir).mkdir()
+    monkeypatch.chdir(tmp_path / 'collect')
+    collector = pipeline(raw, data_root=root)
+    run_id = collector.catalog.start_run()
+    paths = [collector.collect_platform(run_id, platform) for platform in collector.clients]
+    monkeypatch.chdir(tmp_path / 'process')
+    staged = pipeline(raw, data_root=root).process_staged(run_id, paths)
+    monkeypatch.chdir(tmp_path / 'analyze')
+    analyzer = pipeline(raw, data_root=root)
+    analyzer.analyze_staged(run_id, staged)
+    for task_dir in ('collect', 'process', 'analyze'):
+        assert not (tmp_path / task_dir / 'data').exists()
+    assert analyzer.catalog.get_run(run_id)['status'] == 'success'
+    assert len(analyzer.dedup_index) == len(raw.drop_duplicates(['platform', 'post_id']))
+    reports = {path.name for path in (tmp_path / 'shared' / 'reports').glob('*.json')}
+    assert reports == {f"run_{run_id}_{task}.json" for task in
+                       ['process', 'analyze'] + [f"collect_{platform}" for platform in collector.clients]}
+
+def test_incremental_top_posts_restart_from_stored_candidates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Small deltas touch few partitions, so the stored candidates stand in for the rest of the history
+    runs = [(1, False, 600), (2, True, 600), (3, True, 30), (4, True, 30), (5, False, 600), (6, True, 30)]
+    for seed, incremental, rows in runs:
+        pipe = pipeline(batch(seed, rows), incremental=incremental)
+        pipe.run()
+        if not incremental:
+            # Default runs rank only the posts they collected
+            continue
+        run = pipe.catalog.latest_run(artifact='top_posts_overall')
+        saved = pd.read_csv(pipe.catalog.artifacts(run['run_id'])['top_posts_overall']['path'])
+        stored = read_partitioned_dataset(pipe.processed_dataset_path).drop(columns=['date'])
+        expected = AnalyticsEngine.identify_top_posts(stored)['top_overall']
+        assert saved['post_id'].astype(str).tolist() == expected['post_id'].astype(str).tolist()
@@ -0,0 +1,121 @@
+import pytest
+
+from src.api import base_client
+from src.api.base_client import BaseAPIClient
+from src.api.rate_limiter import TokenBucket, QuotaExceeded
+from src.api.transport import TransportError
+from src.core.state_store import StateStore
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def bucket(clock: Clock, store=None, key: str = 'youtube', **options) -> TokenBucket:
+    # One request per second with a burst of five
+    return TokenBucket(60, 60, burst=5, store=store, key=key, clock=clock.time, wall_clock=clock.time,
+                       sleep=clock.sleep, **options)
+
+def test_persisted_tokens_are_shared_by_instances_and_survive_restarts(tmp_path):
+    clock = Clock()
+    store = StateStore(str(tmp_path / 'state.db'))
+    first = bucket(clock, store)
+    assert [first.reserve() for _ in range(5)] == [0.0] * 5
+    # A second process, or the next run, starts from the tokens the first one left
+    second = bucket(clock, StateStore(str(tmp_path / 'state.db')))
+    assert second.reserve() == pytest.approx(1.0)
+    assert first.reserve() == pytest.approx(2.0)
+    assert bucket(clock, store, key='facebook').reserve() == 0.0
+    clock.now += 10
+    # Refills stop at the burst capacity, however long the bucket sat idle
+    assert [second.reserve() for _ in range(6)] == pytest.approx([0.0] * 5 + [1.0])
+    assert first.acquire() == pytest.approx(2.0)
+    assert clock.slept == pytest.approx([2.0])
+
+def test_retry_after_blocks_until_the_server_allows_requests_again():
+    clock = Clock()
+    limiter = bucket(clock)
+    limiter.throttled(retry_after=30)
+    assert limiter.reserve() == pytest.approx(30)
+    clock.now += 10
+    assert limiter.acquire() == pytest.approx(20)
+    assert limiter.reserve() == 0.0
+
+def test_throttling_halves_the_rate_and_successes_recover_it():
+    clock = Clock()
+    limiter = bucket(clock, max_backoff=900)
+    for _ in range(3):
+        limiter.throttled()
+    assert limiter.rate == pytest.approx(limiter.base_rate / 8)
+    # Without Retry-After the backoff doubles with every throttle in a row
+    assert limiter.reserve() == pytest.approx(8)
+    for _ in range(10):
+        limiter.throttled()
+    assert limiter.rate == pytest.approx(limiter.min_rate)
+    assert limiter.reserve() == pytest.approx(900)
+    rates = []
+    for _ in range(11):
+        limiter.succeeded()
+        rates.append(limiter.rate)
+    assert rates == pytest.approx([0.15, 0.25, 0.35, 0.45, 0.55, 0.65, 0.75, 0.85, 0.95, 1.0, 1.0])
+    clock.now += 900
+    limiter.throttled()
+    assert limiter.reserve() == pytest.approx(2)
+
+class ScriptedTransport:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get_json_conditional(self, url, params=None, headers=None, timeout=None, etag=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome, None
+
+class LimitedClient(BaseAPIClient):
+    supports_stats_refresh = True
+
+    def __init__(self, limiter: TokenBucket):
+        super().__init__('limited_test')
+        self.rate_limiter = limiter
+
+    def _make_request(self, *args, **kwargs):
+        pass
+
+    def _transform_response(self, raw_data):
+        pass
+
+    def _fetch_stats_batch(self, post_ids):
+        return self._get_json('https://api.test/stats')['items']
+
+def test_client_waits_out_retry_after_and_recovers(monkeypatch):
+    clock = Clock()
+    transport = ScriptedTransport([TransportError(429, 'rateLimitExceeded', retry_after=12)] * 2 + [{'items': []}])
+    monkeypatch.setattr(base_client, 'shared_transport', lambda: transport)
+    client = LimitedClient(bucket(clock))
+    assert client._get_json('https://api.test/posts') == {'items': []}
+    assert clock.slept == pytest.approx([12, 12])
+    assert client.rate_limiter.rate == pytest.approx(0.35)
+
+def test_quota_exceeded_stops_without_retrying(monkeypatch):
+    clock = Clock()
+    transport = ScriptedTransport([TransportError(403, 'quotaExceeded')] * 2)
+    monkeypatch.setattr(base_client, 'shared_transport', lambda: transport)
+    client = LimitedClient(bucket(clock))
+    with pytest.raises(QuotaExceeded):
+        client._get_json('https://api.test/posts')
+    assert transport.calls == 1
+    # Statistics refresh logs and skips failed batches, but a spent quota ends the refresh
+    with pytest.raises(QuotaExceeded):
+        client.refresh_stats(['1', '2'])
+    assert transport.calls == 2
+    assert clock.slept == []
@@ -0,0 +1,137 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.api import base_client, rate_limiter, response_cache
+from src.api.base_client import BaseAPIClient
+from src.api.response_cache import ResponseCache, CacheMiss
+from src.core import utils
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+class FakeTransport:
+    def __init__(self, etag: str = 'v1'):
+        self.etag = etag
+        self.calls = []
+
+    def get_json_conditional(self, url, params=None, headers=None, timeout=None, etag=None):
+        self.calls.append((url, etag))
+        if etag is not None and etag == self.etag:
+            return None, etag
+        return {'url': url, 'version': self.etag}, self.etag
+
+class CachedClient(BaseAPIClient):
+    supports_stats_refresh = True
+
+    def __init__(self, cache: ResponseCache):
+        super().__init__('cached_test')
+        self.response_cache = cache
+        self.cache_ttls = {'posts': 60}
+
+    def _make_request(self, *args, **kwargs):
+        pass
+
+    def _transform_response(self, raw_data):
+        pass
+
+    def _fetch_stats_batch(self, post_ids):
+        return [{'post_id': post_id, 'likes': 1, 'comments': 0, 'shares': 0}
+                for post_id in self._get_json('https://api.test/stats', {'ids': ','.join(post_ids)})['ids']]
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, 'time', SimpleNamespace(time=clock.time))
+    return clock
+
+@pytest.fixture
+def transport(monkeypatch):
+    transport = FakeTransport()
+    monkeypatch.setattr(base_client, 'shared_transport', lambda: transport)
+    return transport
+
+def test_entries_are_fresh_until_their_ttl(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'responses.db'))
+    key = cache.make_key('youtube', 'videos', 'https://api.test/videos?key=secret', {'id': 'a'})
+    # Secrets stay out of the key, so a rotated API key still hits
+    assert key == cache.make_key('youtube', 'videos', 'https://api.test/videos', {'id': 'a', 'key': 'other'})
+    assert cache.get(key, ttl=60) is None
+    cache.put(key, 'youtube', 'videos', {'items': [1]}, etag='v1')
+    clock.now += 59
+    assert cache.get(key, ttl=60) == {'etag': 'v1', 'body': {'items': [1]}, 'fresh': True}
+    clock.now += 2
+    assert cache.get(key, ttl=60)['fresh'] is False
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'revalidated': 0}
+
+def test_not_modified_response_touches_the_entry(tmp_path, clock, transport):
+    client = CachedClient(ResponseCache(str(tmp_path / 'responses.db')))
+    first = client._get_json('https://api.test/posts', {'page': 1}, endpoint='posts')
+    assert transport.calls == [('https://api.test/posts', None)]
+    assert client._get_json('https://api.test/posts', {'page': 1}, endpoint='posts') == first
+    assert len(transport.calls) == 1
+    clock.now += 120
+    # Expired: revalidated with the stored ETag, and the 304 makes the entry fresh again
+    assert client._get_json('https://api.test/posts', {'page': 1}, endpoint='posts') == first
+    assert transport.calls[-1] == ('https://api.test/posts', 'v1')
+    assert client.response_cache.revalidated == 1
+    clock.now += 30
+    client._get_json('https://api.test/posts', {'page': 1}, endpoint='posts')
+    assert len(transport.calls) == 2
+    clock.now += 120
+    transport.etag = 'v2'
+    assert client._get_json('https://api.test/posts', {'page': 1}, endpoint='posts')['version'] == 'v2'
+
+def test_eviction_drops_least_recently_used_entries(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'responses.db'), max_bytes=10**9)
+    keys = [cache.make_key('facebook', 'posts', f"https://api.test/{n}") for n in range(4)]
+    for n, key in enumerate(keys[:3]):
+        clock.now += 1
+        cache.put(key, 'facebook', 'posts', {'n': n, 'padding': str(n) * 2000})
+    clock.now += 1
+    cache.get(keys[0], ttl=60)
+    with cache._connect() as conn:
+        size = conn.execute("SELECT MAX(size) FROM responses").fetchone()[0]
+    # Room for three entries: the fourth pushes out the one read least recently
+    cache.max_bytes = 3 * size
+    clock.now += 1
+    cache.put(keys[3], 'facebook', 'posts', {'n': 3, 'padding': '3' * 2000})
+    assert [cache.get(key, ttl=60) is not None for key in keys] == [True, False, True, True]
+
+def test_offline_replays_cache_and_never_calls_the_transport(tmp_path, clock, transport):
+    path = str(tmp_path / 'responses.db')
+    CachedClient(ResponseCache(path))._get_json('https://api.test/posts', {'page': 1}, endpoint='posts')
+    transport.calls.clear()
+    client = CachedClient(ResponseCache(path, offline=True))
+    clock.now += 3600
+    # Stale entries are replayed as they are
+    assert client._get_json('https://api.test/posts', {'page': 1}, endpoint='posts')['version'] == 'v1'
+    with pytest.raises(CacheMiss):
+        client._get_json('https://api.test/posts', {'page': 2}, endpoint='posts')
+    with pytest.raises(CacheMiss):
+        client._get_json('https://api.test/stats')
+    with pytest.raises(CacheMiss):
+        client._get_json_many([('https://api.test/posts', {'page': 3})])
+    refreshed = client.refresh_stats(['1', '2'])
+    assert refreshed.empty and list(refreshed.columns) == BaseAPIClient.STATS_COLUMNS
+    assert transport.calls == []
+
+def test_offline_twitter_client_skips_the_search(tmp_path, monkeypatch):
+    from src.api.twitter_client import TwitterClient
+    # The client's rate limiter keeps its tokens in the state store under the data root
+    monkeypatch.setattr(utils, '_data_root', str(tmp_path))
+    monkeypatch.setattr(rate_limiter, '_limiters', {})
+    client = TwitterClient()
+    client.response_cache = ResponseCache(str(tmp_path / 'responses.db'), offline=True)
+
+    calls = []
+    monkeypatch.setattr(client, '_search_tweets', lambda **params: calls.append(params) or [])
+    monkeypatch.setattr(client, 'api', SimpleNamespace(lookup_statuses=calls.append), raising=False)
+    client.use_tweepy = True
+    assert client.fetch_data().empty
+    assert client.refresh_stats(['1']).empty
+    assert calls == []
@@ -0,0 +1,152 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.mock_data_generator import MockDataGenerator
+from src.core import utils
+from src.core.analyzer import AnalyticsEngine
+from src.core.data_processor import DataProcessor
+from src.core.sketches import CountMinSketch, HyperLogLog, TDigest, TopicSketch, SketchStore, hash_values, \
+    merge_sketches
+from src.pipeline.query import run_rollup
+
+def round_trip(sketch):
+    return type(sketch).from_bytes(sketch.to_bytes())
+
+def test_count_min_overestimates_within_bound_and_merges_exactly():
+    rng = np.random.default_rng(1)
+    terms = np.char.add('term', rng.zipf(1.3, 50_000).astype(str)).astype(object)
+    exact = pd.Series(terms).value_counts()
+    keys = hash_values(terms)
+    whole = CountMinSketch(2048, 4)
+    whole.add(keys)
+    halves = CountMinSketch(2048, 4)
+    halves.add(keys[:20_000])
+    other = CountMinSketch(2048, 4)
+    other.add(keys[20_000:])
+    halves.merge(other)
+    np.testing.assert_array_equal(halves.table, whole.table)
+    error = whole.estimate(hash_values(exact.index.to_numpy(dtype=object))) - exact.to_numpy()
+    assert (error >= 0).all()
+    # e * N / width bounds the error of all but about e^-depth of the terms
+    assert np.mean(error > np.e * len(terms) / 2048) < 0.02
+    with pytest.raises(ValueError):
+        whole.merge(CountMinSketch(1024, 4))
+
+def test_topic_sketch_round_trip_keeps_counts_and_candidates():
+    rng = np.random.default_rng(2)
+    terms = np.char.add('term', rng.zipf(1.5, 5000).astype(str)).astype(object)
+    sketch = TopicSketch(capacity=20).update(terms, rng.integers(0, 50, len(terms)))
+    loaded = round_trip(sketch)
+    np.testing.assert_array_equal(loaded.mentions.table, sketch.mentions.table)
+    np.testing.assert_array_equal(loaded.engagement.table, sketch.engagement.table)
+    assert loaded.candidates.tolist() == sketch.candidates.tolist()
+    # The heaviest terms keep their text
+    assert set(pd.Series(terms).value_counts().index[:5]) <= set(loaded.candidates)
+
+def test_topic_sketches_merged_from_chunks_match_exact_counts():
+    df = DataProcessor.normalize_data(MockDataGenerator(seed=7).generate_mock_social_media_data(20_000))
+    terms = AnalyticsEngine.extract_terms(df)
+    exact = terms.groupby([terms['platform'].astype(str), terms['date'].dt.date, 'term'], observed=True) \
+        .agg(mentions=('term', 'size'), engagement=('engagement_score', 'sum'))
+    merged = {}
+    for chunk in np.array_split(np.arange(len(df)), 5):
+        merged = merge_sketches(merged, AnalyticsEngine.topic_sketches(df.iloc[chunk]))
+    whole = AnalyticsEngine.topic_sketches(df)
+    assert set(merged) == set(whole)
+    for key, sketch in merged.items():
+        np.testing.assert_array_equal(sketch.mentions.table, whole[key].mentions.table)
+        np.testing.assert_array_equal(sketch.engagement.table, whole[key].engagement.table)
+        counts = exact.loc[key]
+        mentions, engagement = sketch.estimate(counts.index.to_numpy(dtype=object))
+        assert (mentions >= counts['mentions'].to_numpy()).all()
+        assert (engagement >= counts['engagement'].to_numpy() - 1e-6).all()
+    trends = AnalyticsEngine.trending_topics(merged, n=5)
+    recent = exact.reset_index()
+    window_start = max(day for _, day in merged) - pd.Timedelta(days=AnalyticsEngine.TREND_WINDOW_DAYS)
+    recent = recent[recent['date'] > window_start]
+    recent = recent.groupby(['platform', 'term'])['mentions'].sum()
+    for row in trends.itertuples(index=False):
+        assert row.mentions == pytest.approx(recent[(row.platform, row.term)], rel=0.05)
+
+@pytest.mark.parametrize('distinct', [10, 1000, 200_000])
+def test_hyperloglog_estimate_merge_and_round_trip(distinct):
+    rng = np.random.default_rng(3)
+    keys = hash_values(np.char.add('author', rng.permutation(distinct).astype(str)).astype(object))
+    whole = HyperLogLog(14).add(keys)
+    # Overlapping halves: merging takes the union, not the sum
+    merged = HyperLogLog(14).add(keys[:distinct * 2 // 3]).merge(HyperLogLog(14).add(keys[distinct // 3:]))
+    np.testing.assert_array_equal(merged.registers, whole.registers)
+    loaded = round_trip(whole)
+    assert loaded.precision == 14
+    assert loaded.estimate() == whole.estimate()
+    # Three standard errors of 1.04 / sqrt(2^14)
+    assert whole.estimate() == pytest.approx(distinct, rel=0.025, abs=1)
+    with pytest.raises(ValueError):
+        whole.merge(HyperLogLog(12))
+
+def test_tdigest_quantiles_merge_and_round_trip():
+    rng = np.random.default_rng(4)
+    values = rng.lognormal(3, 1, 100_000)
+    quantiles = [0.01, 0.5, 0.9, 0.99]
+    exact = np.quantile(values, quantiles)
+    whole = TDigest().add(values)
+    merged = TDigest()
+    for chunk in np.array_split(values, 10):
+        merged.merge(TDigest().add(chunk))
+    for digest in (whole, merged, round_trip(merged)):
+        assert digest.count == len(values)
+        assert (digest.min, digest.max) == (values.min(), values.max())
+        np.testing.assert_allclose(digest.quantile(quantiles), exact, rtol=0.02)
+    np.testing.assert_array_equal(round_trip(merged).quantile(quantiles), merged.quantile(quantiles))
+
+def test_small_tdigest_matches_numpy_quantiles():
+    values = np.random.default_rng(5).normal(size=50)
+    quantiles = np.linspace(0, 1, 21)
+    np.testing.assert_allclose(TDigest().add(values).quantile(quantiles), np.quantile(values, quantiles))
+
+def exact_rollup(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    dates = df['post_date'].dt.to_period(period).dt.start_time.dt.date.astype(str).rename('date')
+    grouped = df.groupby([df['platform'].astype(str).rename('platform'), dates])
+    exact = grouped['author_id'].nunique().rename('unique_authors').to_frame()
+    for column, q in (('engagement_p50', 0.5), ('engagement_p90', 0.9), ('engagement_p99', 0.99)):
+        exact[column] = grouped['engagement_score'].quantile(q)
+    return exact
+
+@pytest.fixture
+def stored_sketches(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, '_data_root', str(tmp_path))
+    df = DataProcessor.normalize_data(MockDataGenerator(seed=42).generate_mock_social_media_data(40_000))
+    # A larger author pool than the generator's, so weekly and monthly counts run into the thousands
+    df['author_id'] = np.char.add('author_', np.random.default_rng(6).integers(0, 20_000, len(df)).astype(str))
+    store = SketchStore()
+    # The chunks share days, so later ones merge into payloads already stored
+    for chunk in np.array_split(np.arange(len(df)), 4):
+        for kind, sketches in AnalyticsEngine.daily_sketches(df.iloc[chunk]).items():
+            store.merge(kind, sketches)
+    return df, store
+
+def test_store_load_filters_and_merges(stored_sketches):
+    df, store = stored_sketches
+    first = min(day for _, day in store.load('authors'))
+    loaded = store.load('engagement', start_date=first, end_date=first, platforms=['twitter'])
+    assert list(loaded) == [('twitter', first)]
+    day = df[(df['platform'] == 'twitter') & (df['post_date'].dt.date == first)]['engagement_score']
+    assert loaded[('twitter', first)].count == len(day)
+    assert store.latest_date('authors') == df['post_date'].max().date()
+    assert store.load('authors', start_date=date(2100, 1, 1)) == {}
+
+@pytest.mark.parametrize('period', ['day', 'week', 'month'])
+def test_rollup_matches_exact_values(stored_sketches, period):
+    df, _ = stored_sketches
+    rollup = pd.DataFrame(run_rollup(period)).set_index(['platform', 'date'])
+    exact = exact_rollup(df, {'day': 'D', 'week': 'W', 'month': 'M'}[period])
+    assert sorted(rollup.index) == sorted(exact.index)
+    rollup = rollup.loc[exact.index]
+    np.testing.assert_allclose(rollup['unique_authors'], exact['unique_authors'], rtol=0.03)
+    for column in ('engagement_p50', 'engagement_p90', 'engagement_p99'):
+        np.testing.assert_allclose(rollup[column], exact[column], rtol=0.03)
+    platform = run_rollup(period, platform='youtube', start_date=str(df['post_date'].min().date()))
+    assert {row['platform'] for row in platform} == {'youtube'}
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.analyzer import AnalyticsEngine
+from src.core.topk import TopPostsTracker
+
+def make_posts(rng, rows: int, start: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        'platform': rng.choice(['youtube', 'facebook', 'twitter'], rows),
+        'post_id': np.arange(start, start + rows).astype(str),
+        'content': 'post',
+        # Few distinct scores, so ties have to resolve to the earliest post as nlargest does
+        'engagement_score': rng.integers(0, 40, rows).astype('float64'),
+        'likes': rng.integers(0, 100, rows),
+        'comments': rng.integers(0, 10, rows),
+        'shares': rng.integers(0, 10, rows)
+    })
+
+def reference(df: pd.DataFrame, overall_n: int = 5, platform_n: int = 3):
+    overall = df.nlargest(overall_n, 'engagement_score', keep='first')['post_id'].tolist()
+    per_platform = (df.groupby('platform', group_keys=False)
+                    .apply(lambda group: group.nlargest(platform_n, 'engagement_score', keep='first')))
+    return overall, per_platform['post_id'].tolist()
+
+def ids(result):
+    return result['top_overall']['post_id'].tolist(), result['top_per_platform']['post_id'].tolist()
+
+@pytest.mark.parametrize('chunk_size', [3, 250, 5000])
+def test_tracker_matches_nlargest_across_chunk_merges(chunk_size):
+    df = make_posts(np.random.default_rng(1), 3000)
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    streamed = TopPostsTracker()
+    merged = TopPostsTracker()
+    for chunk in chunks:
+        streamed.update(chunk)
+        merged.merge(TopPostsTracker().update(chunk))
+    assert ids(streamed.result()) == reference(df)
+    assert ids(merged.result()) == reference(df)
+
+def test_tracker_restarts_from_stored_candidates(tmp_path):
+    rng = np.random.default_rng(2)
+    history = make_posts(rng, 2000)
+    path = tmp_path / 'top_post_candidates.parquet'
+    AnalyticsEngine.top_post_candidates(history).to_parquet(path)
+    for run in range(5):
+        delta = make_posts(rng, 400, start=len(history))
+        history = pd.concat([history, delta], ignore_index=True)
+        candidates = pd.read_parquet(path)
+        result = TopPostsTracker().update(candidates).update(delta).result()
+        assert ids(result) == reference(history), f"run {run}"
+        AnalyticsEngine.top_post_candidates(pd.concat([candidates, delta], ignore_index=True)).to_parquet(path)